@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+"""
+Headless version of the Physic and Graphic processors of the gravitaley demo.
+
+The ``dict`` variant is the original demo: components hold dicts and
+processors update entities one by one. The ``slots`` variant uses components
+declaring their fields. The ``joined`` variant is the demo as is: fields and
+components given to update_entity() (no get_component() call). The ``vector``
+variant stores the
+same data in ArrayComponent types updated by VectorProcessor (it needs
+numpy).
+
+"""
+
+import random
+
+from pytity.columnar import ArrayComponent, numpy
+from pytity.component import Component
+from pytity.manager import Manager
+from pytity.processor import EntityProcessor, VectorProcessor
+
+from benchmarks.timing import best_of
+
+
+WIDTH, HEIGHT = 800, 600
+GRAVITY = 200
+RADIUS = 24
+LOSS_Y = 0.90
+LOSS_X = 0.99
+FRAME = 1.0 / 60
+
+
+class Position(Component):
+    pass
+
+
+class Speed(Component):
+    pass
+
+
+class Coordinate(Component):
+    pass
+
+
+class Physic(EntityProcessor):
+    def __init__(self):
+        EntityProcessor.__init__(self, needed=[Position, Speed])
+
+    def update_entity(self, delta, entity):
+        position = entity.get_component(Position)
+        speed = entity.get_component(Speed)
+
+        speed.value['y'] += -GRAVITY * delta
+        position.value['x'] += speed.value['x'] * delta
+        position.value['y'] += speed.value['y'] * delta
+
+        if position.value['y'] < RADIUS:
+            position.value['y'] = RADIUS
+            speed.value['y'] = -speed.value['y'] * LOSS_Y
+
+        if position.value['x'] < RADIUS:
+            position.value['x'] = RADIUS
+            speed.value['x'] = -speed.value['x']
+
+        if position.value['x'] > WIDTH - RADIUS:
+            position.value['x'] = WIDTH - RADIUS
+            speed.value['x'] = -speed.value['x']
+
+        if abs(speed.value['y']) <= 2 and position.value['y'] == RADIUS:
+            speed.value['x'] = speed.value['x'] * LOSS_X
+
+
+class Graphic(EntityProcessor):
+    def __init__(self):
+        EntityProcessor.__init__(self, needed=[Position, Coordinate])
+
+    def update_entity(self, delta, entity):
+        position = entity.get_component(Position)
+        coords = entity.get_component(Coordinate)
+
+        coords.value['x'] = position.value['x']
+        coords.value['y'] = HEIGHT - position.value['y']
+
+
+class SlotPosition(Component):
+    fields = ('x', 'y')
+
+
+class SlotSpeed(Component):
+    fields = ('x', 'y')
+
+
+class SlotCoordinate(Component):
+    fields = ('x', 'y')
+
+
+class SlotPhysic(EntityProcessor):
+    def __init__(self, with_components=False):
+        EntityProcessor.__init__(self, needed=[SlotPosition, SlotSpeed],
+                                 with_components=with_components)
+
+    def update_entity(self, delta, entity):
+        position = entity.get_component(SlotPosition)
+        speed = entity.get_component(SlotSpeed)
+        self.move(delta, position, speed)
+
+    @staticmethod
+    def move(delta, position, speed):
+        speed.y += -GRAVITY * delta
+        position.x += speed.x * delta
+        position.y += speed.y * delta
+
+        if position.y < RADIUS:
+            position.y = RADIUS
+            speed.y = -speed.y * LOSS_Y
+
+        if position.x < RADIUS:
+            position.x = RADIUS
+            speed.x = -speed.x
+
+        if position.x > WIDTH - RADIUS:
+            position.x = WIDTH - RADIUS
+            speed.x = -speed.x
+
+        if abs(speed.y) <= 2 and position.y == RADIUS:
+            speed.x = speed.x * LOSS_X
+
+
+class SlotGraphic(EntityProcessor):
+    def __init__(self, with_components=False):
+        EntityProcessor.__init__(self, needed=[SlotPosition, SlotCoordinate],
+                                 with_components=with_components)
+
+    def update_entity(self, delta, entity):
+        position = entity.get_component(SlotPosition)
+        coords = entity.get_component(SlotCoordinate)
+        self.move(delta, position, coords)
+
+    @staticmethod
+    def move(delta, position, coords):
+        coords.x = position.x
+        coords.y = HEIGHT - position.y
+
+
+class JoinedPhysic(SlotPhysic):
+    def __init__(self):
+        SlotPhysic.__init__(self, with_components=True)
+
+    def update_entity(self, delta, entity, position, speed):
+        self.move(delta, position, speed)
+
+
+class JoinedGraphic(SlotGraphic):
+    def __init__(self):
+        SlotGraphic.__init__(self, with_components=True)
+
+    def update_entity(self, delta, entity, position, coords):
+        self.move(delta, position, coords)
+
+
+class ArrayPosition(ArrayComponent):
+    dtype = [('x', 'float64'), ('y', 'float64')]
+
+
+class ArraySpeed(ArrayComponent):
+    dtype = [('x', 'float64'), ('y', 'float64')]
+
+
+class ArrayCoordinate(ArrayComponent):
+    dtype = [('x', 'float64'), ('y', 'float64')]
+
+
+class VectorPhysic(VectorProcessor):
+    def __init__(self):
+        VectorProcessor.__init__(self, needed=[ArrayPosition, ArraySpeed])
+
+    def update_arrays(self, delta, entities, position, speed):
+        speed.y -= GRAVITY * delta
+        position.x += speed.x * delta
+        position.y += speed.y * delta
+
+        low = position.y < RADIUS
+        position.y[low] = RADIUS
+        speed.y[low] *= -LOSS_Y
+
+        out = (position.x < RADIUS) | (position.x > WIDTH - RADIUS)
+        numpy.clip(position.x, RADIUS, WIDTH - RADIUS, out=position.x)
+        speed.x[out] *= -1
+
+        stopped = (numpy.abs(speed.y) <= 2) & (position.y == RADIUS)
+        speed.x[stopped] *= LOSS_X
+
+
+class VectorGraphic(VectorProcessor):
+    def __init__(self):
+        VectorProcessor.__init__(
+            self, needed=[ArrayPosition, ArrayCoordinate]
+        )
+
+    def update_arrays(self, delta, entities, position, coords):
+        coords.x = position.x
+        coords.y = HEIGHT - position.y
+
+
+def random_values(number, variant):
+    if variant == 'vector':
+        return {
+            'x': numpy.random.uniform(0, WIDTH, number),
+            'y': numpy.random.uniform(0, HEIGHT, number),
+        }
+    return [{
+        'x': random.uniform(0, WIDTH),
+        'y': random.uniform(0, HEIGHT),
+    } for i in range(number)]
+
+
+def pipeline(number, variant):
+    """Measure the creation of balls and a frame of Physic and Graphic."""
+    if variant == 'dict':
+        types = (Position, Speed, Coordinate)
+        processors = (Physic, Graphic)
+    elif variant == 'slots':
+        types = (SlotPosition, SlotSpeed, SlotCoordinate)
+        processors = (SlotPhysic, SlotGraphic)
+    elif variant == 'joined':
+        types = (SlotPosition, SlotSpeed, SlotCoordinate)
+        processors = (JoinedPhysic, JoinedGraphic)
+    else:
+        types = (ArrayPosition, ArraySpeed, ArrayCoordinate)
+        processors = (VectorPhysic, VectorGraphic)
+
+    def create():
+        manager = Manager()
+        manager.create_entities(number, components=dict(
+            (component_type, random_values(number, variant))
+            for component_type in types
+        ))
+        for processor in processors:
+            processor().register_to(manager)
+        return manager
+
+    create_time, manager = best_of(create, repeat=1)
+    frame_time = best_of(manager.update, setup=lambda: (FRAME,))[0]
+    return {
+        'create_ms': create_time * 1e3,
+        'frame_ms': frame_time * 1e3,
+    }
+
+
+BENCHMARKS = [
+    ('gravitaley', pipeline, [
+        {'number': number, 'variant': variant}
+        for number in (1000, 100000, 1000000)
+        for variant in ('dict', 'slots', 'joined') +
+        (('vector',) if numpy else ())
+    ]),
+]
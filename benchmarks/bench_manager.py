@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks of the Manager hot paths.
+
+"""
+
+import random
+
+from pytity.component import Component, Tag
+from pytity.manager import Manager
+
+from benchmarks.timing import best_of
+
+
+COMPONENT_TYPES = [
+    type('Type{0}'.format(i), (Component,), {}) for i in range(8)
+]
+
+TAG_TYPES = [type('Tag{0}'.format(i), (Tag,), {}) for i in range(4)]
+
+
+class Position(Component):
+    fields = ('x', 'y')
+
+
+def create_kill(number):
+    """Measure creation and destruction of entities with two components."""
+    first, second = COMPONENT_TYPES[:2]
+
+    def create():
+        manager = Manager()
+        entities = []
+        for i in range(number):
+            entity = manager.create_entity()
+            entity.add_component(first({'x': i, 'y': i}))
+            entity.add_component(second({'x': 1, 'y': 1}))
+            entities.append(entity)
+        return manager, entities
+
+    def create_bulk():
+        manager = Manager()
+        entities = manager.create_entities(number, components={
+            first: [{'x': i, 'y': i} for i in range(number)],
+            second: [{'x': 1, 'y': 1} for i in range(number)],
+        })
+        return manager, entities
+
+    def kill(manager, entities):
+        for entity in entities:
+            manager.kill_entity(entity)
+
+    return {
+        'create_per_s': number / best_of(create)[0],
+        'create_bulk_per_s': number / best_of(create_bulk)[0],
+        'kill_per_s': number / best_of(kill, setup=create)[0],
+    }
+
+
+def add_get_component(number):
+    """Measure latency of add_component(), get_component() and
+    remove_component()."""
+    component_type = COMPONENT_TYPES[0]
+
+    def setup():
+        manager = Manager()
+        return manager, manager.create_entities(number)
+
+    def add(manager, entities):
+        for entity in entities:
+            manager.add_component(entity, component_type(entity))
+
+    def get(manager, entities):
+        for entity in entities:
+            manager.get_component(entity, component_type)
+
+    def remove(manager, entities):
+        for entity in entities:
+            manager.remove_component(entity, component_type)
+
+    def setup_get():
+        manager, entities = setup()
+        add(manager, entities)
+        return manager, entities
+
+    return {
+        'add_component_ns': best_of(add, setup=setup)[0] / number * 1e9,
+        'get_component_ns': best_of(get, setup=setup_get)[0] / number * 1e9,
+        'remove_component_ns': (
+            best_of(remove, setup=setup_get)[0] / number * 1e9
+        ),
+    }
+
+
+def entities_by_types(number, types, selectivity):
+    """Measure a query on ``types`` types matched by a part of entities.
+
+    All the entities have the first type, ``selectivity`` of them have all
+    the other types.
+
+    """
+    manager = Manager()
+    entities = manager.create_entities(number, components={
+        COMPONENT_TYPES[0]: range(number),
+    })
+    matching = entities[:int(number * selectivity)]
+    for component_type in COMPONENT_TYPES[1:types]:
+        manager.add_components_bulk(
+            matching, component_type, range(len(matching))
+        )
+
+    query = COMPONENT_TYPES[:types]
+
+    def run_query():
+        for entity in manager.entities_by_types(query):
+            pass
+
+    def run_view():
+        for entity in manager.view(query):
+            pass
+
+    return {
+        'entities_by_types_ms': best_of(run_query)[0] * 1e3,
+        'view_ms': best_of(run_view)[0] * 1e3,
+        'matched': len(manager.view(query)),
+    }
+
+
+def tags_by_types(number, types):
+    """Measure a query on ``types`` tag types, compared to data components.
+
+    Each type is set to half of the entities, taken randomly.
+
+    """
+    def setup(component_types):
+        manager = Manager()
+        entities = manager.create_entities(number)
+        for component_type in component_types:
+            half = random.sample(entities, number // 2)
+            values = [None] * len(half)
+            manager.add_components_bulk(half, component_type, values)
+        return manager
+
+    def query(manager, component_types):
+        for entity in manager.entities_by_types(component_types):
+            pass
+
+    tags = TAG_TYPES[:types]
+    components = COMPONENT_TYPES[:types]
+    return {
+        'tags_ms': best_of(query, setup=lambda: (setup(tags), tags))[0] * 1e3,
+        'components_ms': best_of(
+            query, setup=lambda: (setup(components), components)
+        )[0] * 1e3,
+    }
+
+
+def snapshot(number):
+    """Measure snapshot() and restore() of entities with a few components."""
+    manager = Manager()
+    entities = manager.create_entities(number, components={
+        Position: [{'x': float(i), 'y': 0.0} for i in range(number)],
+        COMPONENT_TYPES[0]: range(number),
+    })
+    manager.add_components_bulk(entities[::2], TAG_TYPES[0], None)
+
+    snapshot_time, data = best_of(manager.snapshot)
+    types = [Position, COMPONENT_TYPES[0], TAG_TYPES[0]]
+    restore_time = best_of(Manager().restore, setup=lambda: (data, types))[0]
+    return {
+        'snapshot_ms': snapshot_time * 1e3,
+        'restore_ms': restore_time * 1e3,
+        'size_mb': len(data) / 1e6,
+    }
+
+
+def close_pairs(number, distance):
+    """Measure the broad phase of a collision detection.
+
+    Entities are spread on a square with about 2 entities per square of side
+    distance. The O(N**2) comparison of all the pairs is only measured up to
+    2000 entities.
+
+    """
+    side = (number / 2.0) ** 0.5 * distance
+    manager = Manager()
+    manager.create_entities(number, components={
+        Position: [
+            {'x': random.uniform(0, side), 'y': random.uniform(0, side)}
+            for i in range(number)
+        ],
+    })
+
+    index_time = best_of(
+        lambda: manager.spatial_index(Position, distance), repeat=1
+    )[0]
+    grid_time, pairs = best_of(
+        lambda: list(manager.close_pairs(Position, distance))
+    )
+    metrics = {
+        'index_ms': index_time * 1e3,
+        'grid_ms': grid_time * 1e3,
+        'pairs': len(pairs),
+    }
+
+    if number <= 2000:
+        def brute():
+            square = distance * distance
+            positions = list(zip(
+                manager.entities_by_type(Position),
+                manager.components_by_type(Position),
+            ))
+            return [
+                (entity, other)
+                for i, (entity, first) in enumerate(positions)
+                for other, second in positions[i + 1:]
+                if (first.x - second.x) ** 2 +
+                (first.y - second.y) ** 2 <= square
+            ]
+        metrics['brute_ms'] = best_of(brute)[0] * 1e3
+    return metrics
+
+
+BENCHMARKS = [
+    ('create_kill', create_kill, [
+        {'number': 1000},
+        {'number': 100000},
+    ]),
+    ('add_get_component', add_get_component, [
+        {'number': 1000},
+        {'number': 100000},
+    ]),
+    ('entities_by_types', entities_by_types, [
+        {'number': number, 'types': types, 'selectivity': selectivity}
+        for number in (1000, 100000)
+        for types in (1, 2, 4, 8)
+        for selectivity in (0.01, 0.5, 1.0)
+    ]),
+    ('tags_by_types', tags_by_types, [
+        {'number': number, 'types': types}
+        for number in (1000, 100000)
+        for types in (2, 4)
+    ]),
+    ('snapshot', snapshot, [
+        {'number': 1000},
+        {'number': 100000},
+    ]),
+    ('close_pairs', close_pairs, [
+        {'number': 1000, 'distance': 10.0},
+        {'number': 20000, 'distance': 10.0},
+    ]),
+]
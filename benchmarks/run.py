@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+"""
+Run the benchmarks of pytity and output results as JSON.
+
+Usage, from the root of the repository:
+
+    python -m benchmarks.run [--output results.json] [--filter NAME]
+                             [--max-number N]
+    python -m benchmarks.run --compare old.json new.json
+
+Results of two runs (e.g. two versions of pytity) can be compared with
+``--compare``: it prints the ratio new / old of every metric.
+
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import pytity
+
+from benchmarks import bench_gravitaley, bench_manager
+
+
+MODULES = [bench_manager, bench_gravitaley]
+
+
+def run(name_filter=None, max_number=None):
+    """Run the benchmarks and return their results.
+
+    Args:
+      name_filter (str|None): only run benchmarks whose name contains it.
+      max_number (int|None): skip runs with more entities than it.
+
+    Returns:
+      A dict, ready to be dumped as JSON.
+
+    """
+    results = []
+    for module in MODULES:
+        for name, function, params_list in module.BENCHMARKS:
+            if name_filter is not None and name_filter not in name:
+                continue
+            for params in params_list:
+                if max_number is not None and params['number'] > max_number:
+                    continue
+                metrics = function(**params)
+                results.append({
+                    'benchmark': name,
+                    'params': params,
+                    'metrics': metrics,
+                })
+                sys.stderr.write('{0} {1} {2}\n'.format(name, params, metrics))
+
+    return {
+        'pytity': pytity.__version__,
+        'python': platform.python_version(),
+        'timestamp': time.time(),
+        'results': results,
+    }
+
+
+def compare(old, new):
+    """Return the ratio new / old of the metrics found in both results.
+
+    Args:
+      old (dict): results of a first run.
+      new (dict): results of a second run.
+
+    Returns:
+      A list of (benchmark, params, metric, ratio) tuples.
+
+    """
+    def key(result):
+        params = json.dumps(result['params'], sort_keys=True)
+        return result['benchmark'], params
+
+    old_results = dict((key(result), result) for result in old['results'])
+    ratios = []
+    for result in new['results']:
+        old_result = old_results.get(key(result))
+        if old_result is None:
+            continue
+        for metric, value in sorted(result['metrics'].items()):
+            old_value = old_result['metrics'].get(metric)
+            if old_value:
+                ratios.append((
+                    result['benchmark'], result['params'], metric,
+                    value / old_value
+                ))
+    return ratios
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run pytity benchmarks.')
+    parser.add_argument('--output', help='write JSON results in this file')
+    parser.add_argument('--filter', help='run benchmarks matching this name')
+    parser.add_argument('--max-number', type=int,
+                        help='skip runs with more entities')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help='compare two JSON results')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as old, open(args.compare[1]) as new:
+            ratios = compare(json.load(old), json.load(new))
+        for name, params, metric, ratio in ratios:
+            print('{0} {1} {2}: {3:.2f}'.format(name, params, metric, ratio))
+        return
+
+    results = run(args.filter, args.max_number)
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
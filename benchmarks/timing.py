@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+
+REPEAT = 3
+
+
+def best_of(function, setup=None, repeat=None):
+    """Return the best wall time of a function and its last result.
+
+    Args:
+      function (callable): the function to measure.
+      setup (callable|None): called before each run, out of the measure. Its
+      result (a tuple) is passed as arguments to function.
+      repeat (int|None): the number of runs, REPEAT by default.
+
+    Returns:
+      A (seconds, result) tuple.
+
+    """
+    best = None
+    result = None
+    for i in range(repeat or REPEAT):
+        args = setup() if setup is not None else ()
+        start = time.perf_counter()
+        result = function(*args)
+        duration = time.perf_counter() - start
+        if best is None or duration < best:
+            best = duration
+    return best, result
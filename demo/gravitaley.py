@@ -18,6 +18,7 @@ import random
 import pygame
 
 from pytity.component import Component
+from pytity.loop import FixedStepRunner
 from pytity.processor import Processor, EntityProcessor
 from pytity.manager import Manager
 
@@ -34,7 +35,7 @@ class Position(Component):
     Position consists in two float: x and y.
 
     """
-    pass
+    fields = ('x', 'y')
 
 
 class Speed(Component):
@@ -43,7 +44,7 @@ class Speed(Component):
     Speed consists in two float: x and y.
 
     """
-    pass
+    fields = ('x', 'y')
 
 
 class Coordinate(Component):
@@ -52,7 +53,7 @@ class Coordinate(Component):
     Coordinate consists in two float: x and y.
 
     """
-    pass
+    fields = ('x', 'y')
 
 
 class Look(Component):
@@ -103,80 +104,85 @@ class Physic(EntityProcessor):
     LOSS_X = 0.99
 
     def __init__(self, screen_size):
-        EntityProcessor.__init__(self)
+        # Components of the needed types are given to update_entity().
+        EntityProcessor.__init__(self, with_components=True)
         self.screen_width, self.screen_height = screen_size
         # Note this processor only need Position and Speed so we ask for
         # entities which contain these components. In this demo, there are only
         # balls so all the entities are returned each time.
         self.needed = [Position, Speed]
 
-    def update_entity(self, delta, entity):
-        position = entity.get_component(Position)
-        speed = entity.get_component(Speed)
+    def update_entity(self, delta, entity, position, speed):
+        previous = (position.x, position.y)
 
-        speed.value['y'] += -self.GRAVITY * delta
-        position.value['x'] += speed.value['x'] * delta
-        position.value['y'] += speed.value['y'] * delta
+        speed.y += -self.GRAVITY * delta
+        position.x += speed.x * delta
+        position.y += speed.y * delta
 
-        if position.value['y'] < self.RADIUS:
-            position.value['y'] = self.RADIUS
-            speed.value['y'] = -speed.value['y'] * self.LOSS_Y
+        if position.y < self.RADIUS:
+            position.y = self.RADIUS
+            speed.y = -speed.y * self.LOSS_Y
 
-        if position.value['x'] < self.RADIUS:
-            position.value['x'] = self.RADIUS
-            speed.value['x'] = -speed.value['x']
+        if position.x < self.RADIUS:
+            position.x = self.RADIUS
+            speed.x = -speed.x
 
-        if position.value['x'] > self.screen_width - self.RADIUS:
-            position.value['x'] = self.screen_width - self.RADIUS
-            speed.value['x'] = -speed.value['x']
+        if position.x > self.screen_width - self.RADIUS:
+            position.x = self.screen_width - self.RADIUS
+            speed.x = -speed.x
 
         # If the entity is nearly stopped on y axis, it's time to stop it on
         # x axis too.
-        if abs(speed.value['y']) <= 2 and position.value['y'] == self.RADIUS:
-            speed.value['x'] = speed.value['x'] * self.LOSS_X
+        if abs(speed.y) <= 2 and position.y == self.RADIUS:
+            speed.x = speed.x * self.LOSS_X
+
+        # Tell the manager the ball has moved so Graphic updates it.
+        if previous != (position.x, position.y):
+            entity.mark_changed(Position)
 
 
 class Graphic(EntityProcessor):
     """Handle position translation on the screen."""
     def __init__(self, screen_size):
-        EntityProcessor.__init__(self)
+        # Only balls which moved since the last frame are updated.
+        EntityProcessor.__init__(self, changed=[Position],
+                                 with_components=True)
         self.screen_width, self.screen_height = screen_size
         self.needed = [Position, Coordinate]
 
-    def update_entity(self, delta, entity):
-        position = entity.get_component(Position)
-        coords = entity.get_component(Coordinate)
-
+    def update_entity(self, delta, entity, position, coords):
         # Only y axis is reversed between position and coordinate systems.
-        coords.value['x'] = position.value['x']
-        coords.value['y'] = self.screen_height - position.value['y']
+        coords.x = position.x
+        coords.y = self.screen_height - position.y
 
 
-class Render(EntityProcessor):
+class Render(Processor):
     """Show entities on the screen."""
     def __init__(self, screen):
-        EntityProcessor.__init__(self)
+        # Nothing is touched during the simulation steps.
+        Processor.__init__(self, reads=[], writes=[])
         self.screen = screen
-        self.needed = [Coordinate, Look]
 
-    def pre_update(self, delta):
-        # Before showing balls, we paint the screen in black (paint it black!)
-        self.screen.fill((0, 0, 0))
+    def update(self, delta):
+        # Balls are drawn once per frame, in interpolate().
+        pass
 
-    def update_entity(self, delta, entity):
-        # Just find coordinates, the look and show the image on the screen.
-        coords = entity.get_component(Coordinate)
-        look = entity.get_component(Look)
+    def interpolate(self, alpha):
+        # The screen is drawn once per frame, whatever the number of steps of
+        # the simulation. Before showing balls, we paint the screen in black
+        # (paint it black!)
+        self.screen.fill((0, 0, 0))
 
-        width = look.value['width']
-        height = look.value['height']
-        x = coords.value['x'] - width / 2
-        y = coords.value['y'] - height / 2
-        rect = pygame.Rect(x, y, width, height)
+        # Just find coordinates, the look and show the image.
+        for entity, coords, look in self.manager.join(Coordinate, Look):
+            width = look.value['width']
+            height = look.value['height']
+            x = coords.x - width / 2
+            y = coords.y - height / 2
+            rect = pygame.Rect(x, y, width, height)
 
-        self.screen.blit(look.value['image'], rect)
+            self.screen.blit(look.value['image'], rect)
 
-    def post_update(self, delta):
         # And finish by showing the new screen!
         pygame.display.flip()
 
@@ -185,32 +191,36 @@ class Render(EntityProcessor):
 # "Archetype" declaration
 # Note there is not this kind of concept in pytity yet.
 #
-def create_ball(manager, position):
-    """This function create a ball in the world.
+def create_balls(manager, positions):
+    """This function create balls in the world.
 
     A ball is an entity with a position, a speed, coordinates on the screen
-    and an appearance (a smiley image!).
+    and an appearance (a smiley image!). All the balls are created at once,
+    which is faster than creating them one by one.
 
     """
-    entity = manager.create_entity()
-
-    entity.add_component(Position(position))
-    entity.add_component(Speed({
-        'x': random.uniform(-500, 500),
-        'y': random.uniform(-500, 500)
-    }))
-    entity.add_component(Coordinate({
-        'x': 0,
-        'y': 0
-    }))
-
     filename = os.path.join('data', 'face.png')
     image = pygame.image.load(filename).convert_alpha()
-    entity.add_component(Look({
+    look = {
         'image': image,
         'width': image.get_width(),
         'height': image.get_height(),
-    }))
+    }
+
+    manager.create_entities(len(positions), components={
+        Position: positions,
+        Speed: [{
+            'x': random.uniform(-500, 500),
+            'y': random.uniform(-500, 500)
+        } for position in positions],
+        Coordinate: [{'x': 0, 'y': 0} for position in positions],
+        Look: [look] * len(positions),
+    })
+
+
+def create_ball(manager, position):
+    """This function create a ball in the world."""
+    create_balls(manager, [position])
 
 
 def main():
@@ -222,11 +232,10 @@ def main():
     # Create a manager and balls (balls are smiley images)
     manager = Manager()
     number_balls = random.randint(1, 20)
-    for i in range(number_balls):
-        create_ball(manager, {
-            'x': random.randint(0, width),
-            'y': random.randint(0, height)
-        })
+    create_balls(manager, [{
+        'x': random.randint(0, width),
+        'y': random.randint(0, height)
+    } for i in range(number_balls)])
 
     # Add the processors (or systems) to the manager
     Input((width, height)).register_to(manager)
@@ -235,10 +244,13 @@ def main():
     Render(screen).register_to(manager)
 
     # And start the big loop!
+    # The simulation runs at a fixed step of 1/120 second, the screen is
+    # drawn at most 60 times per second.
+    runner = FixedStepRunner(manager, step=1.0 / 120)
     clock = pygame.time.Clock()
     while is_running:
         delay = clock.tick(60)
-        manager.update(float(delay) / 1000)
+        runner.advance(float(delay) / 1000)
 
 
 if __name__ == '__main__':
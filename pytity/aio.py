@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+"""
+Run the processors of a manager in an asyncio event loop.
+
+Processors handling I/O (network input, persistence...) may define their
+``pre_update``, ``update`` or ``post_update`` methods as coroutine functions.
+Manager.update_async() awaits them concurrently, instead of blocking the
+event loop or running the whole update in an executor.
+
+"""
+
+import asyncio
+import inspect
+from time import perf_counter
+
+from pytity.scheduler import conflict
+from pytity.stats import PHASES
+
+
+def is_async(processor):
+    """Return whether a processor has a coroutine function as phase.
+
+    Example:
+
+    >>> from pytity.processor import Processor
+    >>> class Network(Processor):
+    ...     async def update(self, delta):
+    ...         pass
+    >>> is_async(Processor()), is_async(Network())
+    (False, True)
+
+    """
+    return any(
+        inspect.iscoroutinefunction(getattr(processor, phase))
+        for phase in PHASES
+    )
+
+
+async def run_processor(manager, processor, delta):
+    """Call ``update`` methods of a processor, awaiting the coroutine ones.
+
+    Like Manager.run_processor(), processors with a rate are updated with
+    fixed steps and each phase is recorded in manager.stats if it is set. The
+    duration of a coroutine phase includes the time spent by the event loop
+    on other tasks while it waits.
+
+    Args:
+      manager (Manager): the manager of the processor.
+      processor (Processor): the processor to run.
+      delta (float): a delta of time since the last update call.
+
+    """
+    for step in manager.processor_steps(processor, delta):
+        for phase in PHASES:
+            start = perf_counter()
+            result = getattr(processor, phase)(step)
+            if inspect.isawaitable(result):
+                await result
+
+            if manager.stats is not None:
+                visited = None
+                if phase == 'update':
+                    visited = getattr(processor, 'last_visited', None)
+                duration = perf_counter() - start
+                manager.stats.record(processor, phase, duration, visited)
+
+
+async def update(manager, delta):
+    """Run all the processors of a manager in the running event loop.
+
+    Coroutine processors (see is_async()) are started as tasks in
+    registration order and run concurrently: they only interleave at their
+    ``await`` points, so they do not need locks. Other processors are run in
+    registration order. Before running one, the coroutine processors started
+    before it and conflicting with it (see conflict()) are awaited, so a
+    processor always sees the changes of the previous processors it depends
+    on. The event loop is given a chance to run between processors.
+
+    Commands (see CommandBuffer) are flushed after each processor that is
+    not a coroutine and each time coroutine processors are awaited, if
+    manager.flush_between_processors is True, and at the end of the update.
+
+    If a processor raises an error, the coroutine processors still running
+    are cancelled and the error is raised.
+
+    Args:
+      manager (Manager): the manager whose processors are run.
+      delta (float): a delta of time since the last update call.
+
+    """
+    pending = []
+    try:
+        for processor in list(manager.processor_store):
+            accesses = processor.accesses()
+            if is_async(processor):
+                task = asyncio.ensure_future(
+                    run_processor(manager, processor, delta)
+                )
+                pending.append((accesses, task))
+                # Let the task start, until its first await.
+                await asyncio.sleep(0)
+                continue
+
+            waited = [t for a, t in pending if conflict(a, accesses)]
+            if waited:
+                await asyncio.gather(*waited)
+                pending = [(a, t) for a, t in pending if not t.done()]
+                _flush(manager)
+
+            manager.run_processor(processor, delta)
+            _flush(manager)
+            await asyncio.sleep(0)
+
+        await asyncio.gather(*[task for accesses, task in pending])
+    finally:
+        for accesses, task in pending:
+            task.cancel()
+    manager.commands.flush()
+
+
+def _flush(manager):
+    if manager.flush_between_processors:
+        manager.commands.flush()
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+
+from pytity.manager import Manager
+from pytity.storage import SparseSet
+
+
+class Archetype(SparseSet):
+    """A table of the entities sharing exactly the same component types.
+
+    Each component type of the signature has its own column (a list) and the
+    component of an entity is stored in the column at the row of the entity.
+
+    Example:
+
+    >>> from pytity.component import Component
+    >>> a = Archetype(frozenset([Component]))
+    >>> c = Component(42)
+    >>> a.insert(1, {Component: c})
+    >>> a.columns[Component][a.index[1]] is c
+    True
+
+    """
+    def __init__(self, signature):
+        """Initialize an archetype.
+
+        Args:
+          signature (frozenset of classes): the component types of the
+          entities stored in the archetype.
+
+        """
+        SparseSet.__init__(self)
+        self.signature = signature
+        self.columns = dict((t, []) for t in signature)
+        # Archetype reached by adding (or removing if it is already part of
+        # the signature) a component type.
+        self.edges = {}
+
+    def insert(self, entity, components):
+        """Append an entity and its components at the end of the table.
+
+        Args:
+          entity (Entity): the entity to insert.
+          components (dict): the components of the entity by type. It must
+          contain at least all the types of the signature.
+
+        """
+        self.add(entity)
+        for component_type, column in self.columns.items():
+            column.append(components[component_type])
+
+    def set_component(self, entity, component):
+        """Replace the component of an entity stored in the table.
+
+        Args:
+          entity (Entity): the entity stored in the archetype.
+          component (Component): the new component.
+
+        """
+        self.columns[component.type][self.index[entity]] = component
+
+    def rows(self, component_types):
+        """Iterate over the entities with their components.
+
+        Rows are read from the last one to the first one. As with entities
+        (see SparseSet), columns are not copied unless the archetype changes
+        during the iteration, and entities removed meanwhile are skipped.
+
+        Args:
+          component_types (list of classes): the types of the components, part
+          of the signature.
+
+        Returns:
+          A generator of (entity, component, ...) tuples.
+
+        """
+        dense = self._read()
+        columns = [reversed(self.columns[t]) for t in component_types]
+        index = self.index
+        try:
+            for row in zip(reversed(dense), *columns):
+                if row[0] in index:
+                    yield row
+        finally:
+            self._done(dense)
+
+    def _write(self):
+        SparseSet._write(self)
+        self.columns = dict(
+            (component_type, column[:])
+            for component_type, column in self.columns.items()
+        )
+
+    def _remove_row(self, row):
+        SparseSet._remove_row(self, row)
+        for column in self.columns.values():
+            last = column.pop()
+            if row < len(column):
+                column[row] = last
+
+
+class ArchetypeManager(Manager):
+    """A manager grouping entities by archetype.
+
+    Entities sharing the same set of component types are stored together in
+    an Archetype. Queries on several component types only walk the matching
+    archetypes instead of intersecting sets of entities, and components of a
+    same type are iterated column by column.
+
+    The API is the same as the one of Manager, only the storage changes.
+    Tags (see Tag) are not part of archetypes, they are stored in their
+    TagSet as with Manager.
+
+    Example:
+
+    >>> from pytity.component import Component
+    >>> m = ArchetypeManager()
+    >>> e = m.create_entity()
+    >>> e.add_component(Component('spam'))
+    >>> list(m.entities_by_types([Component])) == [e]
+    True
+
+    """
+    def __init__(self):
+        Manager.__init__(self)
+        self.empty_archetype = Archetype(frozenset())
+        self.archetype_store = {frozenset(): self.empty_archetype}
+        self.entity_archetype = {}
+        self.archetype_queries = {}
+
+    def clear(self):
+        Manager.clear(self)
+        self.empty_archetype = Archetype(frozenset())
+        self.archetype_store = {frozenset(): self.empty_archetype}
+        self.entity_archetype = {}
+        self.archetype_queries = {}
+
+    def create_entity(self):
+        entity = Manager.create_entity(self)
+        self.empty_archetype.insert(entity, {})
+        self.entity_archetype[entity] = self.empty_archetype
+        return entity
+
+    def store_entities(self, entities):
+        Manager.store_entities(self, entities)
+        for entity in entities:
+            self.empty_archetype.insert(entity, {})
+            self.entity_archetype[entity] = self.empty_archetype
+
+    def kill_entity(self, entity):
+        if entity in self.entity_archetype:
+            self.entity_archetype.pop(entity).discard(entity)
+        Manager.kill_entity(self, entity)
+
+    def add_component(self, entity, component):
+        Manager.add_component(self, entity, component)
+        if component.type not in self.tag_stores:
+            # The manager may reference a copy of the component.
+            self.entity_archetype[entity].set_component(
+                entity, self.entity_store[entity][component.type]
+            )
+
+    def _components_set(self, entities, component_type, components):
+        Manager._components_set(self, entities, component_type, components)
+        for entity, component in zip(entities, components):
+            self.entity_archetype[entity].set_component(entity, component)
+
+    def archetypes(self, component_types):
+        """Return the archetypes containing the given component types.
+
+        The list is cached and new archetypes are appended to it when they
+        are created.
+
+        Args:
+          component_types (list of classes): the types to look for.
+
+        Returns:
+          A list of Archetype.
+
+        """
+        key = frozenset(component_types)
+        archetypes = self.archetype_queries.get(key)
+        if archetypes is None:
+            archetypes = [
+                archetype for archetype in self.archetype_store.values()
+                if key <= archetype.signature
+            ]
+            self.archetype_queries[key] = archetypes
+        return archetypes
+
+    def entities_by_types(self, component_types, without=None):
+        """Return a generator of entities for given component types.
+
+        Only archetypes containing all the component types, and none of the
+        excluded ones, are walked.
+
+        Args:
+          component_types (list of classes): is a list of component types to
+          filter.
+          without (list of classes|None): component types the entities must
+          not have.
+
+        Returns:
+          A generator of entities having the given component types.
+
+        """
+        if len(component_types) == 0:
+            return
+
+        without = frozenset(without or ())
+        tags = [
+            t for t in list(component_types) + list(without)
+            if t in self.tag_stores
+        ]
+        if tags:
+            # Tags are not part of archetypes, see Manager.
+            for entity in Manager.entities_by_types(
+                    self, component_types, without):
+                yield entity
+            return
+
+        for archetype in self.archetypes(component_types):
+            if not archetype.signature & without:
+                # Entities can be killed while iterating, see SparseSet.
+                yield from reversed(archetype)
+
+    def join(self, *component_types, without=None):
+        """Return a generator of entities with their components.
+
+        Components are read column by column from the matching archetypes,
+        see Manager.join().
+
+        """
+        without = frozenset(without or ())
+        if any(t in self.tag_stores for t in component_types + tuple(without)):
+            # Tags are not part of archetypes, see Manager.
+            return Manager.join(self, *component_types, without=without)
+        return self._join_columns(component_types, without)
+
+    def _join_columns(self, component_types, without):
+        for archetype in self.archetypes(component_types):
+            if archetype.signature & without:
+                continue
+            yield from archetype.rows(component_types)
+
+    def components_by_type(self, component_type):
+        """Return a generator of component for a given component type.
+
+        Components are read column by column from the matching archetypes.
+
+        Args:
+          component_type (class): a component type to filter.
+
+        Returns:
+          A generator of components having the given component type.
+
+        """
+        if component_type in self.tag_stores:
+            for component in Manager.components_by_type(self, component_type):
+                yield component
+            return
+
+        for archetype in self.archetypes([component_type]):
+            for component in archetype.columns[component_type]:
+                yield component
+
+    def _archetype(self, signature):
+        """Return the archetype of a signature, create it if needed."""
+        archetype = self.archetype_store.get(signature)
+        if archetype is None:
+            archetype = Archetype(signature)
+            self.archetype_store[signature] = archetype
+            for key, archetypes in self.archetype_queries.items():
+                if key <= signature:
+                    archetypes.append(archetype)
+        return archetype
+
+    def _move(self, entity, component_type):
+        """Move an entity to the archetype with or without a type."""
+        source = self.entity_archetype[entity]
+        target = source.edges.get(component_type)
+        if target is None:
+            target = self._archetype(
+                source.signature.symmetric_difference([component_type])
+            )
+            source.edges[component_type] = target
+
+        source.discard(entity)
+        target.insert(entity, self.entity_store[entity])
+        self.entity_archetype[entity] = target
+
+    def _component_added(self, entity, component_type):
+        if component_type not in self.tag_stores:
+            self._move(entity, component_type)
+        Manager._component_added(self, entity, component_type)
+
+    def _component_removed(self, entity, component_type):
+        # A killed entity has already left its archetype.
+        if entity in self.entity_archetype and\
+                component_type not in self.tag_stores:
+            self._move(entity, component_type)
+        Manager._component_removed(self, entity, component_type)
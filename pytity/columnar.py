@@ -0,0 +1,468 @@
+# -*- coding: utf-8 -*-
+
+from collections.abc import Mapping
+
+from pytity.component import Component, FieldView
+from pytity.storage import SparseSet
+
+try:
+    import numpy
+except ImportError:  # numpy is an optional dependency
+    numpy = None
+
+
+class ArrayComponent(Component):
+    """A Component whose data is stored in NumPy arrays.
+
+    Fields are declared with a ``dtype`` class attribute, which is a NumPy
+    structured dtype description. The manager stores each field of every
+    component of this type in one contiguous array, so all these components
+    can be updated at once by a VectorProcessor.
+
+    Once attached to an entity, a component reads and writes its fields
+    directly in the arrays. Its ``value`` is a dict-like view of its fields.
+
+    Example:
+
+    >>> class Position(ArrayComponent):
+    ...     dtype = [('x', 'float64'), ('y', 'float64')]
+    >>> p = Position(x=1.5)
+    >>> p.x, p.value['y']
+    (1.5, 0)
+
+    """
+    dtype = []
+
+    def __init__(self, value=None, **fields):
+        """Initialize a component.
+
+        Args:
+          value (dict|None): the initial values of the fields.
+          **fields: the initial values of the fields, by name.
+
+        Missing fields are initialized to zero.
+
+        """
+        values = dict(value or {}, **fields)
+        object.__setattr__(self, 'store', None)
+        object.__setattr__(self, 'entity', None)
+        object.__setattr__(self, 'pending', values)
+
+    @classmethod
+    def field_names(cls):
+        """Return the names of the fields declared by ``dtype``."""
+        names = cls.__dict__.get('_field_names')
+        if names is None:
+            names = tuple(field[0] for field in cls.dtype)
+            cls._field_names = names
+        return names
+
+    @classmethod
+    def create_store(cls):
+        """Return the storage used by the manager for this type."""
+        return ComponentArray(cls)
+
+    @classmethod
+    def bound(cls, store, entity):
+        """Return a component reading its fields from a store.
+
+        Args:
+          store (ComponentArray): the store holding the data.
+          entity (Entity): the entity owning the component.
+
+        """
+        component = cls.__new__(cls)
+        component.bind(store, entity)
+        return component
+
+    @property
+    def value(self):
+        return FieldView(self, self.field_names())
+
+    def bind(self, store, entity):
+        """Read and write the fields from a store from now.
+
+        Args:
+          store (ComponentArray): the store holding the data.
+          entity (Entity): the entity owning the component.
+
+        """
+        # Fields are routed by __setattr__(), the instance dict is not.
+        self.__dict__.update(store=store, entity=entity, pending=None)
+
+    def unbind(self, values):
+        """Stop reading the fields from a store, keep them in the component.
+
+        Args:
+          values (dict): the values of the fields.
+
+        """
+        self.__dict__.update(store=None, entity=None, pending=values)
+
+    def __getattr__(self, name):
+        if name not in self.field_names():
+            raise AttributeError(name)
+        if self.store is None:
+            return self.pending.get(name, 0)
+        return self.store.get(self.entity, name)
+
+    def __setattr__(self, name, value):
+        if name not in self.field_names():
+            object.__setattr__(self, name, value)
+        elif self.store is None:
+            self.pending[name] = value
+        else:
+            self.store.set(self.entity, name, value)
+
+
+class Columns(dict):
+    """The field arrays of a component type, readable as attributes.
+
+    Assigning an attribute writes in the existing array so it can be done on
+    views of the storage.
+
+    """
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name][...] = value
+
+
+class ComponentArray(SparseSet):
+    """Store the components of an ArrayComponent type in NumPy arrays.
+
+    There is one array per field and one array of entity identifiers. The
+    row of an entity is the same in all of them and removing an entity moves
+    the last row in its place.
+
+    Example:
+
+    >>> class Speed(ArrayComponent):
+    ...     dtype = [('x', 'float64')]
+    >>> store = ComponentArray(Speed)
+    >>> speed = store.attach(7, Speed(x=2.0))
+    >>> store.arrays().x.tolist(), speed.entity
+    ([2.0], 7)
+
+    """
+    def __init__(self, component_type, capacity=64):
+        """Initialize the store.
+
+        Args:
+          component_type (class): the ArrayComponent type to store.
+          capacity (int): the number of rows allocated at start.
+
+        Raises:
+          ImportError if numpy is not installed.
+
+        """
+        if numpy is None:
+            raise ImportError(
+                'numpy is required to store {0}'.format(
+                    component_type.__name__
+                )
+            )
+
+        SparseSet.__init__(self)
+        self.component_type = component_type
+        self.dtype = numpy.dtype(component_type.dtype)
+        self.fields = self.dtype.names
+        self.ids = numpy.zeros(capacity, dtype=numpy.int64)
+        self.columns = dict(
+            (name, numpy.zeros(capacity, dtype=self.dtype.fields[name][0]))
+            for name in self.fields
+        )
+
+    def add(self, entity):
+        if entity in self.index:
+            return
+
+        row = len(self.dense)
+        if row == len(self.ids):
+            self.reserve(2 * row)
+        SparseSet.add(self, entity)
+        self.ids[row] = entity
+        for column in self.columns.values():
+            column[row] = 0
+
+    def attach(self, entity, component):
+        """Store the fields of a component and bind it to the store.
+
+        A component already bound to another entity keeps reading the fields
+        of that entity: its values are copied to a new component instead.
+
+        Args:
+          entity (Entity): the entity owning the component.
+          component (ArrayComponent): the component set to the entity.
+
+        Returns:
+          The component bound to the entity.
+
+        """
+        values = component.pending
+        if component.store is not None:
+            if component.store is self and component.entity == entity:
+                return component
+            values = component.store.values(component.entity)
+            component = component.type.__new__(component.type)
+
+        self.add(entity)
+        row = self.index[entity]
+        for name, value in (values or {}).items():
+            self.columns[name][row] = value
+        component.bind(self, entity)
+        return component
+
+    def detach(self, entity, component):
+        """Remove an entity, its component keeps a copy of its fields.
+
+        Args:
+          entity (Entity): the entity losing the component.
+          component (ArrayComponent): the removed component.
+
+        """
+        if component.store is self and entity in self.index:
+            component.unbind(self.values(entity))
+        self.discard(entity)
+
+    def attach_bulk(self, entities, component_type, values):
+        """Store the components of several entities.
+
+        Args:
+          entities (list of Entity): the entities owning the components.
+          component_type (class): the ArrayComponent type.
+          values (dict|sequence): a dict of arrays (or sequences) by field
+          name, or one dict of field values per entity.
+
+        Returns:
+          The list of components, bound to the store.
+
+        """
+        # Values are checked first, so the store is left unchanged if they
+        # do not match the fields.
+        if isinstance(values, Mapping):
+            columns = dict(
+                (name, numpy.asarray(array, dtype=self.columns[name].dtype))
+                for name, array in values.items()
+            )
+        else:
+            columns = self._stack(values)
+
+        start, end = self._append(entities)
+        if end - start == len(entities):
+            # Only new entities, appended in order.
+            rows = slice(start, end)
+        else:
+            rows = numpy.fromiter(
+                (self.index[entity] for entity in entities),
+                dtype=numpy.intp, count=len(entities)
+            )
+
+        for name, array in columns.items():
+            self.columns[name][rows] = array
+
+        return [component_type.bound(self, entity) for entity in entities]
+
+    def _append(self, entities):
+        """Append the entities not stored yet, with zeroed fields.
+
+        Returns:
+          The (start, end) rows of the appended entities.
+
+        """
+        start = len(self.dense)
+        if start + len(entities) > len(self.ids):
+            self.reserve(max(start + len(entities), 2 * len(self.ids)))
+        if self.readers:
+            self._write()
+        index, dense = self.index, self.dense
+        for entity in entities:
+            if entity not in index:
+                index[entity] = len(dense)
+                dense.append(entity)
+
+        end = len(dense)
+        self.ids[start:end] = dense[start:end]
+        for column in self.columns.values():
+            column[start:end] = 0
+        return start, end
+
+    def _stack(self, values):
+        """Turn a sequence of dicts into a Columns object."""
+        columns = Columns(
+            (name, [0] * len(values)) for name in self.fields
+        )
+        for i, value in enumerate(values):
+            for name, field_value in value.items():
+                columns[name][i] = field_value
+        return columns
+
+    def reserve(self, capacity):
+        """Grow the arrays so they can hold at least ``capacity`` rows.
+
+        Args:
+          capacity (int): the number of rows to allocate.
+
+        """
+        if capacity <= len(self.ids):
+            return
+
+        size = len(self.dense)
+        self.ids = self._grown(self.ids, size, capacity)
+        for name, column in self.columns.items():
+            self.columns[name] = self._grown(column, size, capacity)
+
+    @staticmethod
+    def _grown(array, size, capacity):
+        grown = numpy.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+        grown[:size] = array[:size]
+        return grown
+
+    def _remove_row(self, row):
+        last = len(self.dense) - 1
+        SparseSet._remove_row(self, row)
+        if row < last:
+            self.ids[row] = self.ids[last]
+            for column in self.columns.values():
+                column[row] = column[last]
+
+    def get(self, entity, field):
+        """Return the value of a field for an entity.
+
+        Args:
+          entity (Entity): the entity stored in the array.
+          field (str): the name of the field.
+
+        Returns:
+          The value, as a Python scalar for scalar fields.
+
+        """
+        value = self.columns[field][self.index[entity]]
+        return value.item() if value.ndim == 0 else value
+
+    def values(self, entity):
+        """Return a copy of the fields of an entity.
+
+        Args:
+          entity (Entity): the entity stored in the array.
+
+        Returns:
+          A dict of the values by field name.
+
+        """
+        row = self.index[entity]
+        values = {}
+        for name, column in self.columns.items():
+            value = column[row]
+            values[name] = value.item() if value.ndim == 0 else value.copy()
+        return values
+
+    def set(self, entity, field, value):
+        """Set the value of a field for an entity.
+
+        Args:
+          entity (Entity): the entity stored in the array.
+          field (str): the name of the field.
+          value: the new value.
+
+        """
+        self.columns[field][self.index[entity]] = value
+
+    def arrays(self):
+        """Return views on the used part of the field arrays.
+
+        Returns:
+          A Columns object.
+
+        """
+        return self.take(slice(0, len(self.dense)))
+
+    def rows(self, entities):
+        """Return the rows of the given entities.
+
+        Args:
+          entities (numpy.ndarray): identifiers of entities stored in the
+          array.
+
+        Returns:
+          A slice if entities are all the stored entities in the same order,
+          an array of rows otherwise.
+
+        """
+        size = len(self.dense)
+        ids = self.ids[:size]
+        if len(entities) == size and numpy.array_equal(ids, entities):
+            return slice(0, size)
+
+        sorter = numpy.argsort(ids)
+        return sorter[numpy.searchsorted(ids, entities, sorter=sorter)]
+
+    def take(self, rows):
+        """Return the field arrays for some rows.
+
+        Args:
+          rows (slice|numpy.ndarray): rows as returned by rows().
+
+        Returns:
+          A Columns object. Arrays are views if rows is a slice, copies
+          otherwise.
+
+        """
+        return Columns(
+            (name, column[rows]) for name, column in self.columns.items()
+        )
+
+    def put(self, rows, columns):
+        """Write back field arrays returned by take().
+
+        Args:
+          rows (slice|numpy.ndarray): rows as returned by rows().
+          columns (Columns): the field arrays to write.
+
+        """
+        for name, column in self.columns.items():
+            column[rows] = columns[name]
+
+
+class ColumnBatch(object):
+    """Field arrays of several component types aligned on the same entities.
+
+    The i-th value of every array belongs to the i-th entity of
+    ``entities``. When the stores contain the same entities in the same order,
+    arrays are views and nothing is copied. Otherwise arrays are gathered and
+    commit() must be called to write the changes back.
+
+    """
+    def __init__(self, stores, entities):
+        """Gather the field arrays.
+
+        Args:
+          stores (list of ComponentArray): the stores to read.
+          entities (sized iterable): the entities to gather, all of them are
+          stored in each store.
+
+        """
+        size = len(entities)
+        if all(len(store) == size for store in stores):
+            # Stores contain exactly the wanted entities.
+            self.entities = stores[0].ids[:size]
+        else:
+            self.entities = numpy.fromiter(
+                entities, dtype=numpy.int64, count=size
+            )
+
+        self.stores = stores
+        self.rows = [store.rows(self.entities) for store in stores]
+        self.columns = [
+            store.take(rows) for store, rows in zip(stores, self.rows)
+        ]
+
+    def commit(self):
+        """Write gathered arrays back to their stores."""
+        for store, rows, columns in zip(self.stores, self.rows, self.columns):
+            if not isinstance(rows, slice):
+                store.put(rows, columns)
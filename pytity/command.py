@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+from threading import Lock
+
+
+class CommandBuffer(object):
+    """Record structural changes and apply them later, in one batch.
+
+    Creating or killing entities and adding components while processors
+    iterate over entities would modify the stores being iterated. Processors
+    record these changes in Manager.commands instead, and the manager applies
+    them with flush() between processors (or at the end of the frame, see
+    Manager.flush_between_processors).
+
+    A flush first stores the created entities, then adds components by type
+    (in the order of entities) with Manager.add_components(), then removes
+    components and finally kills entities. Commands targeting an entity
+    killed before the flush are ignored.
+
+    Recording is thread-safe, so processors run by ParallelScheduler may
+    record commands too.
+
+    Example:
+
+    >>> from pytity.component import Component
+    >>> from pytity.manager import Manager
+    >>> m = Manager()
+    >>> e = m.commands.create_entity([Component('spam')])
+    >>> e in m.entity_store, len(m.commands)
+    (False, 2)
+    >>> m.commands.flush()
+    >>> e in m.entity_store, e.get_component(Component).value
+    (True, 'spam')
+
+    """
+    def __init__(self, manager):
+        """Initialize an empty command buffer.
+
+        Args:
+          manager (Manager): the manager to which commands are applied.
+
+        """
+        self.manager = manager
+        self.lock = Lock()
+        self.clear()
+
+    def clear(self):
+        """Forget all the recorded commands."""
+        self.created = []
+        self.added = {}
+        self.removed = {}
+        self.killed = set()
+
+    def __len__(self):
+        return (
+            len(self.created) +
+            sum(len(components) for components in self.added.values()) +
+            sum(len(entities) for entities in self.removed.values()) +
+            len(self.killed)
+        )
+
+    def create_entity(self, components=()):
+        """Record the creation of an entity.
+
+        The identifier is reserved immediately, so components can be added
+        to it with add_component(), but the entity only exists in the manager
+        after the flush.
+
+        Args:
+          components (list of Component): components to add to the entity.
+
+        Returns:
+          The Entity which will be created.
+
+        """
+        with self.lock:
+            entity = self.manager.reserve_entity()
+            self.created.append(entity)
+        for component in components:
+            self.add_component(entity, component)
+        return entity
+
+    def add_component(self, entity, component):
+        """Record a component to set to an entity.
+
+        If several components of the same type are recorded for an entity,
+        the last one is set.
+
+        Args:
+          entity (Entity): the entity on which we set the component.
+          component (Component): the component to attach to the entity.
+
+        """
+        with self.lock:
+            self.added.setdefault(component.type, {})[entity] = component
+
+    def remove_component(self, entity, component_type):
+        """Record the removal of a component from an entity.
+
+        Removals are applied after additions, so a component added and
+        removed before the same flush is removed.
+
+        Args:
+          entity (Entity): the entity from which we remove the component.
+          component_type (class): the type of the component to remove.
+
+        """
+        with self.lock:
+            self.removed.setdefault(component_type, set()).add(entity)
+
+    def kill_entity(self, entity):
+        """Record the destruction of an entity.
+
+        Args:
+          entity (Entity): the entity to kill.
+
+        """
+        with self.lock:
+            self.killed.add(entity)
+
+    def flush(self):
+        """Apply the recorded commands to the manager and forget them."""
+        if not (self.created or self.added or self.removed or self.killed):
+            return
+
+        with self.lock:
+            created, added = self.created, self.added
+            removed, killed = self.removed, self.killed
+            self.clear()
+
+        manager = self.manager
+        manager.store_entities(created)
+
+        for components in added.values():
+            entities = sorted(
+                entity for entity in components
+                if entity in manager.entity_store
+            )
+            manager.add_components(
+                entities, [components[entity] for entity in entities]
+            )
+
+        for component_type, entities in removed.items():
+            for entity in sorted(entities):
+                if entity in manager.entity_store:
+                    manager.remove_component(entity, component_type)
+
+        for entity in sorted(killed):
+            if entity in manager.entity_store:
+                manager.kill_entity(entity)
@@ -1,7 +1,47 @@
 # -*- coding: utf-8 -*-
 
+from collections.abc import Mapping, MutableMapping
 
-class Component(object):
+
+class ComponentMeta(type):
+    """The metaclass of components.
+
+    It sets the ``type`` attribute of each component class to the class
+    itself, so instances do not store it.
+
+    If a class declares its ``fields`` (a tuple of names), instances store
+    them in ``__slots__``, without a ``__dict__``. The class gets an
+    __init__() accepting the fields as positional or keyword arguments (or a
+    single dict, like Component) and a ``value`` property giving a dict-like
+    access to them (see FieldView). Subclasses of such a class get empty
+    ``__slots__`` unless they declare other fields, which are appended to the
+    inherited ones.
+
+    """
+    def __new__(mcs, name, bases, namespace):
+        inherited = ()
+        for base in bases:
+            inherited += tuple(
+                field for field in getattr(base, 'fields', None) or ()
+                if field not in inherited
+            )
+
+        fields = namespace.get('fields')
+        if '__slots__' not in namespace and (fields or inherited):
+            namespace['__slots__'] = tuple(
+                field for field in fields or () if field not in inherited
+            )
+            if fields:
+                namespace['fields'] = inherited + namespace['__slots__']
+            namespace.setdefault('__init__', _init_fields)
+            namespace.setdefault('value', property(_get_fields, _set_fields))
+
+        cls = type.__new__(mcs, name, bases, namespace)
+        cls.type = cls
+        return cls
+
+
+class Component(object, metaclass=ComponentMeta):
     """A Component stores data of entities.
 
     It must be the base class for all the different Components.
@@ -16,8 +56,141 @@ class Component(object):
     >>> c.value['spam']
     'egg'
 
+    Fields of a component may be declared, to be read and written as
+    attributes (see ComponentMeta):
+
+    >>> class Position(Component):
+    ...     fields = ('x', 'y')
+    >>> p = Position(1, y=2)
+    >>> p.x, p.value['y'], p.type is Position
+    (1, 2, True)
+    >>> p.value = {'x': 3, 'y': 4}
+    >>> dict(p.value) == {'x': 3, 'y': 4}
+    True
+
     """
+    __slots__ = ('value',)
+    fields = None
 
     def __init__(self, value):
         self.value = value
-        self.type = self.__class__
+
+
+def _init_fields(self, *args, **kwargs):
+    """Set the declared fields of a component."""
+    fields = self.fields
+    if len(args) == 1 and not kwargs and len(fields) != 1 and\
+            isinstance(args[0], (dict, Mapping)):
+        kwargs = args[0]
+        args = ()
+    if len(kwargs) == len(fields) and not args:
+        try:
+            args = [kwargs[field] for field in fields]
+            kwargs = {}
+        except KeyError:
+            pass
+    if len(args) != len(fields) or kwargs:
+        args = _field_values(self.type, args, kwargs)
+
+    for field, value in zip(fields, args):
+        setattr(self, field, value)
+
+
+def _field_values(component_type, args, kwargs):
+    """Return the values of fields given by position and name, in order."""
+    fields = component_type.fields
+    if len(args) > len(fields):
+        raise TypeError('{0} has {1} fields, {2} given'.format(
+            component_type.__name__, len(fields), len(args)
+        ))
+
+    values = dict(zip(fields, args))
+    for field, value in kwargs.items():
+        if field not in fields or field in values:
+            raise TypeError('Unexpected or duplicated field {0}'.format(
+                field
+            ))
+        values[field] = value
+    missing = [field for field in fields if field not in values]
+    if missing:
+        raise TypeError('Missing fields of {0}: {1}'.format(
+            component_type.__name__, ', '.join(missing)
+        ))
+    return [values[field] for field in fields]
+
+
+def _get_fields(self):
+    return FieldView(self, self.fields)
+
+
+def _set_fields(self, value):
+    _init_fields(self, **value)
+
+
+class Tag(Component):
+    """A Component without data, only marking entities.
+
+    Tags are stored in a TagSet (one bit per entity) instead of being kept
+    with the other components of entities. All the instances of a tag type
+    are the same object.
+
+    Example:
+
+    >>> class Enemy(Tag):
+    ...     pass
+    >>> Enemy() is Enemy(), Enemy().value, Enemy().type is Enemy
+    (True, None, True)
+
+    """
+    value = None
+
+    def __new__(cls):
+        instance = cls.__dict__.get('instance')
+        if instance is None:
+            instance = object.__new__(cls)
+            cls.instance = instance
+        return instance
+
+    def __init__(self):
+        pass
+
+
+class FieldView(MutableMapping):
+    """Give a dict-like access to the fields of a component.
+
+    It is used as the ``value`` of components declaring their fields so code
+    written for dict values (``component.value['x']``) keeps working. Reading
+    or writing a key reads or writes the corresponding attribute.
+
+    """
+    __slots__ = ('component', 'fields')
+
+    def __init__(self, component, fields):
+        """Initialize a field view.
+
+        Args:
+          component (Component): the component to access.
+          fields (tuple of str): the names of the fields of the component.
+
+        """
+        self.component = component
+        self.fields = fields
+
+    def __getitem__(self, field):
+        if field not in self.fields:
+            raise KeyError(field)
+        return getattr(self.component, field)
+
+    def __setitem__(self, field, value):
+        if field not in self.fields:
+            raise KeyError(field)
+        setattr(self.component, field, value)
+
+    def __delitem__(self, field):
+        raise TypeError('Fields of a component cannot be deleted')
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
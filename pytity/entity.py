@@ -1,13 +1,35 @@
 # -*- coding: utf-8 -*-
 
 
+INDEX_BITS = 32
+INDEX_MASK = (1 << INDEX_BITS) - 1
+
+
 class Entity(int):
     """Represent a container of components.
 
     An Entity is only an identifier to which components are added. So it is an
     integer with some specific methods to facilitate the process.
 
+    The identifier packs an index in its INDEX_BITS lower bits and a
+    generation in the higher ones. Indexes are reused by the manager once
+    entities are killed, the generation tells apart the successive entities
+    using the same index.
+
+    An Entity is as small as an int: its manager is not stored in the
+    instance but in a class attribute of a subclass specific to each manager
+    (see Entity.bind()).
+
+    Example:
+
+    >>> e = Entity((2 << INDEX_BITS) | 5)
+    >>> e.index, e.generation
+    (5, 2)
+
     """
+    __slots__ = ()
+    manager = None
+
     def __new__(cls, value, manager=None):
         """Create a new Entity (int).
 
@@ -23,9 +45,48 @@ class Entity(int):
           An Entity object.
 
         """
-        cls.manager = manager
+        if manager is not None and cls.manager is not manager:
+            cls = manager.entity_class
         return int.__new__(cls, value)
 
+    @classmethod
+    def bind(cls, manager):
+        """Return an Entity class attached to a manager.
+
+        Args:
+          manager (Manager): the manager of the entities of the new class.
+
+        Returns:
+          A subclass of cls whose ``manager`` attribute is the given manager.
+
+        Example:
+
+        >>> from pytity.manager import Manager
+        >>> m = Manager()
+        >>> e = Entity.bind(m)(42)
+        >>> e.manager is m and isinstance(e, Entity)
+        True
+
+        """
+        return type(cls.__name__, (cls,), {
+            '__slots__': (),
+            'manager': manager,
+        })
+
+    def __reduce__(self):
+        # Classes bound to a manager cannot be pickled, entity is unbound.
+        return (Entity, (int(self),))
+
+    @property
+    def index(self):
+        """The index of the entity, unique among living entities."""
+        return self & INDEX_MASK
+
+    @property
+    def generation(self):
+        """The number of times the index has been reused."""
+        return self >> INDEX_BITS
+
     def add_component(self, component):
         """Set a component to the entity.
 
@@ -41,6 +102,22 @@ class Entity(int):
         """
         self.manager.add_component(self, component)
 
+    def remove_component(self, component_type):
+        """Remove a component from the entity.
+
+        Entity must be attached to a manager to use this method. This method
+        is only a shortcut for manager.remove_component(entity,
+        component_type).
+
+        Args:
+          component_type (class): the type of the component to remove.
+
+        Raises:
+          AttributeError if manager has not been set.
+
+        """
+        self.manager.remove_component(self, component_type)
+
     def get_component(self, component_type):
         """Get a component from the entity.
 
@@ -58,3 +135,19 @@ class Entity(int):
 
         """
         return self.manager.get_component(self, component_type)
+
+    def mark_changed(self, component_type):
+        """Record that a component of the entity has been modified.
+
+        Entity must be attached to a manager to use this method. This method
+        is only a shortcut for manager.mark_changed(entity, component_type).
+
+        Args:
+          component_type (class): the type of the modified component.
+
+        Raises:
+          AttributeError if manager has not been set.
+          ValueError if the entity does not have a component of this type.
+
+        """
+        self.manager.mark_changed(self, component_type)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+
+class FixedStepRunner(object):
+    """Update a manager with a fixed step, whatever the frame time is.
+
+    The time elapsed between frames is accumulated and the manager is
+    updated once per full step in it. The number of updates per frame is
+    capped: if the simulation cannot keep up, the time of the skipped steps
+    is dropped instead of accumulating forever. After the updates,
+    Manager.interpolate() is called with the part of a step left in the
+    accumulator, so processors can render the entities between two steps.
+
+    Example:
+
+    >>> from pytity.manager import Manager
+    >>> runner = FixedStepRunner(Manager(), step=0.25)
+    >>> runner.advance(0.625), runner.alpha
+    (2, 0.5)
+
+    """
+    def __init__(self, manager, step=1.0 / 60, max_steps=5,
+                 clock=time.perf_counter, sleep=time.sleep):
+        """Initialize a runner.
+
+        Args:
+          manager (Manager): the manager to update.
+          step (float): the delta of each update, in seconds.
+          max_steps (int): the maximum number of updates per frame.
+          clock (callable): returns the current time in seconds.
+          sleep (callable): waits for a number of seconds.
+
+        """
+        self.manager = manager
+        self.step = step
+        self.max_steps = max_steps
+        self.clock = clock
+        self.sleep = sleep
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        # Number of steps dropped because of the max_steps cap.
+        self.dropped_steps = 0
+        self.running = False
+
+    def advance(self, elapsed):
+        """Update the manager for the time elapsed since the last frame.
+
+        Args:
+          elapsed (float): the time elapsed since the last call, in seconds.
+
+        Returns:
+          The number of updates done.
+
+        """
+        self.accumulator += elapsed
+        steps = 0
+        while self.accumulator >= self.step and steps < self.max_steps:
+            self.manager.update(self.step)
+            self.accumulator -= self.step
+            steps += 1
+
+        if self.accumulator >= self.step:
+            dropped = int(self.accumulator // self.step)
+            self.dropped_steps += dropped
+            self.accumulator -= dropped * self.step
+
+        self.alpha = self.accumulator / self.step
+        self.manager.interpolate(self.alpha)
+        return steps
+
+    def run(self, frame_rate=None):
+        """Advance the manager in a loop, until stop() is called.
+
+        Args:
+          frame_rate (float|None): the maximum number of frames per second.
+          The runner sleeps between frames to respect it. If it is None,
+          frames are run as fast as possible.
+
+        """
+        self.running = True
+        previous = self.clock()
+        while self.running:
+            now = self.clock()
+            self.advance(now - previous)
+            previous = now
+
+            if frame_rate is not None:
+                remaining = previous + 1.0 / frame_rate - self.clock()
+                if remaining > 0:
+                    self.sleep(remaining)
+
+    def stop(self):
+        """Stop the loop of run() after the current frame."""
+        self.running = False
@@ -1,20 +1,92 @@
 # -*- coding: utf-8 -*-
 
-from pytity.entity import Entity
+from collections import deque, OrderedDict
+from collections.abc import Mapping
+from threading import Lock
+from time import perf_counter
+
+from pytity.command import CommandBuffer
+from pytity.component import Tag
+from pytity.entity import Entity, INDEX_BITS, INDEX_MASK
+from pytity.query import Query, components_getter
+from pytity.scheduler import Scheduler
+from pytity.snapshot import read_snapshot, write_snapshot
+from pytity.spatial import UniformGrid
+from pytity.stats import PHASES
+from pytity.storage import SparseSet, TagSet
+from pytity.view import View
+
+
+# Tolerance on the elapsed time of processors with a rate, so a rate
+# multiple of the update frequency is not delayed by rounding errors.
+RATE_EPSILON = 1e-9
+
+
+def _check_values(number, component_type, values):
+    """Check there is one value per entity to build bulk components.
+
+    Args:
+      number (int): the number of entities.
+      component_type (class): the type of the components.
+      values (sequence|dict|None): the values, see
+      Manager.add_components_bulk(). None is accepted for tags.
+
+    Raises:
+      ValueError if the number of values is not the number of entities.
+
+    Example:
+
+    >>> from pytity.component import Component
+    >>> _check_values(2, Component, [1, 2, 3])
+    Traceback (most recent call last):
+      ...
+    ValueError: 3 values of Component given for 2 entities
+
+    """
+    if values is None:
+        return
+    columns = values.values() if isinstance(values, Mapping) else [values]
+    for column in columns:
+        if len(column) != number:
+            raise ValueError(
+                '{0} values of {1} given for {2} entities'.format(
+                    len(column), component_type.__name__, number
+                )
+            )
 
 
 class Manager(object):
     """Store and manage different objects of the entity system."""
     def __init__(self):
         self.component_store = {}
+        self.tag_stores = {}
         self.processor_store = []
+        self.scheduler = Scheduler()
+        self.stats = None
         self.entity_store = {}
         self.created_entities = 0
+        self.generations = [0]
+        self.free_indices = deque()
+        self.entity_class = Entity.bind(self)
+        self.view_store = {}
+        self.view_index = {}
+        self.change_counter = 0
+        # Processors run concurrently (see ParallelScheduler) may mark
+        # changes at the same time.
+        self.change_lock = Lock()
+        self.change_store = {}
+        self.removal_store = {}
+        self.spatial_store = {}
+        self.commands = CommandBuffer(self)
+        self.flush_between_processors = True
 
     def create_entity(self):
         """Create, store and return an entity.
 
-        Entity is calculated by incrementing the number of created entities.
+        The identifier of an entity packs an index and a generation (see
+        Entity). Index of a killed entity is reused, with a new generation,
+        once all the other free indexes have been reused. Otherwise, index is
+        calculated by incrementing the number of created entities.
 
         Returns:
           An Entity (int) greater than zero.
@@ -27,18 +99,99 @@ class Manager(object):
         True
 
         """
-        self.created_entities += 1
-        entity = Entity(self.created_entities, self)
+        entity = self.entity_class(self._allocate())
         self.entity_store[entity] = {}
         return entity
 
+    def _allocate(self):
+        """Return a new entity identifier, reusing a free index if any."""
+        if self.free_indices:
+            index = self.free_indices.popleft()
+        else:
+            self.created_entities += 1
+            index = self.created_entities
+            self.generations.append(0)
+        return (self.generations[index] << INDEX_BITS) | index
+
+    def create_entities(self, number, components=None):
+        """Create, store and return several entities at once.
+
+        Identifiers and storage are allocated in one pass, then each component
+        type is added with add_components_bulk(). It is much faster than
+        calling create_entity() and add_component() in a loop.
+
+        Args:
+          number (int): the number of entities to create.
+          components (dict|None): values of the components to add, by
+          component type. Each value is a sequence of ``number`` values (see
+          add_components_bulk()).
+
+        Returns:
+          A list of Entity.
+
+        Raises:
+          ValueError if there is not one value per entity, no entity is
+          created then.
+
+        Example:
+
+        >>> from pytity.component import Component
+        >>> m = Manager()
+        >>> entities = m.create_entities(3, components={Component: 'abc'})
+        >>> [e.get_component(Component).value for e in entities]
+        ['a', 'b', 'c']
+
+        """
+        for component_type, values in (components or {}).items():
+            _check_values(number, component_type, values)
+
+        reused = min(number, len(self.free_indices))
+        entity_class = self.entity_class
+        entities = [entity_class(self._allocate()) for i in range(reused)]
+
+        first = self.created_entities + 1
+        self.created_entities += number - reused
+        self.generations.extend([0] * (number - reused))
+        entities.extend(
+            entity_class(index)
+            for index in range(first, self.created_entities + 1)
+        )
+        self.store_entities(entities)
+
+        for component_type, values in (components or {}).items():
+            self.add_components_bulk(entities, component_type, values)
+        return entities
+
+    def reserve_entity(self):
+        """Return a new entity identifier without storing the entity.
+
+        The entity does not exist until it is stored with store_entities().
+        It is used by CommandBuffer to return entities created during an
+        update.
+
+        Returns:
+          An Entity (int) greater than zero.
+
+        """
+        return self.entity_class(self._allocate())
+
+    def store_entities(self, entities):
+        """Store entities reserved with reserve_entity(), without components.
+
+        Args:
+          entities (list of Entity): the entities to store.
+
+        """
+        self.entity_store.update((entity, {}) for entity in entities)
+
     def kill_entity(self, entity):
         """Kill an entity in this manager.
 
         Killing an entity means all its components are destroyed and its
-        identifier could be reused later by using create_entity() method.
-        After killing, manager entity add_component and get_component() are not
-        usable anymore.
+        index will be reused later by create_entity() method, with a new
+        generation so the killed identifier stays invalid.
+        After killing, add_component() raises a ValueError and get_component()
+        returns None for this entity.
 
         If entity does not exist, nothing happens.
 
@@ -61,19 +214,120 @@ class Manager(object):
         >>> e.add_component(c)
         Traceback (most recent call last):
             ...
-        AttributeError: 'NoneType' object has no attribute 'add_component'
+        ValueError: Entity 1 does not exist
 
         """
         # Entity doesn't exist, do nothing
         if entity not in self.entity_store:
             raise ValueError('Entity {0} does not exist'.format(entity))
 
-        for component_type in self.entity_store[entity]:
-            self.component_store[component_type].remove(entity)
+        for component_type, component in self.entity_store[entity].items():
+            self.component_store[component_type].detach(entity, component)
+            self._component_removed(entity, component_type)
+        for component_type, store in self.tag_stores.items():
+            if entity in store:
+                store.discard(entity)
+                self._component_removed(entity, component_type)
 
-        entity.manager = None
         del self.entity_store[entity]
 
+        index = entity & INDEX_MASK
+        self.generations[index] += 1
+        self.free_indices.append(index)
+
+    def clear(self):
+        """Kill all the entities at once and reset identifiers.
+
+        Component stores and views are dropped: views previously returned by
+        view() are no longer updated. Processors and tracked component types
+        are kept.
+
+        """
+        self.component_store = {}
+        self.tag_stores = {}
+        self.entity_store = {}
+        self.created_entities = 0
+        self.generations = [0]
+        self.free_indices = deque()
+        self.view_store = {}
+        self.view_index = {}
+        for changes in self.change_store.values():
+            changes.clear()
+        for removals in self.removal_store.values():
+            removals.clear()
+        for index in self.spatial_store.values():
+            index.clear()
+        self.commands.clear()
+
+    def snapshot(self):
+        """Return the state of the manager in a compact binary format.
+
+        Entities, components, identifier allocator and change counter are
+        saved, processors are not. See pytity.snapshot for the format.
+
+        Returns:
+          A bytes object, to give to restore().
+
+        Example:
+
+        >>> from pytity.component import Component
+        >>> m = Manager()
+        >>> e = m.create_entity()
+        >>> e.add_component(Component('spam'))
+        >>> data = m.snapshot()
+        >>> m2 = Manager()
+        >>> m2.restore(data)
+        >>> m2.get_component(e, Component).value
+        'spam'
+
+        """
+        return write_snapshot(self)
+
+    def restore(self, data, component_types=None):
+        """Replace the state of the manager by a snapshot.
+
+        All the entities of the manager are killed first (see clear()).
+
+        Args:
+          data (bytes-like): a snapshot returned by snapshot(). It may be a
+          memory-mapped file, arrays are read in place.
+          component_types (list of classes|None): component types to use
+          instead of importing them by name.
+
+        Raises:
+          SnapshotError if data is not a valid snapshot.
+
+        """
+        read_snapshot(self, data, component_types)
+
+    def is_alive(self, entity):
+        """Return whether an entity identifier is still valid.
+
+        It only compares the generation of the identifier to the current one
+        of its index, so it is done in constant time.
+
+        Args:
+          entity (int): an identifier returned by the manager.
+
+        Returns:
+          True if the entity exists in the manager, False otherwise.
+
+        Example:
+
+        >>> m = Manager()
+        >>> e = m.create_entity()
+        >>> m.kill_entity(e)
+        >>> e2 = m.create_entity()
+        >>> m.is_alive(e), m.is_alive(e2), e.index == e2.index
+        (False, True, True)
+
+        """
+        index = entity & INDEX_MASK
+        return (
+            0 < index <= self.created_entities and
+            self.generations[index] == entity >> INDEX_BITS
+        )
+
     def entities(self):
         """Return a generator of entities.
 
@@ -126,16 +380,20 @@ class Manager(object):
         for entity in self.component_store[component_type]:
             yield entity
 
-    def entities_by_types(self, component_types):
+    def entities_by_types(self, component_types, without=None):
         """Return a generator of entities for given component types.
 
         Note that returned entities contain all the specified component types.
         If no types or one of them does not exist in manager, iterator is
-        stopped immediately.
+        stopped immediately. The order of the types does not matter: the
+        smallest store is iterated and the other ones are probed (see
+        Query).
 
         Args:
           component_types (list of classes): is a list of component types to
           filter.
+          without (list of classes|None): component types the entities must
+          not have.
 
         Returns:
           A generator of entities having the given component types.
@@ -155,26 +413,58 @@ class Manager(object):
         0
 
         """
+        for entity in Query(self, component_types, without):
+            yield entity
 
-        if len(component_types) == 0:
-            # No type? We return nothing!
-            return
+    def query(self, component_types, without=None, optional=None):
+        """Return a Query of the entities having given component types.
 
-        for component_type in component_types:
-            if component_type not in self.component_store:
-                # One of the component type does not exist? It means no
-                # entity can have this type and so we have to return nothing.
-                return
+        Args:
+          component_types (list of classes): the types entities must have.
+          without (list of classes|None): the types entities must not have.
+          optional (list of classes|None): types whose components are
+          returned by Query.rows() when entities have them.
 
-        first_type = component_types[0]
-        entities = set(self.component_store[first_type])
-        for component_type in component_types[1:]:
-            entities = entities.intersection(
-                self.component_store[component_type]
-            )
+        Returns:
+          A Query, iterable several times.
 
-        for entity in entities:
-            yield entity
+        """
+        return Query(self, component_types, without, optional)
+
+    def join(self, *component_types, without=None):
+        """Return a generator of entities with their components.
+
+        Entities are read from the cached view of the types (see view()) and
+        their components are resolved at once from the storage, which is
+        much faster than calling get_component() for each of them.
+
+        Args:
+          *component_types (classes): the component types to join.
+          without (list of classes|None): component types the entities must
+          not have.
+
+        Returns:
+          A generator of (entity, component, ...) tuples, with a component
+          per type, in the given order.
+
+        Example:
+
+        >>> from pytity.component import Component
+        >>> class Speed(Component):
+        ...     pass
+        >>> m = Manager()
+        >>> e = m.create_entity()
+        >>> e.add_component(Component('spam'))
+        >>> e.add_component(Speed(42))
+        >>> [(c.value, s.value) for e, c, s in m.join(Component, Speed)]
+        [('spam', 42)]
+
+        """
+        view = self.view(component_types, without)
+        entity_store = self.entity_store
+        get = components_getter(component_types, self.tag_stores)
+        for entity in view:
+            yield (entity,) + get(entity_store[entity])
 
     def init_component(self, component_type):
         """Init the storage for a specific component type.
@@ -186,8 +476,19 @@ class Manager(object):
           initialize.
 
         """
-        if component_type not in self.component_store:
-            self.component_store[component_type] = []
+        if component_type in self.component_store:
+            return
+
+        # A component type may provide its own storage (see ArrayComponent).
+        create_store = getattr(component_type, 'create_store', None)
+        if issubclass(component_type, Tag):
+            store = TagSet(self.generations, self.entity_class)
+            self.component_store[component_type] = store
+            self.tag_stores[component_type] = store
+        elif create_store is not None:
+            self.component_store[component_type] = create_store()
+        else:
+            self.component_store[component_type] = SparseSet()
 
     def components_by_type(self, component_type):
         """Return a generator of component for a given component type.
@@ -210,6 +511,11 @@ class Manager(object):
         True
 
         """
+        if component_type in self.tag_stores:
+            for entity in self.entities_by_type(component_type):
+                yield component_type()
+            return
+
         for entity in self.entities_by_type(component_type):
             yield self.entity_store[entity][component_type]
 
@@ -217,18 +523,324 @@ class Manager(object):
         """Set a component to an entity.
 
         If entity doesn't have the corresponding component, it is added.
+        Otherwise the previous component is replaced. In both cases, the
+        component is marked as changed (see mark_changed()).
         If type of the component has not been initialized, it is automatically.
 
         Args:
           entity (Entity): the entity on which we set the component.
           component (Component): the component to attach to the entity.
 
+        Raises:
+          ValueError if entity does not exist.
+
         """
         if component.type not in self.component_store:
             self.init_component(component.type)
 
-        self.component_store[component.type].append(entity)
-        self.entity_store[entity][component.type] = component
+        components = self.entity_store.get(entity)
+        if components is None:
+            raise ValueError('Entity {0} does not exist'.format(entity))
+        if component.type in self.tag_stores:
+            self._add_tags([entity], component.type)
+            return
+
+        is_new = component.type not in components
+        # The store may reference a copy of the component (see
+        # ComponentArray.attach()).
+        component = self.component_store[component.type].attach(
+            entity, component
+        )
+        components[component.type] = component
+        if is_new:
+            self._component_added(entity, component.type)
+        self.mark_changed(entity, component.type)
+
+    def remove_component(self, entity, component_type):
+        """Remove the component of a given type from an entity.
+
+        Stores and views are updated in place, so removing a component is
+        done in constant time. If entity does not have such a component,
+        nothing happens.
+
+        Args:
+          entity (Entity): the entity from which we remove the component.
+          component_type (class): the type of the component to remove.
+
+        Raises:
+          ValueError if entity does not exist.
+
+        Example:
+
+        >>> from pytity.component import Component
+        >>> m = Manager()
+        >>> e = m.create_entity()
+        >>> e.add_component(Component(42))
+        >>> m.remove_component(e, Component)
+        >>> m.get_component(e, Component) is None
+        True
+        >>> e in m.view([Component])
+        False
+
+        """
+        components = self.entity_store.get(entity)
+        if components is None:
+            raise ValueError('Entity {0} does not exist'.format(entity))
+        if component_type in self.tag_stores:
+            self._remove_tag(entity, component_type)
+            return
+        if component_type not in components:
+            return
+
+        component = components.pop(component_type)
+        self.component_store[component_type].detach(entity, component)
+        self._component_removed(entity, component_type)
+
+    def add_components_bulk(self, entities, component_type, values):
+        """Set a component of the same type to several entities.
+
+        Components are built from the values and the store of the component
+        type is updated once for the whole batch.
+
+        Args:
+          entities (list of Entity): the entities on which we set components.
+          component_type (class): the type of the components to create.
+          values (sequence): one value per entity, passed to the component
+          constructor. ArrayComponent types also accept a dict of arrays by
+          field name.
+
+        Raises:
+          ValueError if there is not one value per entity. The components are
+          built before any store is changed, so no entity is left half set if
+          the constructor raises an error either.
+
+        Example:
+
+        >>> from pytity.component import Component
+        >>> m = Manager()
+        >>> entities = [m.create_entity(), m.create_entity()]
+        >>> m.add_components_bulk(entities, Component, [4, 2])
+        >>> [c.value for c in m.components_by_type(Component)]
+        [4, 2]
+
+        """
+        _check_values(len(entities), component_type, values)
+        self.init_component(component_type)
+        if component_type in self.tag_stores:
+            self._add_tags(entities, component_type)
+            return
+
+        store = self.component_store[component_type]
+        components = store.attach_bulk(entities, component_type, values)
+        self._components_set(entities, component_type, components)
+
+    def add_components(self, entities, components):
+        """Set components of the same type to several entities.
+
+        It is the same as add_components_bulk(), for components which are
+        already built.
+
+        Args:
+          entities (list of Entity): the entities on which we set components.
+          components (list of Component): one component per entity, all of
+          the same type.
+
+        Example:
+
+        >>> from pytity.component import Component
+        >>> m = Manager()
+        >>> entities = [m.create_entity(), m.create_entity()]
+        >>> m.add_components(entities, [Component(4), Component(2)])
+        >>> [c.value for c in m.components_by_type(Component)]
+        [4, 2]
+
+        """
+        if not components:
+            return
+
+        component_type = components[0].type
+        self.init_component(component_type)
+        if component_type in self.tag_stores:
+            self._add_tags(entities, component_type)
+            return
+
+        store = self.component_store[component_type]
+        components = [
+            store.attach(entity, component)
+            for entity, component in zip(entities, components)
+        ]
+        self._components_set(entities, component_type, components)
+
+    def _add_tags(self, entities, component_type):
+        """Set a tag to entities, tags are only stored in their TagSet."""
+        store = self.tag_stores[component_type]
+        added = [entity for entity in entities if entity not in store]
+        store.extend(added)
+        self._components_added(added, component_type)
+
+        if component_type in self.change_store:
+            for entity in entities:
+                self._record_change(entity, component_type)
+
+    def _remove_tag(self, entity, component_type):
+        """Remove a tag from an entity if it has it."""
+        store = self.tag_stores[component_type]
+        if entity in store:
+            store.discard(entity)
+            self._component_removed(entity, component_type)
+
+    def _components_set(self, entities, component_type, components):
+        """Reference components stored by type in the entity store."""
+        added = []
+        for entity, component in zip(entities, components):
+            entity_components = self.entity_store[entity]
+            if component_type not in entity_components:
+                added.append(entity)
+            entity_components[component_type] = component
+        self._components_added(added, component_type)
+
+        index = self.spatial_store.get(component_type)
+        if index is not None:
+            for entity, component in zip(entities, components):
+                index.update(entity, component)
+        if component_type in self.change_store:
+            for entity in entities:
+                self._record_change(entity, component_type)
+
+    def track_changes(self, component_type, removals=False):
+        """Start recording the changes of a component type.
+
+        Changes of a component type are only recorded once this method has
+        been called, so untracked types cost nothing. A change is recorded
+        once per entity, the most recent one.
+
+        Args:
+          component_type (class): the type to track.
+          removals (bool): record the removals of components of the type too
+          (see removed_since()). They pile up until forget_removals() is
+          called, so only ask for them if something reads and forgets them,
+          like a Replicator.
+
+        """
+        if component_type not in self.change_store:
+            self.change_store[component_type] = OrderedDict()
+        if removals and component_type not in self.removal_store:
+            self.removal_store[component_type] = OrderedDict()
+
+    def mark_changed(self, entity, component_type):
+        """Record that the component of an entity has been modified.
+
+        Components are modified in place, so processors modifying a tracked
+        component must call this method (or Entity.mark_changed()). If the
+        type is not tracked, nothing is recorded. Changes are recorded under
+        a lock, so processors run concurrently by a ParallelScheduler can
+        mark changes at the same time.
+
+        Args:
+          entity (Entity): the entity whose component changed.
+          component_type (class): the type of the modified component.
+
+        Raises:
+          ValueError if the entity does not have a component of this type.
+
+        """
+        component = self.get_component(entity, component_type)
+        if component is None:
+            raise ValueError('Entity {0} has no {1} component'.format(
+                entity, component_type.__name__
+            ))
+
+        index = self.spatial_store.get(component_type)
+        if index is not None:
+            index.update(entity, component)
+        self._record_change(entity, component_type)
+
+    def _record_change(self, entity, component_type):
+        """Record a change of a component, if its type is tracked."""
+        changes = self.change_store.get(component_type)
+        if changes is None:
+            return
+
+        with self.change_lock:
+            self.change_counter += 1
+            if entity in changes:
+                changes.move_to_end(entity)
+            changes[entity] = self.change_counter
+
+    def changed_since(self, component_type, counter):
+        """Return a generator of entities whose component changed recently.
+
+        Args:
+          component_type (class): a tracked component type.
+          counter (int): a previous value of self.change_counter.
+
+        Returns:
+          A generator of the entities whose component has been marked as
+          changed after ``counter``, the most recent first.
+
+        Example:
+
+        >>> from pytity.component import Component
+        >>> m = Manager()
+        >>> m.track_changes(Component)
+        >>> e1, e2 = m.create_entities(2, components={Component: [1, 2]})
+        >>> counter = m.change_counter
+        >>> e1.mark_changed(Component)
+        >>> list(m.changed_since(Component, counter)) == [e1]
+        True
+
+        """
+        changes = self.change_store.get(component_type, {})
+        for entity in reversed(changes):
+            if changes[entity] <= counter:
+                return
+            yield entity
+
+    def removed_since(self, component_type, counter):
+        """Return a generator of entities which lost a component recently.
+
+        Killed entities lose all their components.
+
+        Args:
+          component_type (class): a component type whose removals are
+          tracked (see track_changes()).
+          counter (int): a previous value of self.change_counter.
+
+        Returns:
+          A generator of the entities whose component has been removed after
+          ``counter``, the most recent first.
+
+        Example:
+
+        >>> from pytity.component import Component
+        >>> m = Manager()
+        >>> m.track_changes(Component, removals=True)
+        >>> e1, e2 = m.create_entities(2, components={Component: [1, 2]})
+        >>> counter = m.change_counter
+        >>> m.kill_entity(e2)
+        >>> list(m.removed_since(Component, counter)) == [e2]
+        True
+
+        """
+        removals = self.removal_store.get(component_type, {})
+        for entity in reversed(removals):
+            if removals[entity] <= counter:
+                return
+            yield entity
+
+    def forget_removals(self, counter):
+        """Forget the removals recorded up to a counter.
+
+        Removals are kept until this method is called, so it must be called
+        once all the readers of removed_since() are past ``counter``.
+
+        Args:
+          counter (int): a previous value of self.change_counter.
+
+        """
+        for removals in self.removal_store.values():
+            while removals and next(iter(removals.values())) <= counter:
+                removals.popitem(last=False)
 
     def get_component(self, entity, component_type):
         """Return the component of a given entity.
@@ -258,11 +870,200 @@ class Manager(object):
         True
 
         """
-        if entity not in self.entity_store or\
-                component_type not in self.entity_store[entity]:
+        components = self.entity_store.get(entity)
+        if components is None:
             return None
 
-        return self.entity_store[entity][component_type]
+        component = components.get(component_type)
+        if component is None and component_type in self.tag_stores:
+            if entity in self.tag_stores[component_type]:
+                return component_type()
+        return component
+
+    def spatial_index(self, component_type, cell_size, position=None):
+        """Index the entities by the position stored in a component type.
+
+        The index is a UniformGrid kept up to date by the manager: entities
+        are moved in it when their component is set, and when it is marked
+        as changed (see mark_changed()). Processors moving entities must mark
+        their component as changed.
+
+        Args:
+          component_type (class): the position component type.
+          cell_size (float): the width of the cells of the grid, close to
+          the distance of the queries.
+          position (callable|None): returns the (x, y) position of a
+          component. By default, its x and y attributes.
+
+        Returns:
+          The UniformGrid.
+
+        Example:
+
+        >>> from pytity.component import Component
+        >>> class Position(Component):
+        ...     fields = ('x', 'y')
+        >>> m = Manager()
+        >>> grid = m.spatial_index(Position, 10)
+        >>> entities = m.create_entities(3, components={
+        ...     Position: [{'x': x, 'y': x} for x in (0, 3, 50)],
+        ... })
+        >>> sorted(m.query_radius(Position, 0, 0, 5)) == entities[:2]
+        True
+        >>> entities[2].get_component(Position).x = 1
+        >>> entities[2].mark_changed(Position)
+        >>> len(m.query_aabb(Position, 0, 0, 10, 10))
+        2
+
+        """
+        index = UniformGrid(cell_size, position)
+        for entity in self.entities_by_type(component_type):
+            index.update(entity, self.entity_store[entity][component_type])
+        self.spatial_store[component_type] = index
+        return index
+
+    def _spatial_index(self, component_type):
+        index = self.spatial_store.get(component_type)
+        if index is None:
+            raise ValueError('Component type {0} is not indexed'.format(
+                component_type.__name__
+            ))
+        return index
+
+    def query_radius(self, component_type, x, y, radius):
+        """Return the entities close to a point (see spatial_index()).
+
+        Args:
+          component_type (class): an indexed position component type.
+          x (float): the abscissa of the point.
+          y (float): the ordinate of the point.
+          radius (float): the maximum distance to the point.
+
+        Returns:
+          A list of entities.
+
+        Raises:
+          ValueError if the component type is not indexed.
+
+        """
+        return self._spatial_index(component_type).query_radius(x, y, radius)
+
+    def query_aabb(self, component_type, min_x, min_y, max_x, max_y):
+        """Return the entities inside a box (see spatial_index()).
+
+        Args:
+          component_type (class): an indexed position component type.
+          min_x, min_y (float): the lower corner of the box.
+          max_x, max_y (float): the upper corner of the box.
+
+        Returns:
+          A list of entities.
+
+        Raises:
+          ValueError if the component type is not indexed.
+
+        """
+        index = self._spatial_index(component_type)
+        return index.query_aabb(min_x, min_y, max_x, max_y)
+
+    def close_pairs(self, component_type, distance=None):
+        """Return a generator of the pairs of entities close to each other.
+
+        It is the broad phase of a collision detection: each pair of entities
+        at a distance lower than distance is generated once.
+
+        Args:
+          component_type (class): an indexed position component type.
+          distance (float|None): the maximum distance, the cell size of the
+          index by default.
+
+        Raises:
+          ValueError if the component type is not indexed.
+
+        """
+        return self._spatial_index(component_type).pairs(distance)
+
+    def view(self, component_types, without=None):
+        """Return the cached view of entities for given component types.
+
+        The view is created the first time it is requested, then it is kept up
+        to date each time a component is added or removed. It is the fastest
+        way to iterate several times over the same set of component types.
+
+        Args:
+          component_types (list of classes): the component types an entity
+          must have to be part of the view.
+          without (list of classes|None): the component types an entity must
+          not have to be part of the view.
+
+        Returns:
+          A View (iterable of entities).
+
+        Example:
+
+        >>> from pytity.component import Component
+        >>> m = Manager()
+        >>> e = m.create_entity()
+        >>> e.add_component(Component('spam'))
+        >>> v = m.view([Component])
+        >>> e in v and v is m.view([Component])
+        True
+
+        """
+        key = (frozenset(component_types), frozenset(without or ()))
+        view = self.view_store.get(key)
+        if view is None:
+            view = self._register_view(*key)
+        return view
+
+    def _register_view(self, component_types, without):
+        """Create, fill and index a view for a set of component types."""
+        for component_type in component_types | without:
+            self.init_component(component_type)
+
+        stores = [self.component_store[t] for t in component_types]
+        excluded = [self.component_store[t] for t in without]
+        view = View(component_types, stores, without, excluded)
+        view.extend(self.entities_by_types(list(component_types), without))
+
+        self.view_store[component_types, without] = view
+        if not component_types:
+            # A view without required types stays empty, like
+            # entities_by_types([]).
+            return view
+        for component_type in component_types | without:
+            self.view_index.setdefault(component_type, []).append(view)
+        return view
+
+    def _component_added(self, entity, component_type):
+        """Update the views after a component type is set to an entity."""
+        for view in self.view_index.get(component_type, ()):
+            view.refresh(entity)
+
+    def _components_added(self, entities, component_type):
+        """Update the views after a component type is set to entities."""
+        for entity in entities:
+            self._component_added(entity, component_type)
+
+    def _component_removed(self, entity, component_type):
+        """Update the views after a component type is removed."""
+        for view in self.view_index.get(component_type, ()):
+            view.removed(entity, component_type)
+
+        index = self.spatial_store.get(component_type)
+        if index is not None:
+            index.discard(entity)
+
+        changes = self.change_store.get(component_type)
+        if changes is None:
+            return
+        with self.change_lock:
+            changes.pop(entity, None)
+            removals = self.removal_store.get(component_type)
+            if removals is not None:
+                self.change_counter += 1
+                removals.pop(entity, None)
+                removals[entity] = self.change_counter
 
     def add_processor(self, processor):
         """Add a processor to the manager.
@@ -287,13 +1088,117 @@ class Manager(object):
         """Call ``update`` methods on all the registered processors.
 
         For each processor, ``pre_update``, ``update`` and ``post_update`` are
-        called.
+        called. Processors are run by self.scheduler, one after another by
+        default (see ParallelScheduler to run them concurrently).
+
+        Commands recorded in self.commands (see CommandBuffer) are flushed
+        after each processor, or only at the end of the update if
+        self.flush_between_processors is False.
+
+        Args:
+          delta (float): a delta of time since the last update call.
+
+        """
+        self.scheduler.run(self, delta)
+        self.commands.flush()
+
+    def update_async(self, delta):
+        """Call ``update`` methods on all the registered processors, in a
+        running asyncio event loop.
+
+        Processors may define ``pre_update``, ``update`` or ``post_update``
+        as coroutine functions (``async def``). Coroutine processors are
+        started in registration order and awaited concurrently, other
+        processors are run in order, each one after the coroutine processors
+        it conflicts with have finished (see pytity.aio.update()).
+
+        Args:
+          delta (float): a delta of time since the last update call.
+
+        Returns:
+          An awaitable, done when all the processors have been run.
+
+        Example:
+
+        >>> import asyncio
+        >>> m = Manager()
+        >>> asyncio.run(m.update_async(0.1))
+
+        """
+        # Imported here, so asyncio is only loaded by applications using it.
+        from pytity.aio import update
+        return update(self, delta)
+
+    def run_processor(self, processor, delta):
+        """Call ``update`` methods of a processor.
+
+        If processor.rate is set, the processor is updated zero, one or
+        several times, with a delta of 1 / rate (see Processor).
+
+        If self.stats is set (see StatsSink), each phase is measured and
+        recorded in it.
+
+        Args:
+          processor (Processor): the processor to run.
+          delta (float): a delta of time since the last update call.
+
+        """
+        for step in self.processor_steps(processor, delta):
+            self._run_processor(processor, step)
+
+    @staticmethod
+    def processor_steps(processor, delta):
+        """Return the deltas of the updates of a processor for a frame.
 
         Args:
+          processor (Processor): the processor to run.
           delta (float): a delta of time since the last update call.
 
+        Returns:
+          A list of deltas: [delta] if the processor has no rate, else as
+          many times 1 / rate as needed to consume the elapsed time.
+
+        """
+        rate = getattr(processor, 'rate', None)
+        if rate is None:
+            return [delta]
+
+        period = 1.0 / rate
+        processor.elapsed += delta
+        steps = []
+        while processor.elapsed >= period - RATE_EPSILON:
+            processor.elapsed -= period
+            steps.append(period)
+        return steps
+
+    def _run_processor(self, processor, delta):
+        if self.stats is not None:
+            self._run_processor_measured(processor, delta)
+            return
+
+        processor.pre_update(delta)
+        processor.update(delta)
+        processor.post_update(delta)
+
+    def interpolate(self, alpha):
+        """Call ``interpolate`` methods on all the registered processors.
+
+        Args:
+          alpha (float): the part of a step elapsed since the last update
+          (see FixedStepRunner).
+
         """
         for processor in self.processor_store:
-            processor.pre_update(delta)
-            processor.update(delta)
-            processor.post_update(delta)
+            processor.interpolate(alpha)
+
+    def _run_processor_measured(self, processor, delta):
+        """Call ``update`` methods of a processor and record their timing."""
+        for phase in PHASES:
+            start = perf_counter()
+            getattr(processor, phase)(delta)
+            duration = perf_counter() - start
+
+            visited = None
+            if phase == 'update':
+                visited = getattr(processor, 'last_visited', None)
+            self.stats.record(processor, phase, duration, visited)
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+
+import multiprocessing
+from multiprocessing import shared_memory
+
+from pytity.columnar import ColumnBatch, numpy
+from pytity.entity import Entity
+from pytity.processor import EntityProcessor
+
+
+# Offsets of arrays in shared memory are aligned on this number of bytes.
+ALIGNMENT = 16
+
+
+class SharedColumns(object):
+    """Field arrays of a component type, read and written by entity.
+
+    It is the store of the components bound in a worker process: arrays live
+    in shared memory and only the entities of the current chunk are indexed.
+
+    """
+    def __init__(self, columns, index):
+        """Initialize the columns.
+
+        Args:
+          columns (dict): field arrays by name.
+          index (dict): rows of the entities in the arrays.
+
+        """
+        self.columns = columns
+        self.index = index
+
+    def get(self, entity, field):
+        value = self.columns[field][self.index[entity]]
+        return value.item() if value.ndim == 0 else value
+
+    def set(self, entity, field, value):
+        self.columns[field][self.index[entity]] = value
+
+
+class ChunkManager(object):
+    """A manager giving access to the components of a chunk.
+
+    It replaces the manager of a ChunkedProcessor in worker processes. Only
+    get_component(), for the entities of the chunk, and mark_changed() are
+    available. Changes are recorded in self.marks, then marked again in the
+    manager of the processor once the chunk is updated.
+
+    """
+    def __init__(self, stores):
+        """Initialize the manager.
+
+        Args:
+          stores (dict): SharedColumns by component type.
+
+        """
+        self.stores = stores
+        self.entity_class = Entity.bind(self)
+        self.marks = []
+
+    def get_component(self, entity, component_type):
+        store = self.stores.get(component_type)
+        if store is None or entity not in store.index:
+            return None
+        return component_type.bound(store, entity)
+
+    def mark_changed(self, entity, component_type):
+        self.marks.append((int(entity), component_type))
+
+
+class ChunkedProcessor(EntityProcessor):
+    """An EntityProcessor calling update_entity() in several processes.
+
+    Matching entities are split in chunks of ``chunk_size`` entities and each
+    chunk is updated by a process of a multiprocessing pool. All the needed
+    types must be ArrayComponent types: their arrays are copied once in shared
+    memory, read and written there by the workers, then copied back.
+
+    In a worker, self.manager is a ChunkManager: update_entity() can only get
+    the components of the entities of its chunk and mark them as changed, it
+    must not create or kill entities nor add components. The processor is
+    pickled for each chunk, so its attributes must be picklable. If there is
+    only one chunk to update, update_entity() is called in the current
+    process.
+
+    As with EntityProcessor, ``changed`` restricts the update to the changed
+    entities and ``with_components`` gives the needed components to
+    update_entity(). Optional types are not supported: only the needed types
+    are copied in shared memory.
+
+    """
+    def __init__(self, needed=None, processes=None, chunk_size=1024,
+                 context=None, **kwargs):
+        """Initialize a chunked processor.
+
+        Args:
+          needed (list of classes|None): the needed ArrayComponent types.
+          processes (int|None): the number of worker processes.
+          chunk_size (int): the number of entities updated by a task.
+          context (str|None): the multiprocessing start method.
+          **kwargs: other arguments of EntityProcessor.
+
+        Raises:
+          ValueError if optional types are given.
+
+        """
+        if kwargs.get('optional'):
+            raise ValueError('ChunkedProcessor has no optional types')
+        EntityProcessor.__init__(self, needed=needed, **kwargs)
+        self.processes = processes
+        self.chunk_size = chunk_size
+        self.context = context
+        self.pool = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['manager'] = None
+        state['pool'] = None
+        return state
+
+    def _update_entities(self, delta, entities):
+        """Call update_entity() on chunks of entities in worker processes.
+
+        Changes marked by the workers are marked in the manager once all the
+        chunks are written back.
+
+        """
+        if len(entities) <= self.chunk_size:
+            EntityProcessor._update_entities(self, delta, entities)
+            return
+
+        stores = [self.manager.component_store[t] for t in self.needed]
+        batch = ColumnBatch(stores, entities)
+        layout, size = shared_layout(batch)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            marks = self._run_chunks(shm, layout, batch, delta)
+            batch.commit()
+        finally:
+            shm.close()
+            shm.unlink()
+
+        entity_class = self.manager.entity_class
+        for chunk_marks in marks:
+            for entity, component_type in chunk_marks:
+                self.manager.mark_changed(entity_class(entity), component_type)
+
+    def _run_chunks(self, shm, layout, batch, delta):
+        """Copy the batch in shared memory, run the chunks, copy it back.
+
+        Returns:
+          The list of changes marked by each chunk.
+
+        """
+        size = len(batch.entities)
+        ids, columns = shared_arrays(shm.buf, layout, size)
+        ids[...] = batch.entities
+        for shared, gathered in zip(columns, batch.columns):
+            for name, array in shared.items():
+                array[...] = gathered[name]
+
+        tasks = [
+            (self, shm.name, layout, size, start,
+             min(start + self.chunk_size, size), delta)
+            for start in range(0, size, self.chunk_size)
+        ]
+        marks = self.get_pool().map(update_chunk, tasks)
+
+        for shared, gathered in zip(columns, batch.columns):
+            for name, array in shared.items():
+                gathered[name][...] = array
+        return marks
+
+    def get_pool(self):
+        """Return the pool of worker processes, create it if needed."""
+        if self.pool is None:
+            context = multiprocessing.get_context(self.context)
+            self.pool = context.Pool(self.processes)
+        return self.pool
+
+    def close(self):
+        """Stop the worker processes."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+
+def shared_layout(batch):
+    """Compute where arrays of a batch are stored in shared memory.
+
+    Args:
+      batch (ColumnBatch): the arrays to store.
+
+    Returns:
+      A (layout, size) tuple. Layout is a list of (component type, fields)
+      where fields is a list of (name, dtype, shape, offset) and size is the
+      total size in bytes. Entity identifiers are stored at offset 0.
+
+    """
+    size = len(batch.entities)
+    offset = _aligned(size * numpy.dtype(numpy.int64).itemsize)
+    layout = []
+    for store, columns in zip(batch.stores, batch.columns):
+        fields = []
+        for name in store.fields:
+            array = columns[name]
+            fields.append((name, array.dtype.str, array.shape[1:], offset))
+            offset = _aligned(offset + array.nbytes)
+        layout.append((store.component_type, fields))
+    return layout, max(offset, 1)
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def shared_arrays(buffer, layout, size):
+    """Return the arrays stored in a shared memory buffer.
+
+    Args:
+      buffer (memoryview): the shared memory.
+      layout (list): the layout returned by shared_layout().
+      size (int): the number of entities.
+
+    Returns:
+      A (ids, columns) tuple: the array of entity identifiers and a list of
+      dicts of field arrays, one per component type of the layout.
+
+    """
+    ids = numpy.ndarray(size, dtype=numpy.int64, buffer=buffer)
+    columns = []
+    for component_type, fields in layout:
+        columns.append(dict(
+            (name, numpy.ndarray(
+                (size,) + shape, dtype=dtype, buffer=buffer, offset=offset
+            ))
+            for name, dtype, shape, offset in fields
+        ))
+    return ids, columns
+
+
+def update_chunk(task):
+    """Call update_entity() on a chunk of entities (in a worker process).
+
+    Args:
+      task (tuple): the processor, the name of the shared memory, its layout,
+      the number of entities, the first and last rows of the chunk and the
+      delta time.
+
+    Returns:
+      The list of (entity, component type) changes marked by the chunk.
+
+    """
+    processor, name, layout, size, start, end, delta = task
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+    try:
+        return _update_rows(processor, shm.buf, layout, size, start, end,
+                            delta)
+    finally:
+        shm.close()
+
+
+def _update_rows(processor, buffer, layout, size, start, end, delta):
+    ids, columns = shared_arrays(buffer, layout, size)
+    entities = ids[start:end].tolist()
+    index = dict((entity, start + i) for i, entity in enumerate(entities))
+    stores = dict(
+        (component_type, SharedColumns(arrays, index))
+        for (component_type, fields), arrays in zip(layout, columns)
+    )
+
+    manager = ChunkManager(stores)
+    processor.manager = manager
+    entity_class = manager.entity_class
+    if not processor.with_components:
+        for entity in entities:
+            processor.update_entity(delta, entity_class(entity))
+    else:
+        component_types = [component_type for component_type, _ in layout]
+        for entity in entities:
+            processor.update_entity(delta, entity_class(entity), *[
+                t.bound(stores[t], entity) for t in component_types
+            ])
+    processor.manager = None
+    return manager.marks
@@ -1,17 +1,58 @@
 # -*- coding: utf-8 -*-
 
+from pytity.columnar import ColumnBatch
+from pytity.query import components_getter, optional_component
+from pytity.view import View
+
 
 class Processor(object):
     """Contain the code necessary to handle a chunk of functionality."""
-    def __init__(self, needed=None):
+    def __init__(self, needed=None, reads=None, writes=None, rate=None):
         """Initialize a processor.
 
         Args:
           needed (list of str|None): a list of needed component types.
+          reads (list of classes|None): the component types read by the
+          processor. Default is the needed types.
+          writes (list of classes|None): the component types written by the
+          processor. Default is the needed types.
+          rate (float|None): the number of updates per second of the
+          processor, each one with a delta of 1 / rate. By default, the
+          processor is updated on each Manager.update() call.
 
         """
         self.manager = None
         self.needed = needed
+        # Number of entities visited by the last update, if known.
+        self.last_visited = None
+        self.reads = reads
+        self.writes = writes
+        self.rate = rate
+        # Time not yet consumed by updates, when rate is set.
+        self.elapsed = 0.0
+
+    def accesses(self):
+        """Return the component types read and written by the processor.
+
+        Processors whose accesses do not conflict can be run concurrently
+        (see ParallelScheduler).
+
+        Returns:
+          A (reads, writes) tuple of frozensets, or None if the processor may
+          access anything (nothing is declared and self.needed is None).
+
+        Example:
+
+        >>> p = Processor(needed=['position'], reads=['speed'])
+        >>> sorted(p.accesses()[0]), sorted(p.accesses()[1])
+        (['speed'], ['position'])
+
+        """
+        reads = self.reads if self.reads is not None else self.needed
+        writes = self.writes if self.writes is not None else self.needed
+        if reads is None or writes is None:
+            return None
+        return frozenset(reads), frozenset(writes)
 
     def register_to(self, manager):
         """Register a processor to a manager.
@@ -57,6 +98,18 @@ class Processor(object):
         """Do something after calling update()."""
         pass
 
+    def interpolate(self, alpha):
+        """Do something between two updates, e.g. render the entities.
+
+        It is called by Manager.interpolate(), see FixedStepRunner.
+
+        Args:
+          alpha (float): the part of a step elapsed since the last update,
+          between 0 and 1, to interpolate the state of the entities.
+
+        """
+        pass
+
 
 class EntityProcessor(Processor):
     """A helper class for processor which are called on a set of entities.
@@ -66,7 +119,78 @@ class EntityProcessor(Processor):
     components). If self.needed is None, update() is called for all the
     entities from the manager.
 
+    Entities are retrieved from a cached view (see Manager.view()) so
+    iterating over them does not rebuild anything from one frame to another.
+    Entities killed by update_entity() are skipped for the rest of the update.
+
+    If self.changed is set, update_entity() is only called on entities whose
+    components of these types have been marked as changed since the last
+    update (see Manager.mark_changed()). All the entities are updated the
+    first time.
+
+    Entities having a component of the self.excluded types are skipped, the
+    view filters them out. If self.with_components is True, the components
+    of the needed types are given to update_entity() after the entity, read
+    at once from the storage (see Manager.join()). Then come the components
+    of the self.optional types, None if the entity does not have them:
+
+    >>> from pytity.component import Component
+    >>> class Frozen(Component):
+    ...     pass
+    >>> class Show(EntityProcessor):
+    ...     def update_entity(self, delta, entity, frozen):
+    ...         print(entity.get_component(Component).value, frozen is None)
+    >>> from pytity.manager import Manager
+    >>> m = Manager()
+    >>> Show([Component], optional=[Frozen]).register_to(m)
+    >>> entities = m.create_entities(2, components={Component: ['a', 'b']})
+    >>> entities[0].add_component(Frozen(True))
+    >>> m.update(0.1)
+    b True
+    a False
+
     """
+    def __init__(self, needed=None, changed=None, excluded=None,
+                 optional=None, with_components=False, **kwargs):
+        """Initialize an entity processor.
+
+        Args:
+          needed (list of classes|None): a list of needed component types.
+          changed (list of classes|None): only update entities whose
+          components of these types changed since the last update.
+          excluded (list of classes|None): skip entities having components
+          of these types.
+          optional (list of classes|None): component types given to
+          update_entity() when entities have them, None otherwise.
+          with_components (bool): give the components of the needed types to
+          update_entity(), after the entity.
+          **kwargs: other arguments of Processor.
+
+        """
+        Processor.__init__(self, needed=needed, **kwargs)
+        self.changed = changed
+        self.excluded = excluded
+        self.optional = optional
+        self.with_components = with_components
+        self.last_change = None
+
+    def accesses(self):
+        """Return the component types read and written by the processor.
+
+        Optional component types are accessed like the needed ones, unless
+        reads and writes are declared.
+
+        """
+        accesses = Processor.accesses(self)
+        if accesses is None or not self.optional:
+            return accesses
+        reads, writes = accesses
+        if self.reads is None:
+            reads = reads | frozenset(self.optional)
+        if self.writes is None:
+            writes = writes | frozenset(self.optional)
+        return reads, writes
+
     def update(self, delta):
         """Call update_entity() on a list of entities.
 
@@ -83,13 +207,97 @@ class EntityProcessor(Processor):
           AttributeError if manager has not been set.
 
         """
-        if self.needed is not None:
-            iter_entities = self.manager.entities_by_types(self.needed)
+        entities = self._entities()
+        self.last_visited = len(entities)
+        if self.changed and self.last_change is None:
+            for component_type in self.changed:
+                self.manager.track_changes(component_type)
+
+        self._update_entities(delta, entities)
+
+        if self.changed:
+            self.last_change = self.manager.change_counter
+
+    def _update_entities(self, delta, entities):
+        """Call update_entity() on the entities returned by _entities()."""
+        if isinstance(entities, list):
+            # The list is built before the update: skip the entities killed
+            # meanwhile by update_entity().
+            entities = filter(self.manager.entity_store.__contains__, entities)
+
+        if self.with_components or self.optional:
+            self._update_components(delta, entities)
         else:
-            iter_entities = self.manager.entities()
+            for entity in entities:
+                self.update_entity(delta, entity)
+
+    def _entities(self):
+        """Return the entities to update, see update()."""
+        if self.changed and self.last_change is not None:
+            return self.changed_entities()
+        if self.needed is not None:
+            return self.manager.view(self.needed, self.excluded)
+        return self._unfiltered_entities()
 
-        for entity in iter_entities:
-            self.update_entity(delta, entity)
+    def changed_entities(self):
+        """Return the entities changed since the last update.
+
+        Returns:
+          A list of entities having the needed components and whose components
+          of the self.changed types have changed since the last update.
+
+        """
+        entities = set()
+        for component_type in self.changed:
+            entities.update(
+                self.manager.changed_since(component_type, self.last_change)
+            )
+
+        if self.needed is None:
+            excluded = self._excluded_stores()
+            return [
+                entity for entity in entities
+                if not any(entity in store for store in excluded)
+            ]
+
+        view = self.manager.view(self.needed, self.excluded)
+        return [entity for entity in entities if entity in view]
+
+    def _excluded_stores(self):
+        stores = self.manager.component_store
+        return [stores[t] for t in self.excluded or () if t in stores]
+
+    def _unfiltered_entities(self):
+        """Return the entities of the manager, without the excluded ones."""
+        excluded = self._excluded_stores()
+        if not excluded:
+            return list(self.manager.entity_store)
+        return [
+            entity for entity in self.manager.entities()
+            if not any(entity in store for store in excluded)
+        ]
+
+    def _update_components(self, delta, entities):
+        """Call update_entity() with the components of entities."""
+        manager = self.manager
+        update_entity = self.update_entity
+        needed = self.needed if self.with_components else None
+        if needed is not None and not self.optional and \
+                isinstance(entities, View):
+            for row in manager.join(*needed, without=self.excluded):
+                update_entity(delta, *row)
+            return
+
+        entity_store = manager.entity_store
+        tag_stores = manager.tag_stores
+        get = components_getter(needed or (), tag_stores)
+        optional = self.optional or ()
+        for entity in entities:
+            components = entity_store[entity]
+            update_entity(delta, entity, *(get(components) + tuple(
+                optional_component(entity, components, t, tag_stores)
+                for t in optional
+            )))
 
     def update_entity(self, delta, entity):
         """Update a given entity.
@@ -103,3 +311,51 @@ class EntityProcessor(Processor):
 
         """
         raise NotImplementedError()
+
+
+class VectorProcessor(Processor):
+    """A helper class for processor updating all their entities at once.
+
+    All the types in self.needed must be ArrayComponent types. update() calls
+    update_arrays() once with the field arrays of each needed type, aligned on
+    the entities having all of them. It is a good fit for NumPy vectorized
+    operations.
+
+    """
+    def update(self, delta):
+        """Call update_arrays() with the arrays of the needed components.
+
+        If no entity has all the needed components, update_arrays() is not
+        called.
+
+        Args:
+          delta (float): the delta time since the last call.
+
+        Raises:
+          AttributeError if manager has not been set.
+
+        """
+        view = self.manager.view(self.needed)
+        self.last_visited = len(view)
+        if len(view) == 0:
+            return
+
+        stores = [self.manager.component_store[t] for t in self.needed]
+        batch = ColumnBatch(stores, view)
+        self.update_arrays(delta, batch.entities, *batch.columns)
+        batch.commit()
+
+    def update_arrays(self, delta, entities, *columns):
+        """Update the given entities.
+
+        Args:
+          delta (float): the delta time since the last call.
+          entities (numpy.ndarray): the identifiers of the entities.
+          *columns (Columns): the field arrays of each needed component
+          type, in the order of self.needed.
+
+        Raises:
+          NotImplementedError if method has not been implemented.
+
+        """
+        raise NotImplementedError()
@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+
+"""
+Queries of the entities of a manager by component types.
+
+A Query does not depend on the order of the given types: its plan (see
+Query.plan()) iterates the smallest store and probes the other ones by
+membership, so asking for [Position, Boss] costs the number of bosses, not
+the number of positions.
+
+"""
+
+from functools import partial
+from itertools import filterfalse, islice
+from operator import itemgetter
+
+from pytity.storage import SparseSet, TagSet
+
+
+def _members(store):
+    """Return the fastest container to test the membership of a store."""
+    if isinstance(store, SparseSet):
+        # A dict lookup, without calling SparseSet.__contains__().
+        return store.index
+    return store
+
+
+def components_getter(component_types, tag_types):
+    """Return a function reading components from the dict of an entity.
+
+    The dicts are the values of Manager.entity_store. Tags are not stored
+    in them, their instance is returned instead.
+
+    Args:
+      component_types (list of classes): the types of the components.
+      tag_types (container of classes): the tag types.
+
+    Returns:
+      A function taking the dict of components of an entity and returning
+      the tuple of its components of the given types.
+
+    Example:
+
+    >>> get = components_getter([int, str], ())
+    >>> get({str: 'spam', int: 42})
+    (42, 'spam')
+
+    """
+    component_types = tuple(component_types)
+    if not component_types:
+        return lambda components: ()
+    if not any(t in tag_types for t in component_types):
+        if len(component_types) == 1:
+            getter = itemgetter(component_types[0])
+            return lambda components: (getter(components),)
+        # itemgetter() builds the tuple without running Python code.
+        return itemgetter(*component_types)
+
+    tags = dict((t, t()) for t in component_types if t in tag_types)
+    return lambda components: tuple(
+        tags[t] if t in tags else components[t] for t in component_types
+    )
+
+
+class Plan(object):
+    """The way a Query finds its entities.
+
+    Attributes:
+      driver (iterable): the entities to start from, the smallest store or
+      a cached view of the query.
+      probes (list): containers the entities must be in.
+      bits (bytes|None): the intersection of the tags the entities must
+      have, unless the driver is already this intersection.
+      excluded (list): containers the entities must not be in.
+      alive (callable|None): tests whether an entity of the driver is still
+      alive, if the driver is a list built beforehand.
+
+    """
+    def __init__(self, driver, probes, bits, excluded, alive=None):
+        self.driver = driver
+        self.probes = probes
+        self.bits = bits
+        self.excluded = excluded
+        self.alive = alive
+
+    def entities(self):
+        """Return an iterator of the entities matching the plan.
+
+        Entities are streamed from the driver and filtered one by one while
+        the iterator is consumed. Stores and views are not copied and skip
+        the entities killed during the iteration (see SparseSet).
+
+        """
+        # filter() with bound methods keeps the loops out of Python code.
+        entities = iter(self.driver)
+        if self.alive is not None:
+            entities = filter(self.alive, entities)
+        for members in self.probes:
+            entities = filter(members.__contains__, entities)
+        if self.bits is not None:
+            entities = filter(partial(TagSet.contains, self.bits), entities)
+        for members in self.excluded:
+            entities = filterfalse(members.__contains__, entities)
+        return entities
+
+
+class Query(object):
+    """The entities having all some component types, and none of others.
+
+    A query is lazy: entities are read when it is iterated, so it can be
+    kept and iterated several times, and they are streamed from the stores
+    instead of being collected in a set. Queries are immutable, where() and
+    select() return new queries.
+
+    Example:
+
+    >>> from pytity.component import Component
+    >>> from pytity.manager import Manager
+    >>> class Frozen(Component):
+    ...     pass
+    >>> m = Manager()
+    >>> entities = m.create_entities(3, components={Component: [1, 2, 3]})
+    >>> entities[0].add_component(Frozen(True))
+    >>> q = m.query([Component], without=[Frozen], optional=[Frozen])
+    >>> list(q) == entities[1:]
+    True
+    >>> [(c.value, frozen) for entity, c, frozen in q.rows()]
+    [(2, None), (3, None)]
+    >>> odd = q.where(lambda entity, c, frozen: c.value % 2)
+    >>> [row[1:] for row in odd.select((Component, 'value')).rows()]
+    [(3,)]
+    >>> q.count(), odd.count()
+    (2, 1)
+
+    """
+    def __init__(self, manager, component_types, without=None,
+                 optional=None, predicates=(), selection=None):
+        """Initialize a query.
+
+        Args:
+          manager (Manager): the queried manager.
+          component_types (list of classes): the types entities must have.
+          without (list of classes|None): the types entities must not have.
+          optional (list of classes|None): types whose components are
+          returned by rows() when entities have them, None otherwise.
+          predicates (tuple of callables): see where().
+          selection (tuple|None): see select().
+
+        """
+        self.manager = manager
+        self.component_types = tuple(component_types)
+        self.without = tuple(without or ())
+        self.optional = tuple(optional or ())
+        self.predicates = tuple(predicates)
+        self.selection = selection
+
+    def _derive(self, **changes):
+        """Return a copy of the query with some changed arguments."""
+        arguments = dict(
+            component_types=self.component_types, without=self.without,
+            optional=self.optional, predicates=self.predicates,
+            selection=self.selection,
+        )
+        arguments.update(changes)
+        return Query(self.manager, **arguments)
+
+    def where(self, predicate):
+        """Return a query keeping only the rows matching a predicate.
+
+        Args:
+          predicate (callable): called with the entity, its components of the
+          types of the query then of the optional types (see rows()). Rows
+          are kept if it returns a true value.
+
+        Returns:
+          A new Query.
+
+        """
+        return self._derive(predicates=self.predicates + (predicate,))
+
+    def select(self, *fields):
+        """Return a query whose rows only contain some fields.
+
+        Args:
+          *fields: component types of the query (or optional types), to get
+          components, or (component type, attribute name) tuples to get an
+          attribute of components.
+
+        Returns:
+          A new Query, whose rows are the entity followed by the fields.
+
+        Raises:
+          ValueError if a component type is not part of the query.
+
+        """
+        columns = self.component_types + self.optional
+        for field in fields:
+            component_type = field[0] if isinstance(field, tuple) else field
+            if component_type not in columns:
+                raise ValueError('{0} is not part of the query'.format(
+                    component_type.__name__
+                ))
+        return self._derive(selection=tuple(fields))
+
+    def plan(self):
+        """Return the Plan of the query with the current sizes of stores.
+
+        A view of the query cached by the manager (see Manager.view()) is
+        used as is. Otherwise, the smallest store drives the iteration. Tags
+        are intersected at once with a bitwise AND (see
+        TagSet.intersection()).
+
+        Returns:
+          A Plan, None if no entity can match.
+
+        """
+        view = self._cached_view()
+        if view is not None:
+            return Plan(view, [], None, [])
+
+        stores = self.manager.component_store
+        required = []
+        for component_type in self.component_types:
+            store = stores.get(component_type)
+            if store is None:
+                return None
+            required.append(store)
+        if not required:
+            return None
+
+        excluded = [
+            _members(stores[component_type])
+            for component_type in self.without if component_type in stores
+        ]
+        return self._plan_stores(required, excluded)
+
+    def _plan_stores(self, required, excluded):
+        tags = [store for store in required if isinstance(store, TagSet)]
+        others = sorted(
+            (store for store in required if not isinstance(store, TagSet)),
+            key=len
+        )
+        if not tags:
+            return Plan(others[0], [_members(s) for s in others[1:]], None,
+                        excluded)
+
+        bits = TagSet.intersection(tags) if len(tags) > 1 else tags[0].bits
+        if not others or min(map(len, tags)) < len(others[0]):
+            driver = tags[0].entities(bits)
+            # Killed entities have left the entity store, checking the
+            # generation of every entity in the tag set would be slower.
+            return Plan(driver, [_members(s) for s in others], None, excluded,
+                        self.manager.entity_store.__contains__)
+        return Plan(others[0], [_members(s) for s in others[1:]], bits,
+                    excluded)
+
+    def _cached_view(self):
+        if not self.component_types:
+            return None
+        key = (frozenset(self.component_types), frozenset(self.without))
+        return self.manager.view_store.get(key)
+
+    def _entities(self):
+        plan = self.plan()
+        if plan is None:
+            return iter(())
+        return plan.entities()
+
+    def __iter__(self):
+        if not self.predicates:
+            return self._entities()
+        return (row[0] for row in self._rows())
+
+    def _rows(self):
+        """Return a generator of the full rows matching the predicates."""
+        entity_store = self.manager.entity_store
+        tag_stores = self.manager.tag_stores
+        get = components_getter(self.component_types, tag_stores)
+        optional = self.optional
+        predicates = self.predicates
+        for entity in self._entities():
+            components = entity_store[entity]
+            row = (entity,) + get(components)
+            if optional:
+                row += tuple(
+                    optional_component(entity, components, t, tag_stores)
+                    for t in optional
+                )
+            if all(predicate(*row) for predicate in predicates):
+                yield row
+
+    def rows(self):
+        """Return a generator of the entities with their components.
+
+        Returns:
+          A generator of tuples: the entity, its components of the types of
+          the query, then its components of the optional types (or None).
+          If select() has been called, the entity then the selected fields.
+
+        """
+        if self.selection is None:
+            return self._rows()
+        return map(self._projection(), self._rows())
+
+    def _projection(self):
+        """Return a function turning a full row in a selected row."""
+        columns = self.component_types + self.optional
+        getters = []
+        for field in self.selection:
+            if isinstance(field, tuple):
+                component_type, name = field
+                getters.append((columns.index(component_type) + 1, name))
+            else:
+                getters.append((columns.index(field) + 1, None))
+
+        def project(row):
+            return (row[0],) + tuple(
+                getattr(row[i], name) if name is not None else row[i]
+                for i, name in getters
+            )
+        return project
+
+    def chunks(self, size):
+        """Return a generator of lists of at most size rows (see rows()).
+
+        Rows are read while chunks are consumed, so a large query can be
+        handed to workers batch by batch.
+
+        Args:
+          size (int): the number of rows of the chunks, but the last one.
+
+        """
+        rows = self.rows()
+        chunk = list(islice(rows, size))
+        while chunk:
+            yield chunk
+            chunk = list(islice(rows, size))
+
+    def count(self):
+        """Return the number of entities matching the query.
+
+        It is done in constant time if the manager has a cached view of the
+        query (see Manager.view()) and there is no predicate. Otherwise,
+        entities are counted while streamed.
+
+        """
+        if not self.predicates:
+            view = self._cached_view()
+            if view is not None:
+                return len(view)
+        return sum(1 for entity in self)
+
+
+def optional_component(entity, components, component_type, tag_stores):
+    """Return the component of an entity if it has it, None otherwise.
+
+    Args:
+      entity (Entity): the entity.
+      components (dict): its components, from Manager.entity_store.
+      component_type (class): the type of the component.
+      tag_stores (dict): the tag sets of the manager.
+
+    """
+    if component_type in tag_stores:
+        if entity in tag_stores[component_type]:
+            return component_type()
+        return None
+    return components.get(component_type)
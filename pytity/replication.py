@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+
+"""
+Replication of a manager to others, by sending only what changed.
+
+A server Replicator encodes deltas: the components changed, the components
+removed and the entities destroyed since a tick (a value of the change
+counter of the manager). A client Replicator, built with the same component
+types, applies them to a mirror manager.
+
+A delta is a sequence of blocks, each one prefixed by its length (32 bits):
+
+- a header: the tick of the delta and the number of sections,
+- the identifiers of destroyed entities,
+- for each component type with removed components: its code (its position
+  in the list of replicated types) and the identifiers of entities,
+- for each component type with changed components: its code, the
+  identifiers of entities, then a block per field: a byte telling its
+  encoding (see COLUMN_CODES) followed by the encoded values. Components
+  with other attributes than their fields or value are pickled.
+
+Floats are sent as 64-bit floats unless a quantizer is set for the field
+(see Quantizer).
+
+"""
+
+from array import array
+import pickle
+import struct
+
+from pytity.component import Component, Tag
+from pytity.snapshot import Reader, Writer, decode_column, encode_column
+from pytity.entity import INDEX_BITS, INDEX_MASK
+
+
+LENGTH = struct.Struct('<I')
+HEADER = struct.Struct('<QHH')
+CODE = struct.Struct('<H')
+
+# Codes of the encodings of columns, the first byte of their block.
+COLUMN_CODES = {'d': b'd', 'q': b'q', 'pickle': b'p', 'quantized': b'z'}
+COLUMN_NAMES = dict((code, name) for name, code in COLUMN_CODES.items())
+
+
+class Quantizer(object):
+    """Encode floats as integers, with a fixed precision.
+
+    Any object with the same encode() and decode() methods can be used as a
+    quantizer.
+
+    Example:
+
+    >>> q = Quantizer(0.01)
+    >>> q.decode(q.encode([1.234, -5.0]))
+    [1.23, -5.0]
+
+    """
+    def __init__(self, step, code='i'):
+        """Initialize a quantizer.
+
+        Args:
+          step (float): the precision of the decoded values.
+          code (str): the array type code of the encoded integers, 'i' (32
+          bits) by default, 'h' for 16 bits.
+
+        """
+        self.step = step
+        self.code = code
+
+    def encode(self, values):
+        """Return the values as a bytes-like object."""
+        step = self.step
+        return array(self.code, [int(round(value / step)) for value in values])
+
+    def decode(self, data):
+        """Return the list of values encoded by encode()."""
+        step = self.step
+        values = memoryview(data).cast('B').cast(self.code)
+        return [round(value * step, 12) for value in values]
+
+
+def field_names(component_type):
+    """Return the names of the replicated attributes of a component type.
+
+    Returns:
+      A tuple of names, None if components are pickled as a whole.
+
+    """
+    if issubclass(component_type, Tag):
+        return ()
+    names = getattr(component_type, 'field_names', None)
+    if names is not None:
+        return names()
+    if component_type.fields:
+        return component_type.fields
+    if component_type.__init__ is Component.__init__:
+        return ('value',)
+    return None
+
+
+class Replicator(object):
+    """Encode the changes of a manager, or apply them to a mirror manager.
+
+    The manager tracks the changes of the replicated component types, so
+    processors must mark the components they modify (see
+    Manager.mark_changed()). A mirror manager must not create entities by
+    itself, its identifiers are the ones of the replicated manager.
+
+    Removals are recorded by the manager until forget() is called, with the
+    oldest tick known by the clients.
+
+    Example:
+
+    >>> from pytity.component import Component
+    >>> from pytity.manager import Manager
+    >>> server, client = Manager(), Manager()
+    >>> e = server.create_entity()
+    >>> e.add_component(Component('spam'))
+    >>> sender = Replicator(server, [Component])
+    >>> receiver = Replicator(client, [Component])
+    >>> tick = receiver.apply(sender.delta(0))
+    >>> client.get_component(e, Component).value
+    'spam'
+    >>> server.kill_entity(e)
+    >>> tick = receiver.apply(sender.delta(tick))
+    >>> list(client.entities())
+    []
+
+    """
+    def __init__(self, manager, component_types, quantizers=None):
+        """Initialize a replicator and track the changes of a manager.
+
+        Components existing before are marked as changed, so they are part
+        of the next delta.
+
+        Args:
+          manager (Manager): the replicated or mirror manager.
+          component_types (list of classes): the replicated types, in the
+          same order on both sides.
+          quantizers (dict|None): quantizers by (component type, field name),
+          the name of the field of components without declared fields being
+          'value'.
+
+        """
+        self.manager = manager
+        self.component_types = list(component_types)
+        self.codes = dict(
+            (component_type, code)
+            for code, component_type in enumerate(self.component_types)
+        )
+        self.quantizers = quantizers or {}
+
+        for component_type in self.component_types:
+            known = manager.change_store.get(component_type, {})
+            manager.track_changes(component_type, removals=True)
+            for entity in list(manager.entities_by_type(component_type)):
+                if entity not in known:
+                    manager.mark_changed(entity, component_type)
+
+    @property
+    def tick(self):
+        """The current tick of the manager, to give to the next delta()."""
+        return self.manager.change_counter
+
+    def forget(self, tick):
+        """Forget the removals up to a tick, no delta can be asked before.
+
+        Args:
+          tick (int): the oldest tick from which a delta may be asked.
+
+        """
+        self.manager.forget_removals(tick)
+
+    def delta(self, since):
+        """Encode what changed in the manager since a tick.
+
+        Args:
+          since (int): a previous tick, 0 to send the whole state.
+
+        Returns:
+          A bytes object, to give to apply().
+
+        """
+        manager = self.manager
+        removed, destroyed = {}, set()
+        for component_type in self.component_types:
+            entities = list(manager.removed_since(component_type, since))
+            destroyed.update(
+                entity for entity in entities if not manager.is_alive(entity)
+            )
+            removed[component_type] = [
+                entity for entity in entities if manager.is_alive(entity)
+            ]
+        changed = dict(
+            (t, list(manager.changed_since(t, since)))
+            for t in self.component_types
+        )
+        removed = [(t, e) for t, e in removed.items() if e]
+        changed = [(t, e) for t, e in changed.items() if e]
+
+        writer = Writer(LENGTH, 1)
+        writer.block(HEADER.pack(self.tick, len(removed), len(changed)))
+        writer.block(array('Q', sorted(destroyed)))
+        for component_type, entities in removed:
+            writer.block(CODE.pack(self.codes[component_type]))
+            writer.block(array('Q', entities))
+        for component_type, entities in changed:
+            writer.block(CODE.pack(self.codes[component_type]))
+            writer.block(array('Q', entities))
+            self._write_components(writer, component_type, entities)
+        return writer.getvalue()
+
+    def _write_components(self, writer, component_type, entities):
+        get_component = self.manager.get_component
+        components = [get_component(e, component_type) for e in entities]
+        names = field_names(component_type)
+        if names is None:
+            writer.block(pickle.dumps(components, pickle.HIGHEST_PROTOCOL))
+            return
+
+        for name in names:
+            values = [getattr(component, name) for component in components]
+            quantizer = self.quantizers.get((component_type, name))
+            if quantizer is not None:
+                code, data = 'quantized', quantizer.encode(values)
+            else:
+                code, data = encode_column(values)
+            writer.block(COLUMN_CODES[code] + bytes(data))
+
+    def apply(self, data):
+        """Apply a delta returned by delta() to the manager.
+
+        Destroyed entities are killed, removed components are removed, then
+        changed components are set.
+
+        Args:
+          data (bytes-like): the delta.
+
+        Returns:
+          The tick of the delta, to ask for the next one.
+
+        """
+        manager = self.manager
+        reader = Reader(data, LENGTH, 1)
+        tick, removals, changes = HEADER.unpack(reader.block())
+        for entity in reader.integers():
+            if entity in manager.entity_store:
+                manager.kill_entity(entity)
+
+        for i in range(removals):
+            component_type = self._read_type(reader)
+            for entity in reader.integers():
+                if entity in manager.entity_store:
+                    manager.remove_component(entity, component_type)
+
+        for i in range(changes):
+            component_type = self._read_type(reader)
+            entities = self._adopt(reader.integers())
+            components = self._read_components(
+                reader, component_type, len(entities)
+            )
+            manager.add_components(entities, components)
+        return tick
+
+    def _read_type(self, reader):
+        code, = CODE.unpack(reader.block())
+        return self.component_types[code]
+
+    def _read_components(self, reader, component_type, number):
+        names = field_names(component_type)
+        if names is None:
+            return pickle.loads(reader.block())
+        if not names:
+            return [component_type()] * number
+
+        columns = []
+        for name in names:
+            block = reader.block()
+            code = COLUMN_NAMES[bytes(block[:1])]
+            if code == 'quantized':
+                quantizer = self.quantizers[component_type, name]
+                columns.append(quantizer.decode(block[1:]))
+            else:
+                columns.append(decode_column(code, block[1:]))
+
+        if hasattr(component_type, 'field_names'):
+            return [component_type(dict(zip(names, values)))
+                    for values in zip(*columns)]
+        return [component_type(*values) for values in zip(*columns)]
+
+    def _adopt(self, identifiers):
+        """Return the entities of identifiers, storing the unknown ones."""
+        manager = self.manager
+        entities = list(map(manager.entity_class, identifiers))
+        unknown = [e for e in entities if e not in manager.entity_store]
+        for entity in unknown:
+            index = entity & INDEX_MASK
+            if index > manager.created_entities:
+                manager.generations.extend(
+                    [0] * (index - manager.created_entities)
+                )
+                manager.created_entities = index
+            manager.generations[index] = entity >> INDEX_BITS
+        manager.store_entities(unknown)
+        return entities
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+def conflict(accesses_a, accesses_b):
+    """Return whether two processors cannot run concurrently.
+
+    Two processors conflict if one of them writes a component type the other
+    one reads or writes, or if accesses of one of them are unknown.
+
+    Args:
+      accesses_a (tuple|None): accesses of the first processor, as returned
+      by Processor.accesses().
+      accesses_b (tuple|None): accesses of the second processor.
+
+    Returns:
+      True if processors conflict, False otherwise.
+
+    Examples:
+
+    >>> position, speed = frozenset(['position']), frozenset(['speed'])
+    >>> conflict((speed, position), (speed, frozenset()))
+    False
+
+    >>> conflict((speed, position), (position, frozenset()))
+    True
+
+    """
+    if accesses_a is None or accesses_b is None:
+        return True
+
+    reads_a, writes_a = accesses_a
+    reads_b, writes_b = accesses_b
+    return bool(
+        writes_a & (reads_b | writes_b) or writes_b & reads_a
+    )
+
+
+class Scheduler(object):
+    """Run the processors of a manager one after another.
+
+    This is the default scheduler of a Manager. Other schedulers can be set
+    with Manager.scheduler.
+
+    """
+    def run(self, manager, delta):
+        """Run all the processors of a manager.
+
+        Args:
+          manager (Manager): the manager whose processors are run.
+          delta (float): a delta of time since the last update call.
+
+        """
+        for processor in manager.processor_store:
+            manager.run_processor(processor, delta)
+            if manager.flush_between_processors:
+                manager.commands.flush()
+
+
+class ParallelScheduler(Scheduler):
+    """Run non-conflicting processors concurrently on a thread pool.
+
+    Processors are split in stages. A processor is put in the stage following
+    the last one containing a processor it conflicts with (see conflict()), so
+    conflicting processors always run in registration order. Processors of a
+    same stage run concurrently, stages run one after another.
+
+    Processors running concurrently must not create or kill entities nor add
+    components: they may only modify the components they write. Structural
+    changes are recorded in Manager.commands instead, which is flushed after
+    each stage.
+
+    Example:
+
+    >>> from pytity.manager import Manager
+    >>> m = Manager()
+    >>> m.scheduler = ParallelScheduler(max_workers=4)
+    >>> m.update(0.1)
+    >>> m.scheduler.shutdown()
+
+    """
+    def __init__(self, max_workers=None, executor=None):
+        """Initialize a parallel scheduler.
+
+        Args:
+          max_workers (int|None): the number of threads of the pool created by
+          the scheduler.
+          executor (concurrent.futures.Executor|None): an executor to use
+          instead of creating a thread pool.
+
+        """
+        self.max_workers = max_workers
+        self.executor = executor
+        self.cache_key = None
+        self.cache_stages = []
+
+    def stages(self, processors):
+        """Split processors in stages of non-conflicting processors.
+
+        Stages are cached as long as processors and their accesses do not
+        change.
+
+        Args:
+          processors (list of Processor): processors in registration order.
+
+        Returns:
+          A list of lists of processors.
+
+        """
+        accesses = [processor.accesses() for processor in processors]
+        key = (tuple(processors), tuple(accesses))
+        if key != self.cache_key:
+            self.cache_key = key
+            self.cache_stages = self._build_stages(processors, accesses)
+        return self.cache_stages
+
+    @staticmethod
+    def _build_stages(processors, accesses):
+        levels = []
+        stages = []
+        for i, processor in enumerate(processors):
+            level = 0
+            for j in range(i):
+                if conflict(accesses[i], accesses[j]):
+                    level = max(level, levels[j] + 1)
+            levels.append(level)
+            if level == len(stages):
+                stages.append([])
+            stages[level].append(processor)
+        return stages
+
+    def run(self, manager, delta):
+        for stage in self.stages(manager.processor_store):
+            self.run_stage(manager, stage, delta)
+            if manager.flush_between_processors:
+                manager.commands.flush()
+
+    def run_stage(self, manager, stage, delta):
+        """Run the processors of a stage concurrently.
+
+        Args:
+          manager (Manager): the manager whose processors are run.
+          stage (list of Processor): non-conflicting processors.
+          delta (float): a delta of time since the last update call.
+
+        """
+        if len(stage) == 1:
+            manager.run_processor(stage[0], delta)
+            return
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.max_workers)
+        futures = [
+            self.executor.submit(manager.run_processor, processor, delta)
+            for processor in stage
+        ]
+        # Wait for the whole stage, errors are raised in order.
+        for future in futures:
+            future.exception()
+        for future in futures:
+            future.result()
+
+    def shutdown(self):
+        """Stop the executor of the scheduler."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+
+"""
+Snapshots of the whole state of a manager, in a compact binary format.
+
+A snapshot is a sequence of blocks. Each block is a little-endian 64-bit
+length followed by its data, padded to a multiple of ALIGNMENT bytes, so
+arrays can be read in place from a memory-mapped file.
+
+The first block is a JSON header holding the magic string, the format
+version and the allocator state. Then come the arrays of generations, free
+indexes and entities (unsigned 64-bit integers). Then, for each component
+type, a JSON block describes the type and the blocks of its data follow:
+
+- ``array``: ArrayComponent types, one raw block per field.
+- ``fields``: components declaring their fields, one block per field, raw
+  64-bit floats or integers when all the values are, pickled otherwise.
+- ``tag``: Tag types, the bitset of their TagSet.
+- ``values``: components built from their value only, values are pickled.
+- ``pickle``: other components, pickled.
+
+Entities of a component type are stored in a block before its data, in the
+order of its store, except for tags.
+
+"""
+
+from array import array
+from functools import partial
+import gc
+import importlib
+import json
+import pickle
+import struct
+
+from pytity.columnar import ComponentArray, numpy
+from pytity.component import Component
+
+
+MAGIC = 'pytity-snapshot'
+VERSION = 1
+ALIGNMENT = 8
+
+LENGTH = struct.Struct('<Q')
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot cannot be read."""
+    pass
+
+
+def type_name(component_type):
+    """Return the name of a component type stored in snapshots.
+
+    Example:
+
+    >>> from pytity.component import Component
+    >>> type_name(Component)
+    'pytity.component:Component'
+
+    """
+    return '{0}:{1}'.format(
+        component_type.__module__, component_type.__qualname__
+    )
+
+
+def resolve_type(name, component_types=None):
+    """Return the component type of a name returned by type_name().
+
+    Args:
+      name (str): the name of the type.
+      component_types (dict|None): types by name, looked up before importing
+      the module of the type.
+
+    Raises:
+      SnapshotError if the type cannot be found.
+
+    """
+    if component_types and name in component_types:
+        return component_types[name]
+
+    module_name, qualname = name.split(':')
+    try:
+        component_type = importlib.import_module(module_name)
+        for attribute in qualname.split('.'):
+            component_type = getattr(component_type, attribute)
+    except (ImportError, AttributeError):
+        raise SnapshotError('Unknown component type {0}'.format(name))
+    return component_type
+
+
+class Writer(object):
+    """Append aligned blocks to a list of bytes-like objects."""
+    def __init__(self, length=LENGTH, alignment=ALIGNMENT):
+        self.parts = []
+        self.length = length
+        self.alignment = alignment
+
+    def block(self, data):
+        data = memoryview(data).cast('B')
+        self.parts.append(self.length.pack(len(data)))
+        self.parts.append(data)
+        padding = -len(data) % self.alignment
+        if padding:
+            self.parts.append(bytes(padding))
+
+    def json(self, value):
+        self.block(json.dumps(value).encode('utf-8'))
+
+    def getvalue(self):
+        return b''.join(self.parts)
+
+
+class Reader(object):
+    """Read the blocks of a buffer without copying them."""
+    def __init__(self, data, length=LENGTH, alignment=ALIGNMENT):
+        self.data = memoryview(data).cast('B')
+        self.offset = 0
+        self.length = length
+        self.alignment = alignment
+
+    def block(self):
+        if self.offset + self.length.size > len(self.data):
+            raise SnapshotError('Truncated snapshot')
+        length, = self.length.unpack_from(self.data, self.offset)
+        start = self.offset + self.length.size
+        if start + length > len(self.data):
+            raise SnapshotError('Truncated snapshot')
+        self.offset = start + length + (-length % self.alignment)
+        return self.data[start:start + length]
+
+    def json(self):
+        return json.loads(bytes(self.block()).decode('utf-8'))
+
+    def integers(self):
+        return self.block().cast('Q')
+
+
+def write_snapshot(manager):
+    """Return the state of a manager, as bytes.
+
+    Args:
+      manager (Manager): the manager to save.
+
+    """
+    writer = Writer()
+    writer.json({
+        'magic': MAGIC,
+        'version': VERSION,
+        'created_entities': manager.created_entities,
+        'change_counter': manager.change_counter,
+        'component_types': len(manager.component_store),
+    })
+    writer.block(array('Q', manager.generations))
+    writer.block(array('Q', manager.free_indices))
+    writer.block(array('Q', manager.entity_store))
+
+    for component_type, store in manager.component_store.items():
+        if component_type in manager.tag_stores:
+            writer.json(_description(component_type, 'tag', len(store)))
+            writer.block(store.bits)
+        elif isinstance(store, ComponentArray):
+            _write_array(writer, component_type, store)
+        else:
+            _write_components(writer, manager, component_type, store)
+    return writer.getvalue()
+
+
+def _description(component_type, kind, count, fields=None):
+    return {
+        'type': type_name(component_type),
+        'kind': kind,
+        'count': count,
+        'fields': fields,
+    }
+
+
+def _write_array(writer, component_type, store):
+    size = len(store.dense)
+    columns = [store.columns[name][:size] for name in store.fields]
+    writer.json(_description(component_type, 'array', size, [
+        (name, column.dtype.str, column.shape[1:])
+        for name, column in zip(store.fields, columns)
+    ]))
+    writer.block(store.ids[:size])
+    for column in columns:
+        writer.block(numpy.ascontiguousarray(column))
+
+
+def _write_components(writer, manager, component_type, store):
+    entities = store.dense
+    components = [manager.entity_store[entity][component_type]
+                  for entity in entities]
+    if not component_type.fields:
+        kind = 'pickle'
+        if component_type.__init__ is Component.__init__:
+            kind = 'values'
+            components = [component.value for component in components]
+        writer.json(_description(component_type, kind, len(entities)))
+        writer.block(array('Q', entities))
+        writer.block(pickle.dumps(components, pickle.HIGHEST_PROTOCOL))
+        return
+
+    columns = [
+        [getattr(component, field) for component in components]
+        for field in component_type.fields
+    ]
+    encoded = [encode_column(column) for column in columns]
+    writer.json(_description(component_type, 'fields', len(entities), [
+        (field, code) for field, (code, data) in
+        zip(component_type.fields, encoded)
+    ]))
+    writer.block(array('Q', entities))
+    for code, data in encoded:
+        writer.block(data)
+
+
+def encode_column(values):
+    """Encode a list of values, as raw numbers if possible.
+
+    Args:
+      values (list): the values to encode.
+
+    Returns:
+      A (code, data) tuple, data being a bytes-like object to give to
+      decode_column() with code.
+
+    Example:
+
+    >>> code, data = encode_column([1.5, 2.0])
+    >>> code, decode_column(code, data)
+    ('d', [1.5, 2.0])
+
+    """
+    for code, value_type in (('d', float), ('q', int)):
+        if all(type(value) is value_type for value in values):
+            try:
+                return code, array(code, values)
+            except OverflowError:
+                break
+    return 'pickle', pickle.dumps(values, pickle.HIGHEST_PROTOCOL)
+
+
+def decode_column(code, data):
+    """Return the list of values encoded by encode_column()."""
+    if code == 'pickle':
+        return pickle.loads(data)
+    return memoryview(data).cast('B').cast(code).tolist()
+
+
+def read_snapshot(manager, data, component_types=None):
+    """Replace the state of a manager by the one of a snapshot.
+
+    Args:
+      manager (Manager): the manager to restore. Its processors are kept.
+      data (bytes-like): a snapshot returned by write_snapshot(), which may
+      be a memory-mapped file.
+      component_types (list of classes|None): component types to use instead
+      of importing them by name (e.g. types defined in a function).
+
+    Raises:
+      SnapshotError if data is not a snapshot of a supported version or if
+      a component type cannot be found. The manager is left untouched.
+
+    """
+    types = dict(
+        (type_name(component_type), component_type)
+        for component_type in component_types or ()
+    )
+    # Check the whole snapshot before modifying the manager.
+    reader = Reader(data)
+    header = _read_header(reader)
+    for i in range(3):
+        reader.block()
+    resolved = []
+    for i in range(header['component_types']):
+        description = reader.json()
+        resolved.append(resolve_type(description['type'], types))
+        for j in range(_data_blocks(description)):
+            reader.block()
+
+    # Restoring creates many objects at once, collections would only slow
+    # it down.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        _restore(manager, Reader(data), resolved)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _read_header(reader):
+    try:
+        header = reader.json()
+    except (ValueError, UnicodeDecodeError):
+        raise SnapshotError('Not a pytity snapshot')
+    if not isinstance(header, dict) or header.get('magic') != MAGIC:
+        raise SnapshotError('Not a pytity snapshot')
+    if header['version'] != VERSION:
+        raise SnapshotError(
+            'Unsupported snapshot version {0}'.format(header['version'])
+        )
+    return header
+
+
+def _data_blocks(description):
+    """Return the number of blocks following a component type description."""
+    kind = description['kind']
+    if kind not in READERS:
+        raise SnapshotError('Unknown component kind {0}'.format(kind))
+    if kind in ('array', 'fields'):
+        return 1 + len(description['fields'])
+    return 1 if kind == 'tag' else 2
+
+
+def _restore(manager, reader, component_types):
+    header = reader.json()
+    manager.clear()
+    manager.created_entities = header['created_entities']
+    manager.change_counter = header['change_counter']
+    manager.generations = reader.integers().tolist()
+    manager.free_indices.extend(reader.integers().tolist())
+    manager.store_entities(_entities(manager, reader.integers()))
+
+    for component_type in component_types:
+        description = reader.json()
+        READERS[description['kind']](
+            reader, manager, component_type, description
+        )
+
+
+def _entities(manager, identifiers):
+    """Return the entities of the manager with the given identifiers."""
+    # Identifiers are valid, int.__new__() is much faster than Entity().
+    return list(map(partial(int.__new__, manager.entity_class), identifiers))
+
+
+def _read_tag(reader, manager, component_type, description):
+    manager.init_component(component_type)
+    store = manager.tag_stores[component_type]
+    manager.add_components_bulk(
+        list(store.entities(reader.block())), component_type, None
+    )
+
+
+def _read_array(reader, manager, component_type, description):
+    entities = _entities(manager, reader.integers())
+    columns = {}
+    for name, dtype, shape in description['fields']:
+        columns[name] = numpy.frombuffer(
+            reader.block(), dtype=dtype
+        ).reshape([len(entities)] + shape)
+    manager.add_components_bulk(entities, component_type, columns)
+
+
+def _read_fields(reader, manager, component_type, description):
+    entities = _entities(manager, reader.integers())
+    columns = []
+    for field, code in description['fields']:
+        columns.append(decode_column(code, reader.block()))
+    manager.add_components(entities, [
+        component_type(*values) for values in zip(*columns)
+    ])
+
+
+def _read_values(reader, manager, component_type, description):
+    entities = _entities(manager, reader.integers())
+    manager.add_components(entities, [
+        component_type(value) for value in pickle.loads(reader.block())
+    ])
+
+
+def _read_pickle(reader, manager, component_type, description):
+    entities = _entities(manager, reader.integers())
+    manager.add_components(entities, pickle.loads(reader.block()))
+
+
+READERS = {
+    'tag': _read_tag,
+    'array': _read_array,
+    'fields': _read_fields,
+    'values': _read_values,
+    'pickle': _read_pickle,
+}
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+"""
+Spatial index of entities, for proximity queries.
+
+Manager.spatial_index() indexes the entities having a position component
+type in a UniformGrid, kept up to date by the manager: when a component of
+the type is set or removed, and when it is marked as changed (see
+Manager.mark_changed()). Processors moving entities must mark their
+position as changed, like for change tracking.
+
+"""
+
+
+def xy_position(component):
+    """Return the (x, y) position of a component with x and y attributes."""
+    return component.x, component.y
+
+
+class UniformGrid(object):
+    """Store entities in square cells, by their 2D position.
+
+    Queries only look at the cells overlapping the searched area, so their
+    cost depends on the number of entities around rather than on the total
+    number of entities. The cell size should be close to the distance used
+    by queries: too small, many empty cells are walked; too large, many far
+    entities are compared.
+
+    Example:
+
+    >>> grid = UniformGrid(10)
+    >>> grid.move(1, 0, 0)
+    >>> grid.move(2, 3, 4)
+    >>> grid.move(3, 50, 50)
+    >>> sorted(grid.query_radius(0, 0, 5))
+    [1, 2]
+    >>> list(grid.pairs(5))
+    [(1, 2)]
+
+    """
+    def __init__(self, cell_size, position=None):
+        """Initialize an empty grid.
+
+        Args:
+          cell_size (float): the width of the cells.
+          position (callable|None): returns the (x, y) position of a
+          component, see update(). By default, its x and y attributes.
+
+        """
+        self.cell_size = float(cell_size)
+        self.position = position or xy_position
+        self.cells = {}
+        self.entity_cells = {}
+        self.positions = {}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, entity):
+        return entity in self.positions
+
+    def cell(self, x, y):
+        """Return the (column, row) key of the cell containing a point."""
+        size = self.cell_size
+        return int(x // size), int(y // size)
+
+    def update(self, entity, component):
+        """Insert or move an entity, at the position of a component."""
+        x, y = self.position(component)
+        self.move(entity, x, y)
+
+    def move(self, entity, x, y):
+        """Insert or move an entity at a position."""
+        self.positions[entity] = (x, y)
+        cell = self.cell(x, y)
+        previous = self.entity_cells.get(entity)
+        if previous == cell:
+            return
+
+        if previous is not None:
+            self._leave(entity, previous)
+        self.entity_cells[entity] = cell
+        entities = self.cells.get(cell)
+        if entities is None:
+            self.cells[cell] = set([entity])
+        else:
+            entities.add(entity)
+
+    def discard(self, entity):
+        """Remove an entity if it is in the grid."""
+        cell = self.entity_cells.pop(entity, None)
+        if cell is not None:
+            del self.positions[entity]
+            self._leave(entity, cell)
+
+    def _leave(self, entity, cell):
+        entities = self.cells[cell]
+        entities.discard(entity)
+        if not entities:
+            del self.cells[cell]
+
+    def clear(self):
+        """Remove all the entities."""
+        self.cells.clear()
+        self.entity_cells.clear()
+        self.positions.clear()
+
+    def _cells_in(self, min_x, min_y, max_x, max_y):
+        """Return the non-empty cells overlapping a box."""
+        min_column, min_row = self.cell(min_x, min_y)
+        max_column, max_row = self.cell(max_x, max_y)
+        area = (max_column - min_column + 1) * (max_row - min_row + 1)
+        if area > len(self.cells):
+            # The box is larger than the occupied space, filter the cells.
+            return [
+                entities for (column, row), entities in self.cells.items()
+                if min_column <= column <= max_column and
+                min_row <= row <= max_row
+            ]
+
+        cells = self.cells
+        return [
+            cells[column, row]
+            for column in range(min_column, max_column + 1)
+            for row in range(min_row, max_row + 1)
+            if (column, row) in cells
+        ]
+
+    def query_aabb(self, min_x, min_y, max_x, max_y):
+        """Return the entities inside an axis-aligned box, borders included.
+
+        Returns:
+          A list of entities.
+
+        """
+        positions = self.positions
+        found = []
+        for entities in self._cells_in(min_x, min_y, max_x, max_y):
+            for entity in entities:
+                x, y = positions[entity]
+                if min_x <= x <= max_x and min_y <= y <= max_y:
+                    found.append(entity)
+        return found
+
+    def query_radius(self, x, y, radius):
+        """Return the entities at a distance of a point lower than radius.
+
+        Returns:
+          A list of entities.
+
+        """
+        positions = self.positions
+        square = radius * radius
+        found = []
+        for entities in self._cells_in(x - radius, y - radius,
+                                       x + radius, y + radius):
+            for entity in entities:
+                other_x, other_y = positions[entity]
+                dx, dy = other_x - x, other_y - y
+                if dx * dx + dy * dy <= square:
+                    found.append(entity)
+        return found
+
+    def pairs(self, distance=None):
+        """Return a generator of the pairs of entities close to each other.
+
+        Each pair is generated once, the lower entity first. Use it as the
+        broad phase of a collision detection.
+
+        Args:
+          distance (float|None): the maximum distance between the entities
+          of a pair, the cell size by default.
+
+        """
+        if distance is None:
+            distance = self.cell_size
+        reach = int(-(-distance // self.cell_size))
+        # Half of the neighbourhood, so each pair of cells is visited once.
+        offsets = [
+            (dx, dy)
+            for dx in range(0, reach + 1)
+            for dy in range(-reach, reach + 1)
+            if dx > 0 or dy > 0
+        ]
+        square = distance * distance
+        located = dict(
+            (cell, [(entity, self.positions[entity]) for entity in entities])
+            for cell, entities in self.cells.items()
+        )
+
+        for (column, row), first in located.items():
+            for pair in _close_pairs(first, first, square, True):
+                yield pair
+            for dx, dy in offsets:
+                second = located.get((column + dx, row + dy))
+                if second is not None:
+                    for pair in _close_pairs(first, second, square, False):
+                        yield pair
+
+
+def _close_pairs(first, second, square, same):
+    """Yield the pairs of two lists of (entity, position) close enough."""
+    for i, (entity, (x, y)) in enumerate(first):
+        others = second[i + 1:] if same else second
+        for other, (other_x, other_y) in others:
+            dx, dy = other_x - x, other_y - y
+            if dx * dx + dy * dy <= square:
+                if entity < other:
+                    yield entity, other
+                else:
+                    yield other, entity
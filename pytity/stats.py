@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+
+
+PHASES = ('pre_update', 'update', 'post_update')
+
+
+class StatsSink(object):
+    """Receive the measures of the processors run by a manager.
+
+    A sink is enabled by setting Manager.stats. It is called after each
+    phase of each processor. This base class ignores all the measures, child
+    classes must redefine record().
+
+    """
+    def record(self, processor, phase, duration, visited):
+        """Record the measure of a processor phase.
+
+        Args:
+          processor (Processor): the measured processor.
+          phase (str): one of 'pre_update', 'update' and 'post_update'.
+          duration (float): wall time of the phase, in seconds.
+          visited (int|None): number of entities visited during the phase,
+          None if unknown.
+
+        """
+        pass
+
+
+class RollingStats(StatsSink):
+    """Keep the last measures of each processor phase.
+
+    Example:
+
+    >>> from pytity.manager import Manager
+    >>> from pytity.processor import EntityProcessor
+    >>> m = Manager()
+    >>> m.stats = RollingStats(window=60)
+    >>> p = EntityProcessor(needed=[])
+    >>> p.register_to(m)
+    >>> m.update(0.1)
+    >>> len(m.stats.durations[p, 'update']), m.stats.visited[p]
+    (1, 0)
+
+    """
+    def __init__(self, window=120):
+        """Initialize the stats.
+
+        Args:
+          window (int): the number of measures kept by processor phase.
+
+        """
+        self.window = window
+        self.durations = {}
+        self.visited = {}
+
+    def record(self, processor, phase, duration, visited):
+        samples = self.durations.get((processor, phase))
+        if samples is None:
+            samples = deque(maxlen=self.window)
+            self.durations[processor, phase] = samples
+        samples.append(duration)
+
+        if visited is not None:
+            self.visited[processor] = visited
+
+    def percentile(self, processor, phase, percent):
+        """Return a percentile of the durations of a processor phase.
+
+        Args:
+          processor (Processor): the measured processor.
+          phase (str): the measured phase.
+          percent (float): the percentile to compute, between 0 and 100.
+
+        Returns:
+          A duration in seconds (nearest-rank method), None if there is no
+          measure.
+
+        """
+        samples = sorted(self.durations.get((processor, phase), ()))
+        if not samples:
+            return None
+
+        rank = int(round(percent / 100.0 * (len(samples) - 1)))
+        return samples[rank]
+
+    def report(self, percents=(50, 95, 99)):
+        """Return a summary of the measures of all the processors.
+
+        Args:
+          percents (tuple of float): the percentiles to compute.
+
+        Returns:
+          A list of dicts with ``processor``, ``phase``, ``count``,
+          ``visited`` and one ``pXX`` key per percentile.
+
+        """
+        rows = []
+        for (processor, phase), samples in self.durations.items():
+            row = {
+                'processor': type(processor).__name__,
+                'phase': phase,
+                'count': len(samples),
+                'visited': self.visited.get(processor),
+            }
+            for percent in percents:
+                key = 'p{0}'.format(percent)
+                row[key] = self.percentile(processor, phase, percent)
+            rows.append(row)
+        return rows
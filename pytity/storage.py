@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+
+from itertools import count
+
+from pytity.entity import INDEX_BITS, INDEX_MASK
+
+
+# Positions of the bits set in each byte value.
+BYTE_BITS = tuple(
+    tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)
+)
+
+
+class SparseSet(object):
+    """Store a set of entities in a dense, insertion-ordered list.
+
+    Entities are packed in the ``dense`` list and the position of each of
+    them is remembered in the ``index`` dict. Adding, removing and testing
+    membership are done in constant time. Removing an entity moves the last
+    one in its place, so iteration order is stable as long as the set is not
+    modified.
+
+    Iterators walk the dense list itself, nothing is copied. If the set is
+    changed while iterators are walking it, the dense list is copied first
+    (copy on write): they keep walking the old list and skip the entities
+    removed meanwhile, see _read().
+
+    Examples:
+
+    >>> s = SparseSet()
+    >>> s.add(3)
+    >>> s.add(7)
+    >>> s.add(3)
+    >>> list(s)
+    [3, 7]
+
+    >>> s.discard(3)
+    >>> 3 in s, len(s)
+    (False, 1)
+
+    """
+    def __init__(self, entities=()):
+        """Initialize a sparse set.
+
+        Args:
+          entities (iterable): entities to add to the set.
+
+        """
+        self.dense = []
+        self.index = {}
+        # Number of iterators walking the current dense list.
+        self.readers = 0
+        self.extend(entities)
+
+    def add(self, entity):
+        """Add an entity to the set.
+
+        If entity is already in the set, nothing happens.
+
+        Args:
+          entity (Entity): the entity to add.
+
+        """
+        if entity not in self.index:
+            if self.readers:
+                self._write()
+            self.index[entity] = len(self.dense)
+            self.dense.append(entity)
+
+    def attach(self, entity, component):
+        """Store the component of an entity.
+
+        A SparseSet only keeps track of the entity, subclasses may store the
+        component data too.
+
+        Args:
+          entity (Entity): the entity owning the component.
+          component (Component): the component set to the entity.
+
+        Returns:
+          The component to reference for the entity, the given one here.
+
+        """
+        self.add(entity)
+        return component
+
+    def detach(self, entity, component):
+        """Remove the component of an entity from the set.
+
+        Args:
+          entity (Entity): the entity losing the component.
+          component (Component): the removed component.
+
+        """
+        self.discard(entity)
+
+    def attach_bulk(self, entities, component_type, values):
+        """Create and store the components of several entities.
+
+        Args:
+          entities (list of Entity): the entities owning the components.
+          component_type (class): the type of the components to create.
+          values (sequence): one value per entity, passed to the component
+          constructor.
+
+        Returns:
+          The list of created components.
+
+        """
+        # Components are built first, so the set is left unchanged if their
+        # constructor raises an error.
+        components = [component_type(value) for value in values]
+        self.extend(entities)
+        return components
+
+    def extend(self, entities):
+        """Add several entities to the set.
+
+        Args:
+          entities (iterable): the entities to add.
+
+        """
+        for entity in entities:
+            self.add(entity)
+
+    def discard(self, entity):
+        """Remove an entity from the set if it is present.
+
+        Args:
+          entity (Entity): the entity to remove.
+
+        """
+        row = self.index.pop(entity, None)
+        if row is not None:
+            self._remove_row(row)
+
+    def remove(self, entity):
+        """Remove an entity from the set.
+
+        Args:
+          entity (Entity): the entity to remove.
+
+        Raises:
+          KeyError if entity is not in the set.
+
+        """
+        row = self.index.pop(entity)
+        self._remove_row(row)
+
+    def _remove_row(self, row):
+        """Fill the given row with the last entity of the dense list."""
+        if self.readers:
+            self._write()
+        last = self.dense.pop()
+        if row < len(self.dense):
+            self.dense[row] = last
+            self.index[last] = row
+
+    def _read(self):
+        """Start walking the dense list.
+
+        Until _done() is called, the dense list is not modified anymore: it
+        is replaced by a copy on the next change (see _write()).
+
+        Returns:
+          The dense list.
+
+        """
+        self.readers += 1
+        return self.dense
+
+    def _done(self, dense):
+        """Stop walking a dense list returned by _read()."""
+        if dense is self.dense:
+            self.readers -= 1
+
+    def _write(self):
+        """Copy the dense list, walked by iterators, before changing it."""
+        self.dense = self.dense[:]
+        self.readers = 0
+
+    def _walk(self, order):
+        """Iterate over the entities, in the order of a list iterator.
+
+        Entities removed during the iteration are skipped, entities added
+        meanwhile are not part of it.
+
+        Args:
+          order (callable): iter or reversed.
+
+        """
+        dense = self._read()
+        try:
+            yield from filter(self.index.__contains__, order(dense))
+        finally:
+            self._done(dense)
+
+    def __reversed__(self):
+        return self._walk(reversed)
+
+    def __contains__(self, entity):
+        return entity in self.index
+
+    def __len__(self):
+        return len(self.dense)
+
+    def __iter__(self):
+        return self._walk(iter)
+
+
+class TagSet(object):
+    """Store a set of entities as a bitset indexed by entity index.
+
+    It is the store of Tag components: one bit per entity index, so a tag
+    costs a bit per entity. Several tag sets are intersected with a bitwise
+    AND (see intersection()).
+
+    Identifiers are rebuilt from the generations of the manager, so the
+    bit of an entity must be cleared when it is killed.
+
+    Examples:
+
+    >>> s = TagSet([0] * 16)
+    >>> s.add(3)
+    >>> s.add(12)
+    >>> list(s), 3 in s, 4 in s
+    ([3, 12], True, False)
+
+    >>> t = TagSet(s.generations)
+    >>> t.extend([12, 15])
+    >>> list(s.entities(TagSet.intersection([s, t])))
+    [12]
+
+    """
+    def __init__(self, generations, entity_class=int):
+        """Initialize an empty tag set.
+
+        Args:
+          generations (list of int): the current generation of each index,
+          shared with the manager.
+          entity_class (class): the class of the iterated entities.
+
+        """
+        self.bits = bytearray()
+        self.count = 0
+        self.generations = generations
+        self.entity_class = entity_class
+
+    def add(self, entity):
+        """Add an entity to the set.
+
+        Args:
+          entity (Entity): the entity to add.
+
+        """
+        index = entity & INDEX_MASK
+        byte = index >> 3
+        if byte >= len(self.bits):
+            size = max(byte + 1, 2 * len(self.bits))
+            self.bits.extend(bytes(size - len(self.bits)))
+        bit = 1 << (index & 7)
+        if not self.bits[byte] & bit:
+            self.bits[byte] |= bit
+            self.count += 1
+
+    def extend(self, entities):
+        """Add several entities to the set.
+
+        Args:
+          entities (iterable): the entities to add.
+
+        """
+        for entity in entities:
+            self.add(entity)
+
+    def discard(self, entity):
+        """Remove an entity from the set if it is present.
+
+        Args:
+          entity (Entity): the entity to remove.
+
+        """
+        if entity in self:
+            index = entity & INDEX_MASK
+            self.bits[index >> 3] &= ~(1 << (index & 7))
+            self.count -= 1
+
+    def remove(self, entity):
+        """Remove an entity from the set.
+
+        Args:
+          entity (Entity): the entity to remove.
+
+        Raises:
+          KeyError if entity is not in the set.
+
+        """
+        if entity not in self:
+            raise KeyError(entity)
+        self.discard(entity)
+
+    @staticmethod
+    def intersection(tag_sets):
+        """Return the bitwise AND of the bits of several tag sets.
+
+        Args:
+          tag_sets (list of TagSet): the sets to intersect.
+
+        Returns:
+          A bytes object, whose bits are set for the indexes present in all
+          the sets.
+
+        """
+        size = min(len(tag_set.bits) for tag_set in tag_sets)
+        mask = -1
+        for tag_set in tag_sets:
+            mask &= int.from_bytes(tag_set.bits[:size], 'little')
+        return mask.to_bytes(size, 'little')
+
+    @staticmethod
+    def contains(bits, entity):
+        """Return whether the bit of an entity index is set in bits."""
+        index = entity & INDEX_MASK
+        byte = index >> 3
+        return byte < len(bits) and bool(bits[byte] >> (index & 7) & 1)
+
+    def entities(self, bits):
+        """Return the list of the entities whose bit is set in bits.
+
+        Args:
+          bits (bytes|bytearray): a bitset indexed by entity index, such as
+          the result of intersection().
+
+        """
+        indexes = [
+            base + bit
+            for base, byte in zip(count(0, 8), bits) if byte
+            for bit in BYTE_BITS[byte]
+        ]
+        generations = self.generations
+        entity_class = self.entity_class
+        new = int.__new__
+        # int.__new__() skips the Python code of Entity.__new__().
+        return [
+            new(entity_class, (generations[index] << INDEX_BITS) | index)
+            for index in indexes
+        ]
+
+    def __contains__(self, entity):
+        index = entity & INDEX_MASK
+        return (
+            self.contains(self.bits, entity) and
+            self.generations[index] == entity >> INDEX_BITS
+        )
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.entities(self.bits))
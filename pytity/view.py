@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+from pytity.storage import SparseSet
+
+
+class View(SparseSet):
+    """A cached set of the entities having all the given component types,
+    and none of the excluded ones.
+
+    A View is registered to a manager with Manager.view() and it is kept up to
+    date by the manager each time a component is added to or removed from an
+    entity. Iterating over a View is then free of any rebuild.
+
+    A View iterates over its entities from the last one to the first one
+    and skips the entities which left it meanwhile. The entities are not
+    copied, unless the View changes during the iteration (see SparseSet).
+    This way, entities can be killed while the View is being iterated
+    without skipping or repeating the remaining ones.
+
+    Example:
+
+    >>> from pytity.component import Component
+    >>> from pytity.manager import Manager
+    >>> m = Manager()
+    >>> v = m.view([Component])
+    >>> e = m.create_entity()
+    >>> e.add_component(Component('spam'))
+    >>> list(v) == [e]
+    True
+
+    """
+    def __init__(self, component_types, stores, without=frozenset(),
+                 excluded_stores=()):
+        """Initialize a view.
+
+        Args:
+          component_types (frozenset of classes): the component types an
+          entity must have to be part of the view.
+          stores (list of SparseSet): the manager stores of these types.
+          without (frozenset of classes): the component types an entity must
+          not have to be part of the view.
+          excluded_stores (list of SparseSet): the manager stores of these
+          types.
+
+        """
+        SparseSet.__init__(self)
+        self.component_types = component_types
+        self.stores = stores
+        self.without = without
+        self.excluded_stores = excluded_stores
+
+    def refresh(self, entity):
+        """Add or discard an entity according to its current components.
+
+        Args:
+          entity (Entity): the entity to check.
+
+        """
+        for store in self.stores:
+            if entity not in store:
+                self.discard(entity)
+                return
+        for store in self.excluded_stores:
+            if entity in store:
+                self.discard(entity)
+                return
+
+        self.add(entity)
+
+    def removed(self, entity, component_type):
+        """Update the view after a component is removed from an entity.
+
+        Args:
+          entity (Entity): the entity which lost a component.
+          component_type (class): the type of the removed component.
+
+        """
+        if component_type in self.without:
+            # The entity may now be part of the view.
+            self.refresh(entity)
+        else:
+            self.discard(entity)
+
+    def __iter__(self):
+        return reversed(self)
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+import pytest
+
+from pytity.component import Component
+from pytity.manager import Manager
+from pytity.processor import Processor
+from pytity.stats import StatsSink
+
+
+class Position(Component):
+    pass
+
+
+class Record(Processor):
+    def __init__(self, name, events, **kwargs):
+        Processor.__init__(self, **kwargs)
+        self.name = name
+        self.events = events
+
+    def update(self, delta):
+        self.events.append(self.name)
+
+
+class Network(Record):
+    def __init__(self, name, events, ticks=2, **kwargs):
+        Record.__init__(self, name, events, **kwargs)
+        self.ticks = ticks
+
+    async def update(self, delta):
+        for i in range(self.ticks):
+            self.events.append('{} {}'.format(self.name, i))
+            await asyncio.sleep(0)
+
+
+def test_manager_update_async_concurrent_success():
+    manager = Manager()
+    events = []
+
+    class Waiter(Processor):
+        async def update(self, delta):
+            await asyncio.wait_for(self.ready.wait(), 1)
+            events.append('waiter')
+
+    class Setter(Processor):
+        async def update(self, delta):
+            events.append('setter')
+            waiter.ready.set()
+
+    async def main():
+        waiter.ready = asyncio.Event()
+        await manager.update_async(0.1)
+
+    waiter = Waiter(reads=[], writes=[])
+    waiter.register_to(manager)
+    Setter(reads=[], writes=[]).register_to(manager)
+
+    asyncio.run(main())
+    assert events == ['setter', 'waiter']
+
+
+def test_manager_update_async_conflict_success():
+    manager = Manager()
+    events = []
+    io = Network('io', events, ticks=3, reads=[], writes=[Position])
+    io.register_to(manager)
+    Record('cpu', events, needed=[Component]).register_to(manager)
+    Record('physic', events, needed=[Position]).register_to(manager)
+
+    asyncio.run(manager.update_async(0.1))
+    assert events == ['io 0', 'cpu', 'io 1', 'io 2', 'physic']
+
+
+def test_manager_update_async_commands_success():
+    manager = Manager()
+    events = []
+
+    class Spawn(Network):
+        async def update(self, delta):
+            await asyncio.sleep(0)
+            entity = self.manager.commands.create_entity()
+            self.manager.commands.add_component(entity, Position(1))
+
+    Spawn('spawn', events).register_to(manager)
+    Record('cpu', events).register_to(manager)
+
+    asyncio.run(manager.update_async(0.1))
+    assert len(manager.view([Position])) == 1
+
+
+def test_manager_update_async_rate_stats_success():
+    manager = Manager()
+    manager.stats = StatsSink()
+    events = []
+    network = Network('a', events, ticks=1, rate=20)
+    network.register_to(manager)
+
+    asyncio.run(manager.update_async(0.1))
+    assert events == ['a 0', 'a 0']
+
+
+def test_manager_update_async_error_fail():
+    manager = Manager()
+    events = []
+
+    class Broken(Processor):
+        async def update(self, delta):
+            raise RuntimeError('spam')
+
+    slow = Network('slow', events, ticks=10, reads=[], writes=[])
+    slow.register_to(manager)
+    Broken(reads=[], writes=[]).register_to(manager)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(manager.update_async(0.1))
+    assert len(events) < 10
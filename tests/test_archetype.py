@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+from pytity.archetype import ArchetypeManager
+from pytity.component import Component, Tag
+from pytity.processor import EntityProcessor
+
+
+class SpamComponent(Component):
+    pass
+
+
+def test_archetype_manager_move_entity_success():
+    manager = ArchetypeManager()
+    entity = manager.create_entity()
+    entity.add_component(Component(42))
+    entity.add_component(SpamComponent('spam'))
+
+    archetype = manager.entity_archetype[entity]
+    assert archetype.signature == frozenset([Component, SpamComponent])
+    assert len(manager.empty_archetype) == 0
+    assert len(manager.archetype_store[frozenset([Component])]) == 0
+
+
+def test_archetype_manager_entities_by_types_success():
+    manager = ArchetypeManager()
+    both = manager.create_entity()
+    both.add_component(Component(42))
+    both.add_component(SpamComponent('spam'))
+    single = manager.create_entity()
+    single.add_component(Component(43))
+
+    assert list(manager.entities_by_types([Component, SpamComponent])) == [
+        both
+    ]
+    assert sorted(manager.entities_by_types([Component])) == [both, single]
+
+
+def test_archetype_manager_new_archetype_success():
+    manager = ArchetypeManager()
+    single = manager.create_entity()
+    single.add_component(Component(42))
+    assert list(manager.entities_by_types([Component])) == [single]
+    assert list(manager.entities_by_types([])) == []
+
+    # The cached query of Component gets the archetypes created later.
+    both = manager.create_entity()
+    both.add_component(Component(43))
+    both.add_component(SpamComponent('spam'))
+    assert sorted(manager.entities_by_types([Component])) == [single, both]
+
+
+def test_archetype_manager_replace_component_success():
+    manager = ArchetypeManager()
+    entity = manager.create_entity()
+    entity.add_component(Component('spam'))
+    entity.add_component(Component('egg'))
+
+    values = [c.value for c in manager.components_by_type(Component)]
+    assert values == ['egg']
+    assert entity.get_component(Component).value == 'egg'
+
+
+def test_archetype_manager_kill_entity_success():
+    manager = ArchetypeManager()
+    entities = [manager.create_entity() for i in range(3)]
+    for entity in entities:
+        entity.add_component(Component(int(entity)))
+
+    manager.kill_entity(entities[0])
+
+    values = sorted(c.value for c in manager.components_by_type(Component))
+    assert values == [entities[1], entities[2]]
+    archetype = manager.archetype_store[frozenset([Component])]
+    for row, entity in enumerate(archetype.dense):
+        assert archetype.columns[Component][row].value == entity
+
+
+def test_archetype_manager_entity_processor_success():
+    class SpamEggProcessor(EntityProcessor):
+        def update_entity(self, delta, entity):
+            entity.get_component(SpamComponent).value = 'egg'
+
+    manager = ArchetypeManager()
+    entity = manager.create_entity()
+    entity.add_component(Component(42))
+    entity.add_component(SpamComponent('spam'))
+    SpamEggProcessor(needed=[Component, SpamComponent]).register_to(manager)
+    manager.update(0.1)
+
+    assert entity.get_component(SpamComponent).value == 'egg'
+
+
+def test_archetype_manager_create_entities_success():
+    manager = ArchetypeManager()
+    entities = manager.create_entities(3, components={
+        Component: [1, 2, 3],
+        SpamComponent: ['a', 'b', 'c'],
+    })
+    manager.add_components_bulk(entities[:1], Component, [42])
+
+    archetype = manager.archetype_store[frozenset([Component, SpamComponent])]
+    assert sorted(archetype) == entities
+    values = sorted(c.value for c in manager.components_by_type(Component))
+    assert values == [2, 3, 42]
+
+
+def test_archetype_manager_remove_component_success():
+    manager = ArchetypeManager()
+    entity = manager.create_entity()
+    entity.add_component(Component(42))
+    entity.add_component(SpamComponent('spam'))
+
+    entity.remove_component(Component)
+    archetype = manager.entity_archetype[entity]
+    assert archetype.signature == frozenset([SpamComponent])
+    assert archetype.columns[SpamComponent][0].value == 'spam'
+    assert list(manager.entities_by_types([Component])) == []
+
+
+def test_archetype_manager_tag_success():
+    class Enemy(Tag):
+        pass
+
+    manager = ArchetypeManager()
+    tagged, other = manager.create_entities(2, components={Component: [1, 2]})
+    tagged.add_component(Enemy())
+
+    assert manager.entity_archetype[tagged] is manager.entity_archetype[other]
+    assert list(manager.entities_by_types([Component, Enemy])) == [tagged]
+    assert list(manager.entities_by_types([Enemy])) == [tagged]
+    assert list(manager.components_by_type(Enemy)) == [Enemy()]
+
+    tagged.remove_component(Enemy)
+    assert list(manager.entities_by_types([Component, Enemy])) == []
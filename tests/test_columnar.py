@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+from pytity import columnar  # noqa: E402
+from pytity.archetype import ArchetypeManager  # noqa: E402
+from pytity.columnar import ArrayComponent, ComponentArray  # noqa: E402
+from pytity.manager import Manager  # noqa: E402
+from pytity.processor import VectorProcessor  # noqa: E402
+
+
+class Position(ArrayComponent):
+    dtype = [('x', 'float64'), ('y', 'float64')]
+
+
+class Speed(ArrayComponent):
+    dtype = [('x', 'float64'), ('y', 'float64')]
+
+
+class Gravity(VectorProcessor):
+    def __init__(self):
+        VectorProcessor.__init__(self, needed=[Position, Speed])
+
+    def update_arrays(self, delta, entities, position, speed):
+        speed.y -= 10 * delta
+        position.x += speed.x * delta
+        position.y += speed.y * delta
+
+
+def create_balls(manager, number):
+    entities = []
+    for i in range(number):
+        entity = manager.create_entity()
+        entity.add_component(Position(x=i, y=100))
+        entity.add_component(Speed({'x': 1.0}))
+        entities.append(entity)
+    return entities
+
+
+def test_array_component_attached_success():
+    manager = Manager()
+    entity = manager.create_entity()
+    entity.add_component(Position(x=1.0, y=2.0))
+
+    position = entity.get_component(Position)
+    position.value['x'] += 1
+    position.y = 4.0
+
+    store = manager.component_store[Position]
+    assert store.arrays().x.tolist() == [2.0]
+    assert dict(position.value) == {'x': 2.0, 'y': 4.0}
+
+
+def test_array_component_unknown_field_fail():
+    position = Position()
+
+    with pytest.raises(AttributeError):
+        position.z
+    with pytest.raises(KeyError):
+        position.value['z'] = 1
+
+
+def test_array_component_detached_success():
+    position = Position(x=1.0)
+    position.y = 2.0
+    position.label = 'spam'
+
+    assert (position.x, position.y, position.label) == (1.0, 2.0, 'spam')
+
+
+@pytest.mark.parametrize('manager_class', [Manager, ArchetypeManager])
+def test_array_component_attach_bound_success(manager_class):
+    manager = manager_class()
+    first, second = create_balls(manager, 2)
+    second.add_component(first.get_component(Position))
+    second.get_component(Position).x = 3.0
+
+    position = first.get_component(Position)
+    assert (position.x, position.y) == (0.0, 100.0)
+    assert second.get_component(Position) is not position
+    assert dict(second.get_component(Position).value) == {'x': 3.0, 'y': 100}
+    assert [e for e, p in manager.join(Position) if p.x == 3.0] == [second]
+
+
+def test_array_component_removed_success():
+    manager = Manager()
+    entities = create_balls(manager, 3)
+    removed = entities[0].get_component(Position)
+    killed = entities[1].get_component(Position)
+    entities[0].remove_component(Position)
+    manager.kill_entity(entities[1])
+
+    assert (removed.x, killed.x, killed.y) == (0.0, 1.0, 100.0)
+    removed.x = 5.0
+    assert removed.x == 5.0
+    assert entities[2].get_component(Position).x == 2.0
+
+    entities[2].add_component(removed)
+    assert entities[2].get_component(Position).x == 5.0
+    position = entities[2].get_component(Position)
+    entities[2].add_component(position)
+    assert entities[2].get_component(Position) is position
+
+
+def test_component_array_replace_success():
+    manager = Manager()
+    entity = manager.create_entity()
+    entity.add_component(Position(x=1.0))
+    entity.add_component(Position(x=2.0))
+
+    store = manager.component_store[Position]
+    store.reserve(1)
+    assert len(store.ids) == 64
+    assert store.arrays().x.tolist() == [2.0]
+    with pytest.raises(AttributeError):
+        store.arrays().z
+
+
+def test_component_array_bulk_while_iterating_success():
+    manager = Manager()
+    entities = create_balls(manager, 3)
+    store = manager.component_store[Position]
+
+    visited = []
+    for entity in reversed(store):
+        if not visited:
+            manager.create_entities(2, components={
+                Position: {'x': [5.0, 6.0]},
+            })
+        visited.append(entity)
+
+    assert visited == entities[::-1]
+    assert store.arrays().x.tolist() == [0.0, 1.0, 2.0, 5.0, 6.0]
+
+
+def test_component_array_without_numpy_fail(monkeypatch):
+    monkeypatch.setattr(columnar, 'numpy', None)
+
+    with pytest.raises(ImportError):
+        ComponentArray(Position)
+
+
+def test_component_array_grow_and_kill_success():
+    manager = Manager()
+    entities = create_balls(manager, 100)
+    for entity in entities[:50]:
+        manager.kill_entity(entity)
+
+    store = manager.component_store[Position]
+    assert len(store) == 50
+    for entity in entities[50:]:
+        assert entity.get_component(Position).x == entities.index(entity)
+
+
+def test_vector_processor_aligned_views_success():
+    manager = Manager()
+    entities = create_balls(manager, 10)
+    Gravity().register_to(manager)
+    manager.update(0.5)
+
+    for entity in entities:
+        assert entity.get_component(Speed).y == -5.0
+        assert entity.get_component(Position).y == 97.5
+        assert entity.get_component(Position).x == entities.index(entity) + .5
+
+
+def test_vector_processor_gathered_arrays_success():
+    manager = Manager()
+    entities = create_balls(manager, 10)
+    manager.kill_entity(entities[2])
+    still = manager.create_entity()
+    still.add_component(Position(x=42, y=42))
+    Gravity().register_to(manager)
+    manager.update(1)
+
+    assert still.get_component(Position).y == 42
+    for entity in entities[3:]:
+        assert entity.get_component(Position).y == 90
+        assert entity.get_component(Speed).y == -10
+
+
+def test_vector_processor_no_entity_success():
+    manager = Manager()
+    processor = Gravity()
+    processor.register_to(manager)
+    manager.update(0.1)
+
+    assert processor.last_visited == 0
+
+
+def test_vector_processor_update_fail():
+    processor = VectorProcessor()
+
+    with pytest.raises(NotImplementedError):
+        processor.update_arrays(0.1, None)
+
+
+def test_array_component_bulk_success():
+    manager = Manager()
+    entities = manager.create_entities(4, components={
+        Position: {'x': numpy.arange(4), 'y': numpy.ones(4)},
+        Speed: [{'x': i} for i in range(4)],
+    })
+    manager.add_components_bulk(entities[1:3], Position, {'y': [5, 6]})
+
+    assert entities[3].get_component(Speed).x == 3
+    assert entities[3].get_component(Position).value['x'] == 3
+    ys = [e.get_component(Position).y for e in entities]
+    assert ys == [1, 5, 6, 1]
+
+
+def test_array_component_bulk_grow_success():
+    manager = Manager()
+    entities = manager.create_entities(100, components={
+        Position: {'x': numpy.arange(100)},
+    })
+
+    assert len(manager.component_store[Position].ids) >= 100
+    assert entities[99].get_component(Position).x == 99
+
+
+def test_array_component_bulk_fail():
+    manager = Manager()
+    entities = manager.create_entities(2)
+    with pytest.raises(ValueError):
+        manager.add_components_bulk(entities, Position, {'x': [1, 2, 3]})
+    with pytest.raises(KeyError):
+        manager.add_components_bulk(entities, Position, [{'z': 1}, {'x': 2}])
+
+    assert len(manager.component_store[Position]) == 0
+    assert entities[0].get_component(Position) is None
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+from pytity.archetype import ArchetypeManager
+from pytity.component import Component
+from pytity.manager import Manager
+from pytity.processor import EntityProcessor
+
+
+class SpamComponent(Component):
+    pass
+
+
+class SpawnProcessor(EntityProcessor):
+    def update_entity(self, delta, entity):
+        self.manager.commands.create_entity([Component(0)])
+        self.manager.commands.kill_entity(entity)
+
+
+def test_command_buffer_processor_spawn_success():
+    manager = Manager()
+    entities = manager.create_entities(3, components={Component: [1, 2, 3]})
+    processor = SpawnProcessor(needed=[Component])
+    processor.register_to(manager)
+
+    manager.update(0.1)
+    assert processor.last_visited == 3
+    assert len(manager.commands) == 0
+    assert not any(manager.is_alive(entity) for entity in entities)
+    values = [c.value for c in manager.components_by_type(Component)]
+    assert values == [0, 0, 0]
+
+
+def test_command_buffer_flush_between_processors_success():
+    class CountProcessor(EntityProcessor):
+        def update_entity(self, delta, entity):
+            self.count += 1
+
+    manager = Manager()
+    manager.create_entities(2, components={Component: [1, 2]})
+    SpawnProcessor(needed=[Component]).register_to(manager)
+    counter = CountProcessor(needed=[Component])
+    counter.count = 0
+    counter.register_to(manager)
+
+    manager.update(0.1)
+    assert counter.count == 2
+
+    manager.flush_between_processors = False
+    manager.update(0.1)
+    assert counter.count == 4
+    assert len(manager.view([Component])) == 2
+
+
+def test_command_buffer_add_component_success():
+    manager = Manager()
+    entity = manager.create_entity()
+    manager.commands.add_component(entity, Component(1))
+    manager.commands.add_component(entity, Component(2))
+    assert entity.get_component(Component) is None
+
+    manager.commands.flush()
+    assert entity.get_component(Component).value == 2
+    assert list(manager.view([Component])) == [entity]
+
+
+def test_command_buffer_killed_entity_ignored_success():
+    manager = Manager()
+    entity = manager.create_entity()
+    manager.commands.add_component(entity, Component(1))
+    manager.commands.kill_entity(entity)
+    manager.kill_entity(entity)
+
+    manager.commands.flush()
+    assert list(manager.entities()) == []
+    assert list(manager.entities_by_type(Component)) == []
+
+
+def test_command_buffer_archetype_manager_success():
+    manager = ArchetypeManager()
+    entity = manager.commands.create_entity([
+        Component(42), SpamComponent('spam')
+    ])
+    manager.commands.flush()
+
+    archetype = manager.entity_archetype[entity]
+    assert archetype.signature == frozenset([Component, SpamComponent])
+    assert list(manager.entities_by_types([Component, SpamComponent])) == [
+        entity
+    ]
+
+
+def test_command_buffer_remove_component_success():
+    manager = Manager()
+    entity = manager.create_entity()
+    entity.add_component(Component(1))
+    manager.commands.remove_component(entity, Component)
+    manager.commands.add_component(entity, SpamComponent(2))
+    assert len(manager.commands) == 2
+
+    manager.commands.flush()
+    assert entity.get_component(Component) is None
+    assert entity.get_component(SpamComponent).value == 2
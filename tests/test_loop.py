@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from pytity.loop import FixedStepRunner
+from pytity.manager import Manager
+from pytity.processor import Processor
+
+
+class RecordProcessor(Processor):
+    def __init__(self, **kwargs):
+        Processor.__init__(self, **kwargs)
+        self.deltas = []
+        self.alphas = []
+
+    def update(self, delta):
+        self.deltas.append(delta)
+
+    def interpolate(self, alpha):
+        self.alphas.append(alpha)
+
+
+def test_fixed_step_runner_accumulate_success():
+    manager = Manager()
+    processor = RecordProcessor()
+    processor.register_to(manager)
+    runner = FixedStepRunner(manager, step=0.1)
+
+    assert runner.advance(0.05) == 0
+    assert runner.advance(0.07) == 1
+    assert runner.advance(0.2) == 2
+    assert processor.deltas == [0.1] * 3
+    assert processor.alphas == pytest.approx([0.5, 0.2, 0.2])
+
+
+def test_fixed_step_runner_default_interpolate_success():
+    class UpdateProcessor(Processor):
+        def update(self, delta):
+            pass
+
+    manager = Manager()
+    UpdateProcessor().register_to(manager)
+    processor = RecordProcessor()
+    processor.register_to(manager)
+    runner = FixedStepRunner(manager, step=0.1)
+
+    assert runner.advance(0.15) == 1
+    assert processor.alphas == pytest.approx([0.5])
+
+
+def test_fixed_step_runner_max_steps_success():
+    manager = Manager()
+    processor = RecordProcessor()
+    processor.register_to(manager)
+    runner = FixedStepRunner(manager, step=0.1, max_steps=3)
+
+    assert runner.advance(1.05) == 3
+    assert runner.dropped_steps == 7
+    assert runner.alpha == pytest.approx(0.5)
+    assert runner.advance(0.) == 0
+
+
+def test_fixed_step_runner_run_success():
+    manager = Manager()
+    times = iter([0.0, 0.0, 0.05, 0.2, 0.25])
+    sleeps = []
+    runner = FixedStepRunner(
+        manager, step=0.1, clock=lambda: next(times), sleep=sleeps.append
+    )
+
+    class StopProcessor(RecordProcessor):
+        def update(self, delta):
+            RecordProcessor.update(self, delta)
+            if len(self.deltas) == 2:
+                runner.stop()
+
+    processor = StopProcessor()
+    processor.register_to(manager)
+    runner.run(frame_rate=5)
+
+    assert processor.deltas == [0.1, 0.1]
+    assert sleeps == pytest.approx([0.15, 0.15])
+
+
+def test_manager_processor_rate_success():
+    manager = Manager()
+    physics = RecordProcessor(rate=120)
+    physics.register_to(manager)
+    ai = RecordProcessor(rate=10)
+    ai.register_to(manager)
+    every = RecordProcessor()
+    every.register_to(manager)
+
+    for i in range(12):
+        manager.update(1.0 / 60)
+
+    assert len(every.deltas) == 12
+    assert physics.deltas == pytest.approx([1.0 / 120] * 24)
+    assert ai.deltas == pytest.approx([0.1] * 2)
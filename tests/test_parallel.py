@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+import pickle
+
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+from pytity.columnar import ArrayComponent  # noqa: E402
+from pytity.component import Component  # noqa: E402
+from pytity.manager import Manager  # noqa: E402
+from pytity.parallel import ChunkedProcessor  # noqa: E402
+
+
+class Position(ArrayComponent):
+    dtype = [('x', 'float64'), ('y', 'float64')]
+
+
+class Speed(ArrayComponent):
+    dtype = [('x', 'float64')]
+
+
+class Move(ChunkedProcessor):
+    def update_entity(self, delta, entity):
+        position = entity.get_component(Position)
+        speed = entity.get_component(Speed)
+        position.x += speed.x * delta
+        position.y = entity.index
+
+
+class MoveComponents(ChunkedProcessor):
+    def update_entity(self, delta, entity, position, speed):
+        position.x += speed.x * delta
+
+
+class Accelerate(ChunkedProcessor):
+    def update_entity(self, delta, entity):
+        entity.get_component(Position).x += 1
+        entity.mark_changed(Position)
+
+
+class CheckMove(Move):
+    def update_entity(self, delta, entity):
+        Move.update_entity(self, delta, entity)
+        # Chunks only have ArrayComponent stores of their own entities.
+        missing = (entity.get_component(Component) is None and
+                   self.manager.get_component(-1, Position) is None)
+        entity.get_component(Position).y = 0 if missing else 1
+
+
+class InProcessPool(object):
+    """Run the chunks in the current process, on a copy of the processor."""
+    def map(self, function, tasks):
+        return [function(pickle.loads(pickle.dumps(task))) for task in tasks]
+
+
+def test_chunked_processor_processes_success():
+    manager = Manager()
+    entities = manager.create_entities(20, components={
+        Position: {'x': numpy.zeros(20)},
+        Speed: {'x': numpy.arange(20)},
+    })
+    manager.kill_entity(entities.pop(3))
+    processor = Move(needed=[Position, Speed], processes=2, chunk_size=4)
+    processor.register_to(manager)
+
+    try:
+        manager.update(0.5)
+    finally:
+        processor.close()
+
+    for entity in entities:
+        position = entity.get_component(Position)
+        assert position.x == entity.get_component(Speed).x * 0.5
+        assert position.y == entity.index
+
+
+def test_chunked_processor_single_chunk_success():
+    manager = Manager()
+    entity = manager.create_entity()
+    entity.add_component(Position())
+    entity.add_component(Speed(x=2))
+    processor = Move(needed=[Position, Speed], chunk_size=4)
+    processor.register_to(manager)
+
+    manager.update(1)
+
+    assert entity.get_component(Position).x == 2
+    assert processor.pool is None
+
+
+def test_chunked_processor_chunk_manager_success():
+    manager = Manager()
+    entities = manager.create_entities(6, components={
+        Position: {'x': numpy.zeros(6)},
+        Speed: {'x': numpy.ones(6)},
+    })
+    processor = CheckMove(needed=[Position, Speed], chunk_size=4)
+    processor.pool = InProcessPool()
+    processor.register_to(manager)
+
+    manager.update(2)
+
+    assert processor.manager is manager
+    assert [e.get_component(Position).x for e in entities] == [2] * 6
+    assert [e.get_component(Position).y for e in entities] == [0] * 6
+
+
+@pytest.mark.parametrize('number', [3, 10])
+def test_chunked_processor_with_components_success(number):
+    manager = Manager()
+    entities = manager.create_entities(number, components={
+        Position: {'x': numpy.zeros(number)},
+        Speed: {'x': numpy.arange(number)},
+    })
+    processor = MoveComponents(needed=[Position, Speed], chunk_size=4,
+                               with_components=True)
+    processor.pool = InProcessPool()
+    processor.register_to(manager)
+
+    manager.update(2)
+
+    for entity in entities:
+        position = entity.get_component(Position)
+        assert position.x == entity.get_component(Speed).x * 2
+
+
+def test_chunked_processor_optional_fail():
+    with pytest.raises(ValueError):
+        Move(needed=[Position], optional=[Speed])
+
+
+def test_chunked_processor_changed_success():
+    manager = Manager()
+    manager.track_changes(Position)
+    entities = manager.create_entities(6, components={
+        Position: {'x': numpy.zeros(6)},
+        Speed: {'x': numpy.ones(6)},
+    })
+    processor = Accelerate(needed=[Position, Speed], changed=[Speed],
+                           chunk_size=2)
+    processor.pool = InProcessPool()
+    processor.register_to(manager)
+
+    manager.update(0.1)
+    counter = manager.change_counter
+    manager.update(0.1)
+    assert [e.get_component(Position).x for e in entities] == [1] * 6
+    assert processor.last_visited == 0
+
+    for entity in entities[:3]:
+        entity.mark_changed(Speed)
+    manager.update(0.1)
+    assert [e.get_component(Position).x for e in entities] == [2] * 3 + [1] * 3
+    assert processor.last_visited == 3
+    assert sorted(manager.changed_since(Position, counter)) == entities[:3]
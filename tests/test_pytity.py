@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from pytity.manager import Manager
 from pytity.entity import Entity
-from pytity.component import Component
+from pytity.component import Component, Tag
 from pytity.processor import EntityProcessor, Processor
 
 
@@ -151,3 +153,456 @@ def test_entity_processor_update_with_not_corresponding_needed_set_fail():
     manager.update(0.1)
 
     assert entity.get_component(Component).value == 'spam'
+
+
+def test_manager_add_component_replace_success():
+    manager = Manager()
+    entity = manager.create_entity()
+    entity.add_component(Component('spam'))
+    entity.add_component(Component('egg'))
+
+    assert list(manager.entities_by_type(Component)) == [entity]
+    assert entity.get_component(Component).value == 'egg'
+
+
+def test_manager_kill_entity_keep_others_success():
+    manager = Manager()
+    entities = [manager.create_entity() for i in range(5)]
+    for entity in entities:
+        entity.add_component(Component(int(entity)))
+
+    manager.kill_entity(entities[1])
+    manager.kill_entity(entities[3])
+
+    values = sorted(c.value for c in manager.components_by_type(Component))
+    assert values == [entities[0], entities[2], entities[4]]
+
+
+def test_manager_create_entities_success():
+    class SpamComponent(Component):
+        pass
+
+    manager = Manager()
+    first = manager.create_entity()
+    entities = manager.create_entities(3, components={
+        Component: [1, 2, 3],
+        SpamComponent: ['a', 'b', 'c'],
+    })
+
+    assert entities == [first + 1, first + 2, first + 3]
+    assert manager.create_entity() == first + 4
+    assert entities[2].get_component(SpamComponent).value == 'c'
+    both = manager.view([Component, SpamComponent])
+    assert sorted(both) == entities
+
+
+def test_manager_add_components_bulk_replace_success():
+    manager = Manager()
+    entities = manager.create_entities(2)
+    manager.add_components_bulk(entities[:1], Component, ['spam'])
+    manager.add_components_bulk(entities, Component, ['egg', 'bacon'])
+
+    assert list(manager.entities_by_type(Component)) == entities
+    values = [e.get_component(Component).value for e in entities]
+    assert values == ['egg', 'bacon']
+
+
+def test_manager_add_components_bulk_length_fail():
+    manager = Manager()
+    with pytest.raises(ValueError):
+        manager.create_entities(3, components={Component: [1, 2]})
+    assert len(manager.entity_store) == 0
+
+    entities = manager.create_entities(3)
+    with pytest.raises(ValueError):
+        manager.add_components_bulk(entities, Component, [1, 2])
+    assert list(manager.components_by_type(Component)) == []
+    assert len(manager.view([Component])) == 0
+
+
+def test_manager_add_components_bulk_constructor_fail():
+    class Positive(Component):
+        def __init__(self, value):
+            if value < 0:
+                raise TypeError('negative')
+            Component.__init__(self, value)
+
+    manager = Manager()
+    entities = manager.create_entities(3)
+    with pytest.raises(TypeError):
+        manager.add_components_bulk(entities, Positive, [1, -1, 2])
+    assert list(manager.entities_by_type(Positive)) == []
+    assert all(e.get_component(Positive) is None for e in entities)
+
+
+def test_manager_create_entity_reuse_index_success():
+    manager = Manager()
+    first = manager.create_entity()
+    second = manager.create_entity()
+    manager.kill_entity(first)
+    manager.kill_entity(second)
+
+    entities = [manager.create_entity() for i in range(3)]
+
+    assert [e.index for e in entities] == [first, second, 3]
+    assert [e.generation for e in entities] == [1, 1, 0]
+    assert manager.created_entities == 3
+    assert not manager.is_alive(first)
+    assert all(manager.is_alive(e) for e in entities)
+
+
+def test_manager_create_entities_reuse_index_success():
+    manager = Manager()
+    entities = manager.create_entities(3)
+    manager.kill_entity(entities[1])
+
+    new_entities = manager.create_entities(2)
+
+    assert [e.index for e in new_entities] == [2, 4]
+    assert len(manager.generations) == 5
+    assert manager.get_component(entities[1], Component) is None
+
+
+def test_manager_is_alive_unknown_entity_fail():
+    manager = Manager()
+    manager.create_entity()
+
+    assert not manager.is_alive(Entity(42))
+    assert not manager.is_alive(Entity(0))
+
+
+def test_entity_several_managers_success():
+    manager_a = Manager()
+    manager_b = Manager()
+    entity_a = manager_a.create_entity()
+    entity_b = manager_b.create_entity()
+    entity_a.add_component(Component('spam'))
+    entity_b.add_component(Component('egg'))
+
+    assert entity_a == entity_b
+    assert entity_a.manager is manager_a
+    assert entity_b.manager is manager_b
+    assert entity_a.get_component(Component).value == 'spam'
+    assert Entity(int(entity_a), manager_b).manager is manager_b
+
+
+def test_entity_without_dict_success():
+    entity = Manager().create_entity()
+
+    assert not hasattr(entity, '__dict__')
+    with pytest.raises(AttributeError):
+        entity.spam = 'egg'
+
+
+def test_entity_pickle_success():
+    import pickle
+
+    entity = Manager().create_entity()
+    unpickled = pickle.loads(pickle.dumps(entity))
+
+    assert unpickled == entity and unpickled.manager is None
+
+
+def test_manager_add_component_killed_entity_fail():
+    manager = Manager()
+    entity = manager.create_entity()
+    manager.kill_entity(entity)
+
+    with pytest.raises(ValueError):
+        entity.add_component(Component(42))
+
+
+def test_manager_changed_since_success():
+    manager = Manager()
+    manager.track_changes(Component)
+    entities = manager.create_entities(3, components={Component: [1, 2, 3]})
+    counter = manager.change_counter
+
+    entities[2].mark_changed(Component)
+    entities[0].mark_changed(Component)
+    entities[2].mark_changed(Component)
+    manager.kill_entity(entities[0])
+
+    assert list(manager.changed_since(Component, counter)) == [entities[2]]
+    assert list(manager.changed_since(Component, manager.change_counter)) == []
+
+
+def test_manager_mark_changed_untracked_success():
+    manager = Manager()
+    entity = manager.create_entity()
+    entity.add_component(Component(42))
+    entity.mark_changed(Component)
+
+    assert manager.change_counter == 0
+    assert list(manager.changed_since(Component, 0)) == []
+
+
+def test_manager_mark_changed_missing_component_fail():
+    manager = Manager()
+    manager.track_changes(Component)
+    manager.spatial_index(Component, 10, position=lambda c: c.value)
+    entity = manager.create_entity()
+
+    with pytest.raises(ValueError):
+        entity.mark_changed(Component)
+    manager.kill_entity(entity)
+    with pytest.raises(ValueError):
+        manager.mark_changed(entity, Component)
+    assert manager.change_counter == 0
+
+
+def test_manager_mark_changed_threads_success():
+    manager = Manager()
+    manager.track_changes(Component)
+    entities = manager.create_entities(400, components={
+        Component: range(400)
+    })
+    counter = manager.change_counter
+
+    def mark(entities):
+        for entity in entities:
+            manager.mark_changed(entity, Component)
+
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(mark, [entities[i::4] for i in range(4)]))
+
+    assert manager.change_counter == counter + 400
+    changed = list(manager.changed_since(Component, counter))
+    assert sorted(changed) == entities
+    assert list(manager.change_store[Component].values()) == list(
+        range(counter + 1, counter + 401)
+    )
+
+
+def test_entity_processor_changed_success():
+    class SpamComponent(Component):
+        pass
+
+    class CopyProcessor(EntityProcessor):
+        def update_entity(self, delta, entity):
+            self.updated.append(entity)
+            value = entity.get_component(Component).value
+            entity.get_component(SpamComponent).value = value
+
+    manager = Manager()
+    entities = manager.create_entities(3, components={
+        Component: [1, 2, 3],
+        SpamComponent: [0, 0, 0],
+    })
+    processor = CopyProcessor(
+        needed=[Component, SpamComponent], changed=[Component]
+    )
+    processor.updated = []
+    processor.register_to(manager)
+
+    manager.update(0.1)
+    assert sorted(processor.updated) == entities
+
+    processor.updated = []
+    entities[1].get_component(Component).value = 42
+    entities[1].mark_changed(Component)
+    manager.update(0.1)
+    assert processor.updated == [entities[1]]
+    assert entities[1].get_component(SpamComponent).value == 42
+
+    processor.updated = []
+    manager.update(0.1)
+    assert processor.updated == []
+
+
+def test_manager_removals_untracked_success():
+    class Update(EntityProcessor):
+        def update_entity(self, delta, entity):
+            pass
+
+    manager = Manager()
+    Update([Component], changed=[Component]).register_to(manager)
+    for i in range(10):
+        entities = manager.create_entities(10, components={
+            Component: range(10)
+        })
+        manager.update(0.1)
+        for entity in entities:
+            manager.kill_entity(entity)
+
+    assert manager.removal_store == {}
+    assert len(manager.change_store[Component]) == 0
+    assert list(manager.removed_since(Component, 0)) == []
+
+    manager.track_changes(Component, removals=True)
+    entity = manager.create_entity()
+    entity.add_component(Component(1))
+    manager.kill_entity(entity)
+    assert list(manager.removed_since(Component, 0)) == [entity]
+
+
+def test_entity_processor_changed_all_entities_success():
+    class Frozen(Tag):
+        pass
+
+    class Update(EntityProcessor):
+        def update_entity(self, delta, entity):
+            self.updated.append(entity)
+
+    manager = Manager()
+    entities = manager.create_entities(3, components={Component: [1, 2, 3]})
+    entities[2].add_component(Frozen())
+    processor = Update(changed=[Component], excluded=[Frozen])
+    processor.updated = []
+    processor.register_to(manager)
+    manager.update(0.1)
+
+    processor.updated = []
+    for entity in entities:
+        entity.mark_changed(Component)
+    manager.update(0.1)
+    assert sorted(processor.updated) == entities[:2]
+
+
+def test_manager_remove_component_success():
+    class SpamComponent(Component):
+        pass
+
+    manager = Manager()
+    manager.track_changes(Component)
+    entity, other = manager.create_entities(2, components={
+        Component: [1, 2],
+        SpamComponent: ['a', 'b'],
+    })
+    view = manager.view([Component, SpamComponent])
+
+    entity.remove_component(Component)
+    assert entity.get_component(Component) is None
+    assert entity.get_component(SpamComponent).value == 'a'
+    assert list(manager.entities_by_type(Component)) == [other]
+    assert list(view) == [other]
+    assert list(manager.changed_since(Component, 0)) == [other]
+
+    entity.add_component(Component(3))
+    assert sorted(view) == [entity, other]
+
+
+def test_manager_remove_component_missing_success():
+    manager = Manager()
+    entity = manager.create_entity()
+    manager.remove_component(entity, Component)
+    assert entity.get_component(Component) is None
+
+
+def test_manager_remove_component_killed_entity_fail():
+    manager = Manager()
+    entity = manager.create_entity()
+    manager.kill_entity(entity)
+    with pytest.raises(ValueError):
+        entity.remove_component(Component)
+
+
+def test_manager_tag_success():
+    class Enemy(Tag):
+        pass
+
+    class Visible(Tag):
+        pass
+
+    manager = Manager()
+    entities = manager.create_entities(4, components={Component: range(4)})
+    manager.add_components_bulk(entities[:3], Enemy, [None] * 3)
+    entities[1].add_component(Visible())
+    entities[2].add_component(Visible())
+    view = manager.view([Component, Enemy, Visible])
+
+    assert entities[0].get_component(Enemy) is Enemy()
+    assert entities[3].get_component(Enemy) is None
+    assert Enemy not in manager.entity_store[entities[1]]
+    assert sorted(manager.entities_by_types([Enemy, Visible])) == [
+        entities[1], entities[2]
+    ]
+    assert sorted(view) == [entities[1], entities[2]]
+
+    entities[2].remove_component(Enemy)
+    manager.kill_entity(entities[1])
+    assert list(manager.entities_by_types([Visible, Enemy])) == []
+    assert list(manager.entities_by_types([Visible, Component])) == [
+        entities[2]
+    ]
+    assert list(view) == []
+
+    entity = manager.create_entity()
+    assert entity.index == entities[1].index
+    assert entity.get_component(Enemy) is None
+    assert list(manager.components_by_type(Enemy)) == [Enemy()]
+
+
+class Position(Component):
+    fields = ('x', 'y')
+
+
+def test_component_fields_success():
+    position = Position({'x': 1, 'y': 2})
+
+    assert not hasattr(position, '__dict__')
+    assert Component(1).type is Component
+    assert (position.x, position.y) == (1, 2)
+    position.value['x'] = 3
+    assert position.x == 3
+    assert sorted(position.value.items()) == [('x', 3), ('y', 2)]
+
+
+def test_component_fields_subclass_success():
+    class Position3(Position):
+        fields = ('x', 'y', 'z')
+
+    class Spawn(Position):
+        pass
+
+    position = Position3(1, 2, z=3)
+    assert not hasattr(position, '__dict__')
+    assert (position.x, position.y, position.z) == (1, 2, 3)
+    assert not hasattr(Spawn(1, 2), '__dict__')
+    assert Spawn(1, 2).type is Spawn
+
+
+def test_component_fields_inherited_success():
+    class Position3(Position):
+        fields = ('z',)
+
+    position = Position3(1, 2, 3)
+    assert Position3.fields == ('x', 'y', 'z')
+    assert (position.x, position.y, position.z) == (1, 2, 3)
+    assert dict(Position3(z=6, x=4, y=5).value) == {'x': 4, 'y': 5, 'z': 6}
+    assert not hasattr(position, '__dict__')
+
+
+@pytest.mark.parametrize('args, kwargs', [
+    ((1,), {}),
+    ((1, 2, 3), {}),
+    ((1,), {'x': 2}),
+    ((), {'x': 1, 'z': 2}),
+    (({'x': 1},), {}),
+])
+def test_component_fields_fail(args, kwargs):
+    with pytest.raises(TypeError):
+        Position(*args, **kwargs)
+
+
+def test_component_fields_value_fail():
+    position = Position(1, 2)
+
+    with pytest.raises(KeyError):
+        position.value['z']
+    with pytest.raises(KeyError):
+        position.value['z'] = 3
+    with pytest.raises(TypeError):
+        del position.value['x']
+    assert dict(position.value) == {'x': 1, 'y': 2}
+
+
+def test_manager_component_fields_success():
+    manager = Manager()
+    entities = manager.create_entities(2, components={
+        Position: [{'x': 1, 'y': 2}, {'x': 3, 'y': 4}],
+    })
+    entities[0].add_component(Position(5, 6))
+
+    assert [p.x for p in manager.components_by_type(Position)] == [5, 3]
+    assert entities[1].get_component(Position).value['y'] == 4
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from pytity.archetype import ArchetypeManager
+from pytity.component import Component, Tag
+from pytity.manager import Manager
+from pytity.storage import TagSet
+from pytity.view import View
+
+
+class Position(Component):
+    pass
+
+
+class Frozen(Component):
+    pass
+
+
+class Boss(Tag):
+    pass
+
+
+class Enemy(Tag):
+    pass
+
+
+def create_world(manager):
+    entities = manager.create_entities(10, components={
+        Position: range(10),
+        Component: range(10),
+    })
+    manager.add_components_bulk(entities[:2], Boss, None)
+    manager.add_components_bulk(entities[:5], Enemy, None)
+    entities[0].add_component(Frozen(True))
+    entities[9].add_component(Frozen(True))
+    return entities
+
+
+def test_query_plan_smallest_store_success():
+    manager = Manager()
+    entities = create_world(manager)
+
+    plan = manager.query([Position, Frozen, Component]).plan()
+    assert plan.driver is manager.component_store[Frozen]
+    assert len(plan.probes) == 2
+    assert sorted(manager.query([Position, Frozen])) == [
+        entities[0], entities[9]
+    ]
+
+    plan = manager.query([Position, Boss, Enemy]).plan()
+    assert plan.bits is None and len(plan.probes) == 1
+    assert sorted(manager.query([Position, Boss, Enemy])) == entities[:2]
+
+    plan = manager.query([Frozen, Enemy]).plan()
+    assert plan.driver is manager.component_store[Frozen]
+    assert TagSet.contains(plan.bits, entities[0])
+    assert list(manager.query([Frozen, Enemy])) == [entities[0]]
+
+
+@pytest.mark.parametrize('manager_class', [Manager, ArchetypeManager])
+def test_entities_by_types_without_success(manager_class):
+    manager = manager_class()
+    entities = create_world(manager)
+
+    assert sorted(manager.entities_by_types([Position], without=[Frozen])) \
+        == entities[1:9]
+    assert sorted(manager.entities_by_types([Position], without=[Enemy])) \
+        == entities[5:]
+    assert sorted(
+        manager.entities_by_types([Enemy], without=[Boss, Frozen])
+    ) == entities[2:5]
+    assert sorted(manager.entities_by_types([Position], without=[Tag])) \
+        == entities
+
+
+def test_query_rows_optional_success():
+    manager = Manager()
+    entities = create_world(manager)
+
+    query = manager.query([Boss, Position], optional=[Frozen, Enemy])
+    rows = sorted(query.rows())
+    assert [row[0] for row in rows] == entities[:2]
+    assert rows[0][1:3] == (Boss(), entities[0].get_component(Position))
+    assert rows[0][3].value is True and rows[1][3] is None
+    assert rows[1][4] is Enemy()
+
+
+def test_query_missing_type_success():
+    manager = Manager()
+    create_world(manager)
+    query = manager.query([Position, Tag])
+    assert query.plan() is None
+    assert list(query) == [] and list(query.rows()) == []
+    assert list(manager.query([])) == []
+
+
+def test_query_kill_while_iterating_success():
+    manager = Manager()
+    create_world(manager)
+    for entity in manager.query([Position, Enemy]):
+        manager.kill_entity(entity)
+    assert list(manager.query([Enemy])) == []
+    assert len(list(manager.query([Position]))) == 5
+
+
+@pytest.mark.parametrize('manager_class', [Manager, ArchetypeManager])
+def test_manager_join_success(manager_class):
+    manager = manager_class()
+    entities = create_world(manager)
+
+    rows = sorted(manager.join(Position, Component, without=[Frozen]))
+    assert [row[0] for row in rows] == entities[1:9]
+    assert all(
+        row[1] is manager.get_component(row[0], Position) and
+        row[2].value == row[1].value for row in rows
+    )
+
+    rows = sorted(manager.join(Boss, Position))
+    assert rows == [(e, Boss(), e.get_component(Position))
+                    for e in entities[:2]]
+    assert sorted(manager.join(Position, without=[Enemy])) == [
+        (e, e.get_component(Position)) for e in entities[5:]
+    ]
+
+
+@pytest.mark.parametrize('manager_class', [Manager, ArchetypeManager])
+def test_manager_join_kill_while_iterating_success(manager_class):
+    manager = manager_class()
+    create_world(manager)
+    for entity, position in manager.join(Position):
+        if position.value % 2:
+            manager.kill_entity(entity)
+    assert sorted(c.value for e, c in manager.join(Position)) == [
+        0, 2, 4, 6, 8
+    ]
+
+
+def test_query_where_select_success():
+    manager = Manager()
+    entities = create_world(manager)
+    query = manager.query([Position, Boss], optional=[Frozen])
+
+    frozen = query.where(lambda entity, position, boss, frozen: frozen)
+    assert list(frozen) == [entities[0]]
+    assert list(query.where(lambda *row: True).where(lambda *row: False)) \
+        == []
+    assert sorted(query) == entities[:2]
+
+    selected = sorted(query.select((Position, 'value'), Frozen).rows())
+    assert selected == [
+        (entities[0], 0, entities[0].get_component(Frozen)),
+        (entities[1], 1, None),
+    ]
+    with pytest.raises(ValueError):
+        query.select(Component)
+
+
+def test_query_chunks_success():
+    manager = Manager()
+    entities = create_world(manager)
+    query = manager.query([Position]).select((Position, 'value'))
+
+    chunks = list(query.chunks(4))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    assert sorted(row for chunk in chunks for row in chunk) == [
+        (entity, i) for i, entity in enumerate(entities)
+    ]
+    assert list(manager.query([Tag]).chunks(4)) == []
+
+
+def test_query_count_success():
+    manager = Manager()
+    entities = create_world(manager)
+    query = manager.query([Position], without=[Enemy])
+    assert query.count() == 5
+    assert query.where(lambda e, p: p.value > 6).count() == 3
+
+    view = manager.view([Position], without=[Enemy])
+    assert query.plan().driver is view
+    entities[5].add_component(Enemy())
+    assert query.count() == len(view) == 4
+
+
+def test_query_streaming_success():
+    manager = Manager()
+    create_world(manager)
+    calls = []
+
+    def predicate(entity, position):
+        calls.append(entity)
+        return True
+
+    rows = manager.query([Position]).where(predicate).rows()
+    next(rows)
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('view', [False, True])
+def test_query_stream_kill_others_success(view):
+    manager = Manager()
+    entities = create_world(manager)
+    if view:
+        manager.view([Position, Component])
+    query = manager.query([Position, Component])
+    store = query.plan().driver
+    assert isinstance(store, View) == view
+    dense = store.dense
+
+    visited = []
+    for entity in query:
+        if not visited:
+            assert store.dense is dense and store.readers == 1
+            manager.kill_entity(entities[-1] if entity != entities[-1]
+                                else entities[0])
+            manager.create_entity().add_component(Position(42))
+        visited.append(entity)
+
+    assert len(visited) == 9 and len(set(visited)) == 9
+    assert sorted(visited) == sorted(query)
+    assert store.readers == 0
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from pytity.component import Component, Tag
+from pytity.manager import Manager
+from pytity.replication import Quantizer, Replicator
+
+
+class Position(Component):
+    fields = ('x', 'y')
+
+
+class Health(Component):
+    def __init__(self, points, maximum):
+        Component.__init__(self, points)
+        self.maximum = maximum
+
+
+class Enemy(Tag):
+    pass
+
+
+TYPES = [Component, Position, Health, Enemy]
+
+
+def replicate(server, quantizers=None):
+    client = Manager()
+    return (
+        Replicator(server, TYPES, quantizers),
+        Replicator(client, TYPES, quantizers),
+        client,
+    )
+
+
+def test_replicator_full_state_success():
+    server = Manager()
+    entities = server.create_entities(3, components={
+        Component: ['a', 'b', 'c'],
+        Position: [{'x': float(i), 'y': i} for i in range(3)],
+    })
+    entities[1].add_component(Health(3, 5))
+    entities[2].add_component(Enemy())
+    sender, receiver, client = replicate(server)
+
+    tick = receiver.apply(sender.delta(0))
+    assert tick == sender.tick
+    assert sorted(client.entities()) == entities
+    assert client.get_component(entities[0], Component).value == 'a'
+    assert client.get_component(entities[2], Position).x == 2.0
+    assert client.get_component(entities[1], Health).maximum == 5
+    assert list(client.entities_by_types([Position, Enemy])) == [entities[2]]
+
+
+def test_replicator_delta_success():
+    server = Manager()
+    entities = server.create_entities(3, components={
+        Position: [{'x': 0.0, 'y': 0.0}] * 3,
+    })
+    entities[0].add_component(Enemy())
+    sender, receiver, client = replicate(server)
+    tick = receiver.apply(sender.delta(0))
+    full = sender.delta(0)
+
+    entities[1].get_component(Position).x = 42.0
+    entities[1].mark_changed(Position)
+    entities[0].remove_component(Enemy)
+    server.kill_entity(entities[2])
+    created = server.create_entity()
+    created.add_component(Position(1.0, 2.0))
+
+    data = sender.delta(tick)
+    assert len(data) < len(full)
+    tick = receiver.apply(data)
+    assert sorted(client.entities()) == sorted(server.entities())
+    assert client.get_component(entities[1], Position).x == 42.0
+    assert client.get_component(entities[0], Enemy) is None
+    assert client.get_component(created, Position).value['y'] == 2.0
+
+    assert len(sender.delta(tick)) < len(data)
+
+
+def test_replicator_reused_index_success():
+    server = Manager()
+    entity = server.create_entity()
+    entity.add_component(Enemy())
+    sender, receiver, client = replicate(server)
+    tick = receiver.apply(sender.delta(0))
+
+    server.kill_entity(entity)
+    reused = server.create_entity()
+    reused.add_component(Enemy())
+    receiver.apply(sender.delta(tick))
+
+    assert reused.index == entity.index
+    assert list(client.entities()) == [reused]
+    assert list(client.entities_by_type(Enemy)) == [reused]
+
+
+def test_replicator_quantizer_success():
+    server = Manager()
+    entity = server.create_entity()
+    entity.add_component(Position(1.23456, 7.0))
+    quantizers = {(Position, 'x'): Quantizer(0.01, 'h')}
+    sender, receiver, client = replicate(server, quantizers)
+
+    data = sender.delta(0)
+    assert len(data) < len(replicate(server)[0].delta(0))
+    receiver.apply(data)
+    assert client.get_component(entity, Position).x == pytest.approx(1.23)
+    assert client.get_component(entity, Position).y == 7.0
+
+
+def test_replicator_array_component_success():
+    pytest.importorskip('numpy')
+    from pytity.columnar import ArrayComponent
+
+    class Speed(ArrayComponent):
+        dtype = [('x', 'float64'), ('y', 'int32')]
+
+    server = Manager()
+    entities = server.create_entities(2, components={
+        Speed: {'x': [1.5, 2.5], 'y': [3, 4]},
+    })
+    client = Manager()
+    sender = Replicator(server, [Speed])
+    tick = Replicator(client, [Speed]).apply(sender.delta(0))
+
+    assert tick == sender.tick
+    assert client.get_component(entities[1], Speed).x == 2.5
+    assert client.get_component(entities[0], Speed).y == 3
+
+
+def test_replicator_forget_success():
+    server = Manager()
+    entities = server.create_entities(2, components={Component: [1, 2]})
+    sender = Replicator(server, [Component])
+    tick = sender.tick
+    server.kill_entity(entities[0])
+
+    sender.forget(tick)
+    assert len(server.removal_store[Component]) == 1
+    sender.forget(sender.tick)
+    assert len(server.removal_store[Component]) == 0
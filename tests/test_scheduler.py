@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+
+from pytity.component import Component
+from pytity.manager import Manager
+from pytity.processor import Processor
+from pytity.scheduler import ParallelScheduler
+
+
+class SpamComponent(Component):
+    pass
+
+
+class EggComponent(Component):
+    pass
+
+
+class RecordProcessor(Processor):
+    def __init__(self, name, record, **kwargs):
+        Processor.__init__(self, **kwargs)
+        self.name = name
+        self.record = record
+
+    def update(self, delta):
+        self.record.append(self.name)
+
+
+class BarrierProcessor(Processor):
+    def __init__(self, barrier, **kwargs):
+        Processor.__init__(self, **kwargs)
+        self.barrier = barrier
+
+    def update(self, delta):
+        self.barrier.wait()
+
+
+def test_parallel_scheduler_stages_success():
+    record = []
+    spam = RecordProcessor('spam', record, needed=[SpamComponent])
+    egg = RecordProcessor('egg', record, needed=[EggComponent])
+    both = RecordProcessor(
+        'both', record, reads=[SpamComponent, EggComponent], writes=[]
+    )
+    anything = RecordProcessor('anything', record)
+
+    stages = ParallelScheduler().stages([spam, egg, both, anything])
+
+    assert stages == [[spam, egg], [both], [anything]]
+
+
+def test_parallel_scheduler_readers_together_success():
+    readers = [
+        Processor(reads=[SpamComponent], writes=[EggComponent]),
+        Processor(reads=[SpamComponent], writes=[]),
+    ]
+
+    assert len(ParallelScheduler().stages(readers)) == 1
+
+
+def test_parallel_scheduler_run_concurrently_success():
+    barrier = threading.Barrier(2, timeout=5)
+    manager = Manager()
+    manager.scheduler = ParallelScheduler(max_workers=2)
+    BarrierProcessor(barrier, needed=[SpamComponent]).register_to(manager)
+    BarrierProcessor(barrier, needed=[EggComponent]).register_to(manager)
+
+    manager.update(0.1)
+    manager.scheduler.shutdown()
+
+    assert not barrier.broken
+
+
+def test_parallel_scheduler_conflicting_order_success():
+    record = []
+    manager = Manager()
+    manager.scheduler = ParallelScheduler(max_workers=4)
+    for i in range(4):
+        RecordProcessor(i, record, needed=[SpamComponent]).register_to(manager)
+
+    manager.update(0.1)
+    manager.scheduler.shutdown()
+
+    assert record == [0, 1, 2, 3]
+
+
+def test_parallel_scheduler_error_fail():
+    class ErrorProcessor(Processor):
+        def update(self, delta):
+            raise KeyError('spam')
+
+    manager = Manager()
+    manager.scheduler = ParallelScheduler(max_workers=2)
+    ErrorProcessor(needed=[SpamComponent]).register_to(manager)
+    ErrorProcessor(needed=[EggComponent]).register_to(manager)
+
+    with pytest.raises(KeyError):
+        manager.update(0.1)
+    manager.scheduler.shutdown()
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+import json
+import mmap
+
+import pytest
+
+from pytity.archetype import ArchetypeManager
+from pytity.component import Component, Tag
+from pytity.manager import Manager
+from pytity.snapshot import (
+    LENGTH, MAGIC, VERSION, SnapshotError, Writer, type_name
+)
+
+
+class Position(Component):
+    fields = ('x', 'y')
+
+
+class Enemy(Tag):
+    pass
+
+
+class Name(Component):
+    def __init__(self, first, last):
+        Component.__init__(self, '{0} {1}'.format(first, last))
+        self.first = first
+
+
+def create_world(manager):
+    entities = manager.create_entities(4, components={
+        Component: ['a', 'b', {'c': 3}, None],
+        Position: [{'x': float(i), 'y': i} for i in range(4)],
+    })
+    manager.add_components_bulk(entities[1:3], Enemy, None)
+    entities[3].add_component(Position('x', [1]))
+    manager.kill_entity(entities[0])
+    return entities
+
+
+def test_snapshot_restore_success():
+    manager = Manager()
+    entities = create_world(manager)
+    data = manager.snapshot()
+
+    restored = Manager()
+    restored.restore(data)
+    assert sorted(restored.entities()) == sorted(manager.entities())
+    assert not restored.is_alive(entities[0])
+    assert restored.get_component(entities[2], Component).value == {'c': 3}
+    assert restored.get_component(entities[1], Position).x == 1.0
+    assert restored.get_component(entities[3], Position).y == [1]
+    assert sorted(restored.entities_by_types([Enemy, Position])) == [
+        entities[1], entities[2]
+    ]
+
+    entity = restored.create_entity()
+    assert entity.index == entities[0].index
+    assert entity.generation == 1
+
+
+def test_snapshot_restore_replace_state_success():
+    manager = Manager()
+    create_world(manager)
+    data = manager.snapshot()
+    view = manager.view([Position])
+    other = manager.create_entity()
+    other.add_component(Position(0, 0))
+
+    manager.restore(data)
+    assert other not in manager.view([Position])
+    assert len(manager.view([Position])) == 3
+    assert manager.view([Position]) is not view
+    assert manager.snapshot() == data
+
+
+def test_snapshot_restore_archetype_manager_success():
+    manager = ArchetypeManager()
+    entities = create_world(manager)
+
+    restored = ArchetypeManager()
+    restored.restore(manager.snapshot())
+    archetype = restored.entity_archetype[entities[1]]
+    assert archetype.signature == frozenset([Component, Position])
+    assert list(restored.entities_by_types([Position, Enemy])) != []
+
+
+def test_snapshot_restore_local_type_success():
+    class Local(Component):
+        pass
+
+    manager = Manager()
+    entity = manager.create_entity()
+    entity.add_component(Local(42))
+    data = manager.snapshot()
+
+    restored = Manager()
+    other = restored.create_entity()
+    with pytest.raises(SnapshotError):
+        restored.restore(data)
+    assert list(restored.entities()) == [other]
+
+    restored = Manager()
+    restored.restore(data, component_types=[Local])
+    assert restored.get_component(entity, Local).type is Local
+
+
+def test_snapshot_restore_pickle_success():
+    manager = Manager()
+    entity = manager.create_entity()
+    entity.add_component(Name('Monty', 'Python'))
+
+    restored = Manager()
+    restored.restore(manager.snapshot())
+    name = restored.get_component(entity, Name)
+    assert (name.value, name.first) == ('Monty Python', 'Monty')
+
+
+def test_snapshot_restore_big_integer_success():
+    manager = Manager()
+    entity = manager.create_entity()
+    entity.add_component(Position(1, 2 ** 70))
+
+    restored = Manager()
+    restored.restore(manager.snapshot())
+    assert restored.get_component(entity, Position).y == 2 ** 70
+
+
+def test_manager_clear_tracked_types_success():
+    manager = Manager()
+    manager.track_changes(Component, removals=True)
+    entities = manager.create_entities(2, components={Component: [1, 2]})
+    manager.kill_entity(entities[0])
+
+    manager.clear()
+    assert list(manager.changed_since(Component, 0)) == []
+    assert list(manager.removed_since(Component, 0)) == []
+
+    entity = manager.create_entity()
+    entity.add_component(Component(3))
+    assert list(manager.changed_since(Component, 0)) == [entity]
+
+
+def test_snapshot_restore_mmap_success(tmpdir):
+    manager = Manager()
+    entities = create_world(manager)
+    path = tmpdir.join('world.snapshot')
+    path.write_binary(manager.snapshot())
+
+    restored = Manager()
+    with open(str(path), 'rb') as snapshot_file:
+        data = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        restored.restore(data)
+        data.close()
+    assert restored.get_component(entities[2], Position).y == 2
+
+
+def test_snapshot_restore_array_component_success():
+    numpy = pytest.importorskip('numpy')
+    from pytity.columnar import ArrayComponent
+
+    class Speed(ArrayComponent):
+        dtype = [('x', 'float64'), ('v', 'int32', (2,))]
+
+    manager = Manager()
+    entities = manager.create_entities(3, components={
+        Speed: {'x': [1.0, 2.0, 3.0], 'v': numpy.arange(6).reshape(3, 2)},
+    })
+    manager.kill_entity(entities[0])
+
+    restored = Manager()
+    restored.restore(manager.snapshot(), component_types=[Speed])
+    arrays = restored.component_store[Speed].arrays()
+    assert arrays.x.tolist() == [3.0, 2.0]
+    assert arrays.v.tolist() == [[4, 5], [2, 3]]
+    assert restored.get_component(entities[1], Speed).x == 2.0
+
+
+@pytest.mark.parametrize('header', [
+    {'magic': 'spam', 'version': 1},
+    {'magic': 'pytity-snapshot', 'version': 42},
+])
+def test_snapshot_restore_bad_header_fail(header):
+    data = json.dumps(header).encode('utf-8')
+    with pytest.raises(SnapshotError):
+        Manager().restore(LENGTH.pack(len(data)) + data)
+
+
+@pytest.mark.parametrize('data', [
+    LENGTH.pack(4) + b'\xff\xfe\x00\x01',
+    LENGTH.pack(100) + b'{}',
+])
+def test_snapshot_restore_bad_data_fail(data):
+    with pytest.raises(SnapshotError):
+        Manager().restore(data)
+
+
+def test_snapshot_restore_unknown_kind_fail():
+    writer = Writer()
+    writer.json({'magic': MAGIC, 'version': VERSION, 'component_types': 1})
+    for i in range(3):
+        writer.block(b'')
+    writer.json({'type': type_name(Component), 'kind': 'spam'})
+    with pytest.raises(SnapshotError):
+        Manager().restore(writer.getvalue())
+
+
+def test_snapshot_restore_truncated_fail():
+    manager = Manager()
+    create_world(manager)
+    with pytest.raises(SnapshotError):
+        Manager().restore(manager.snapshot()[:-10])
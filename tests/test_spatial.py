@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import random
+
+import pytest
+
+from pytity.archetype import ArchetypeManager
+from pytity.component import Component
+from pytity.manager import Manager
+from pytity.spatial import UniformGrid
+
+
+class Position(Component):
+    fields = ('x', 'y')
+
+
+def random_grid(number, cell_size):
+    rand = random.Random(42)
+    grid = UniformGrid(cell_size)
+    for entity in range(number):
+        grid.move(entity, rand.uniform(-50, 50), rand.uniform(-50, 50))
+    return grid
+
+
+def close(grid, first, second, distance):
+    (x, y), (other_x, other_y) = grid.positions[first], grid.positions[second]
+    return (x - other_x) ** 2 + (y - other_y) ** 2 <= distance ** 2
+
+
+@pytest.mark.parametrize('distance', [1.0, 5.0, 12.0])
+def test_uniform_grid_pairs_success(distance):
+    grid = random_grid(300, 5)
+    expected = set(
+        pair for pair in itertools.combinations(range(300), 2)
+        if close(grid, pair[0], pair[1], distance)
+    )
+
+    pairs = list(grid.pairs(distance))
+    assert len(pairs) == len(expected)
+    assert set(pairs) == expected
+
+
+def test_uniform_grid_queries_success():
+    grid = random_grid(300, 5)
+    expected = [e for e in range(300) if close(grid, e, 0, 8)]
+    x, y = grid.positions[0]
+    assert sorted(grid.query_radius(x, y, 8)) == expected
+
+    expected = [
+        e for e, (x, y) in grid.positions.items()
+        if -10 <= x <= 20 and -100 <= y <= 0
+    ]
+    assert sorted(grid.query_aabb(-10, -100, 20, 0)) == sorted(expected)
+
+
+def test_uniform_grid_move_discard_success():
+    grid = UniformGrid(1)
+    grid.move(1, 0.5, 0.5)
+    grid.move(1, -0.5, 0.5)
+    grid.move(1, -0.2, 0.8)
+    assert grid.cells == {(-1, 0): set([1])}
+    assert 1 in grid and grid.positions[1] == (-0.2, 0.8)
+    grid.move(2, 0.5, 0.5)
+    assert list(grid.pairs()) == [(1, 2)]
+    grid.discard(2)
+    grid.discard(1)
+    grid.discard(1)
+    assert grid.cells == {} and len(grid) == 0
+
+
+@pytest.mark.parametrize('manager_class', [Manager, ArchetypeManager])
+def test_manager_spatial_index_sync_success(manager_class):
+    manager = manager_class()
+    first = manager.create_entity()
+    first.add_component(Position(0, 0))
+    manager.spatial_index(Position, 10)
+    entities = manager.create_entities(2, components={
+        Position: [{'x': 1, 'y': 1}, {'x': 30, 'y': 30}],
+    })
+    assert sorted(manager.query_radius(Position, 0, 0, 2)) == [
+        first, entities[0]
+    ]
+
+    entities[1].get_component(Position).x = 2
+    entities[1].get_component(Position).y = 0
+    entities[1].mark_changed(Position)
+    entities[0].add_component(Position(100, 100))
+    assert sorted(manager.query_aabb(Position, -5, -5, 5, 5)) == [
+        first, entities[1]
+    ]
+    assert list(manager.close_pairs(Position, 3)) == [(first, entities[1])]
+
+    first.remove_component(Position)
+    manager.kill_entity(entities[1])
+    assert manager.query_radius(Position, 0, 0, 10) == []
+    assert len(manager.spatial_store[Position]) == 1
+
+
+def test_manager_spatial_index_restore_success():
+    manager = Manager()
+    entity = manager.create_entity()
+    entity.add_component(Position(0, 0))
+    data = manager.snapshot()
+    manager.spatial_index(Position, 10)
+    manager.create_entity().add_component(Position(1, 1))
+
+    manager.restore(data)
+    assert manager.query_radius(Position, 0, 0, 5) == [entity]
+
+
+def test_manager_query_not_indexed_fail():
+    with pytest.raises(ValueError):
+        Manager().query_radius(Position, 0, 0, 1)
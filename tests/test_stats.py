@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+from pytity.component import Component
+from pytity.manager import Manager
+from pytity.processor import EntityProcessor, Processor
+from pytity.stats import RollingStats, StatsSink
+
+
+class NothingProcessor(EntityProcessor):
+    def update_entity(self, delta, entity):
+        pass
+
+
+class RecordSink(StatsSink):
+    def __init__(self):
+        self.records = []
+
+    def record(self, processor, phase, duration, visited):
+        self.records.append((processor, phase, visited))
+
+
+def test_manager_stats_sink_success():
+    manager = Manager()
+    manager.create_entities(3, components={Component: [1, 2, 3]})
+    processor = NothingProcessor(needed=[Component])
+    processor.register_to(manager)
+    manager.stats = RecordSink()
+
+    manager.update(0.1)
+
+    assert manager.stats.records == [
+        (processor, 'pre_update', None),
+        (processor, 'update', 3),
+        (processor, 'post_update', None),
+    ]
+
+
+def test_rolling_stats_window_and_percentiles_success():
+    processor = Processor()
+    stats = RollingStats(window=10)
+    for i in range(20):
+        stats.record(processor, 'update', float(i), None)
+
+    assert list(stats.durations[processor, 'update']) == [
+        float(i) for i in range(10, 20)
+    ]
+    assert stats.percentile(processor, 'update', 0) == 10
+    assert stats.percentile(processor, 'update', 50) == 14
+    assert stats.percentile(processor, 'update', 100) == 19
+    assert stats.percentile(processor, 'pre_update', 50) is None
+
+
+def test_rolling_stats_report_success():
+    manager = Manager()
+    manager.create_entities(2, components={Component: [1, 2]})
+    NothingProcessor().register_to(manager)
+    manager.stats = RollingStats()
+    manager.update(0.1)
+
+    report = manager.stats.report(percents=(50,))
+
+    assert len(report) == 3
+    update = [row for row in report if row['phase'] == 'update'][0]
+    assert update['processor'] == 'NothingProcessor'
+    assert update['visited'] == 2 and update['count'] == 1
+    assert update['p50'] >= 0
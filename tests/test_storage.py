@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from pytity.entity import INDEX_BITS
+from pytity.storage import SparseSet, TagSet
+
+
+def test_sparse_set_add_twice_success():
+    sparse_set = SparseSet([1, 2])
+    sparse_set.add(1)
+
+    assert list(sparse_set) == [1, 2]
+    assert len(sparse_set) == 2
+
+
+def test_sparse_set_discard_keep_index_success():
+    sparse_set = SparseSet([1, 2, 3, 4])
+    sparse_set.discard(2)
+    sparse_set.discard(42)
+
+    assert list(sparse_set) == [1, 4, 3]
+    for row, entity in enumerate(sparse_set.dense):
+        assert sparse_set.index[entity] == row
+
+
+def test_sparse_set_remove_success():
+    sparse_set = SparseSet([1, 2, 3])
+    sparse_set.remove(1)
+
+    assert list(sparse_set) == [3, 2]
+    assert 1 not in sparse_set
+
+
+def test_sparse_set_remove_not_existing_fail():
+    sparse_set = SparseSet()
+
+    with pytest.raises(KeyError):
+        sparse_set.remove(42)
+
+
+def test_sparse_set_reversed_no_copy_success():
+    sparse_set = SparseSet([1, 2, 3])
+    dense = sparse_set.dense
+
+    assert list(reversed(sparse_set)) == [3, 2, 1]
+    sparse_set.add(4)
+    sparse_set.discard(1)
+    assert sparse_set.dense is dense
+    assert sparse_set.readers == 0
+
+
+def test_sparse_set_reversed_copy_on_write_success():
+    sparse_set = SparseSet([1, 2, 3, 4, 5])
+    dense = sparse_set.dense
+    iterator = reversed(sparse_set)
+
+    assert next(iterator) == 5
+    sparse_set.add(6)
+    sparse_set.discard(2)
+    sparse_set.discard(5)
+    assert list(iterator) == [4, 3, 1]
+    assert dense == [1, 2, 3, 4, 5]
+    assert sorted(sparse_set) == [1, 3, 4, 6]
+    for row, entity in enumerate(sparse_set.dense):
+        assert sparse_set.index[entity] == row
+
+
+def test_tag_set_add_discard_success():
+    tag_set = TagSet([0] * 100)
+    tag_set.extend([1, 42, 99, 42])
+    tag_set.discard(42)
+    tag_set.discard(7)
+
+    assert list(tag_set) == [1, 99]
+    assert len(tag_set) == 2
+    assert len(tag_set.bits) <= 100 // 8 * 2
+
+
+def test_tag_set_remove_not_existing_fail():
+    tag_set = TagSet([0] * 8)
+    tag_set.add(3)
+    tag_set.remove(3)
+
+    with pytest.raises(KeyError):
+        tag_set.remove(3)
+
+
+def test_tag_set_stale_generation_fail():
+    generations = [0] * 8
+    tag_set = TagSet(generations)
+    tag_set.add(3)
+    generations[3] += 1
+
+    assert 3 not in tag_set
+    assert list(tag_set) == [(1 << INDEX_BITS) | 3]
+    with pytest.raises(KeyError):
+        tag_set.remove(3)
+
+
+def test_tag_set_intersection_success():
+    generations = [0] * 64
+    first, second = TagSet(generations), TagSet(generations)
+    first.extend(range(0, 64, 2))
+    second.extend(range(0, 30, 3))
+
+    bits = TagSet.intersection([first, second])
+    assert list(first.entities(bits)) == [0, 6, 12, 18, 24]
+    assert TagSet.contains(bits, 12) and not TagSet.contains(bits, 63)
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from pytity.archetype import ArchetypeManager
+from pytity.manager import Manager
+from pytity.component import Component, Tag
+from pytity.processor import EntityProcessor
+
+
+class SpamComponent(Component):
+    pass
+
+
+class Frozen(Tag):
+    pass
+
+
+def test_view_follow_add_and_kill_success():
+    manager = Manager()
+    view = manager.view([Component, SpamComponent])
+    entity = manager.create_entity()
+
+    entity.add_component(Component(42))
+    assert entity not in view
+
+    entity.add_component(SpamComponent('spam'))
+    assert list(view) == [entity]
+
+    manager.kill_entity(entity)
+    assert len(view) == 0
+
+
+def test_view_filled_with_existing_entities_success():
+    manager = Manager()
+    entity = manager.create_entity()
+    entity.add_component(Component(42))
+    entity.add_component(Component(43))
+
+    assert list(manager.view([Component])) == [entity]
+
+
+def test_view_empty_types_success():
+    manager = Manager()
+    entity = manager.create_entity()
+    entity.add_component(Component(42))
+
+    assert len(manager.view([])) == 0
+
+    entity.add_component(Frozen())
+    view = manager.view([], without=[Frozen])
+    entity.remove_component(Frozen)
+    assert len(view) == 0
+
+
+def test_entity_processor_empty_needed_excluded_success():
+    class Update(EntityProcessor):
+        def update_entity(self, delta, entity):
+            raise AssertionError('update_entity() must not be called')
+
+    manager = Manager()
+    entities = manager.create_entities(2, components={Component: [1, 2]})
+    entities[0].add_component(Frozen())
+    Update(needed=[], excluded=[Frozen]).register_to(manager)
+    manager.update(0.1)
+    entities[0].remove_component(Frozen)
+    manager.update(0.1)
+
+
+def test_entity_processor_kill_while_updating_success():
+    class KillProcessor(EntityProcessor):
+        def update_entity(self, delta, entity):
+            self.visited.append(entity)
+            self.manager.kill_entity(entity)
+
+    manager = Manager()
+    entities = [manager.create_entity() for i in range(5)]
+    for entity in entities:
+        entity.add_component(Component(42))
+    processor = KillProcessor(needed=[Component])
+    processor.visited = []
+    processor.register_to(manager)
+
+    manager.update(0.1)
+
+    assert sorted(processor.visited) == entities
+    assert len(list(manager.entities())) == 0
+
+
+@pytest.mark.parametrize('manager_class', [Manager, ArchetypeManager])
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'with_components': True},
+    {'optional': [SpamComponent]},
+])
+def test_entity_processor_kill_others_while_updating_success(manager_class,
+                                                             kwargs):
+    class KillProcessor(EntityProcessor):
+        def update_entity(self, delta, entity, *components):
+            assert entity not in self.killed
+            self.visited.append(entity)
+            # Kill entities not visited yet: two at the first call, then one
+            # at each call.
+            others = [e for e in self.manager.entities()
+                      if e not in self.visited]
+            for other in others[-2:] if len(self.visited) == 1 else others[:1]:
+                self.killed.append(other)
+                self.manager.kill_entity(other)
+
+    manager = manager_class()
+    manager.create_entities(6, components={Component: range(6)})
+    processor = KillProcessor(needed=[Component], **kwargs)
+    processor.visited = []
+    processor.killed = []
+    processor.register_to(manager)
+
+    manager.update(0.1)
+
+    assert len(set(processor.killed)) == 3
+    assert sorted(processor.visited) == sorted(manager.entities())
+    assert len(processor.visited) == 3
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'needed': [Component], 'changed': [Component]},
+    {'needed': [Component], 'changed': [Component], 'with_components': True},
+    {'changed': [Component]},
+    {'excluded': [Frozen]},
+])
+def test_entity_processor_kill_others_in_list_success(kwargs):
+    class KillProcessor(EntityProcessor):
+        def update_entity(self, delta, entity, *components):
+            self.visited.append(entity)
+            if self.kill:
+                # Kill an entity not visited yet.
+                others = [e for e in self.manager.entities()
+                          if e not in self.visited]
+                self.manager.kill_entity(others[0])
+
+    manager = Manager()
+    entities = manager.create_entities(4, components={Component: range(4)})
+    processor = KillProcessor(**kwargs)
+    processor.visited = []
+    processor.kill = False
+    processor.register_to(manager)
+    manager.update(0.1)
+
+    for entity in entities:
+        entity.mark_changed(Component)
+    processor.visited = []
+    processor.kill = True
+    manager.update(0.1)
+
+    assert len(processor.visited) == 2
+    assert sorted(processor.visited) == sorted(manager.entities())
+
+
+@pytest.mark.parametrize('manager_class', [Manager, ArchetypeManager])
+@pytest.mark.parametrize('excluded, args', [
+    (SpamComponent, ('spam',)),
+    (Frozen, ()),
+])
+def test_view_without_success(manager_class, excluded, args):
+    manager = manager_class()
+    entities = manager.create_entities(3, components={Component: [1, 2, 3]})
+    entities[0].add_component(excluded(*args))
+    view = manager.view([Component], without=[excluded])
+    assert sorted(view) == entities[1:]
+    assert view is not manager.view([Component])
+
+    entities[1].add_component(excluded(*args))
+    assert list(view) == [entities[2]]
+    entities[0].remove_component(excluded)
+    assert sorted(view) == [entities[0], entities[2]]
+
+    manager.kill_entity(entities[0])
+    manager.kill_entity(entities[1])
+    assert list(view) == [entities[2]]
+
+
+def test_entity_processor_excluded_optional_success():
+    manager = Manager()
+    entities = manager.create_entities(4, components={Component: range(4)})
+    entities[0].add_component(SpamComponent('spam'))
+    entities[1].add_component(Frozen())
+    entities[2].add_component(SpamComponent('eggs'))
+    updated = {}
+
+    class Update(EntityProcessor):
+        def update_entity(self, delta, entity, spam, frozen):
+            updated[entity] = (spam and spam.value, frozen)
+
+    processor = Update([Component], excluded=[SpamComponent],
+                       optional=[SpamComponent, Frozen])
+    processor.register_to(manager)
+    manager.update(0.1)
+    assert updated == {
+        entities[1]: (None, Frozen()),
+        entities[3]: (None, None),
+    }
+
+    processor.excluded = [Frozen]
+    updated.clear()
+    manager.update(0.1)
+    assert updated == {
+        entities[0]: ('spam', None),
+        entities[2]: ('eggs', None),
+        entities[3]: (None, None),
+    }
+    assert processor.accesses()[1] == frozenset([
+        Component, SpamComponent, Frozen
+    ])
+    assert Update([Component]).accesses() == (frozenset([Component]),) * 2
+    assert Update(optional=[Frozen]).accesses() is None
+
+
+def test_entity_processor_excluded_all_entities_success():
+    manager = Manager()
+    entities = manager.create_entities(2, components={Component: [1, 2]})
+    entities[0].add_component(Frozen())
+    updated = []
+
+    class Update(EntityProcessor):
+        def update_entity(self, delta, entity):
+            updated.append(entity)
+
+    Update(excluded=[Frozen]).register_to(manager)
+    manager.update(0.1)
+    assert updated == [entities[1]]
+
+
+def test_entity_processor_with_components_success():
+    manager = Manager()
+    entities = manager.create_entities(3, components={
+        Component: range(3),
+        SpamComponent: ['a', 'b', 'c'],
+    })
+    entities[2].add_component(Frozen())
+    updated = {}
+
+    class Update(EntityProcessor):
+        def update_entity(self, delta, entity, component, spam, *optional):
+            updated[entity] = (component.value, spam.value) + optional
+
+    processor = Update([Component, SpamComponent], excluded=[Frozen],
+                       with_components=True)
+    processor.register_to(manager)
+    manager.update(0.1)
+    assert updated == {entities[0]: (0, 'a'), entities[1]: (1, 'b')}
+
+    processor.optional = [Frozen]
+    processor.excluded = None
+    updated.clear()
+    manager.update(0.1)
+    assert updated[entities[1]] == (1, 'b', None)
+    assert updated[entities[2]] == (2, 'c', Frozen())
+
+    processor.changed = [Component]
+    manager.update(0.1)
+    updated.clear()
+    entities[0].mark_changed(Component)
+    manager.update(0.1)
+    assert updated == {entities[0]: (0, 'a', None)}